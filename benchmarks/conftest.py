@@ -0,0 +1,123 @@
+"""
+Lightweight benchmark harness.
+
+Each benchmark times a callable over a number of rounds and the summary statistics of every
+benchmark are written as JSON to NAOMI_BENCH_OUTPUT when the session ends, so runs can be
+compared to catch per-turn regressions.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from naomi_core.db.chat import Message, MessageModel
+from naomi_core.db.core import Base
+
+os.environ.setdefault("OPENAI_BASE_URL", "")
+os.environ.setdefault("OPENAI_API_KEY", "")
+os.environ.setdefault("OPENAI_BASE_MODEL", "")
+
+RESULTS_PATH = os.environ.get("NAOMI_BENCH_OUTPUT", "benchmarks/results.json")
+MAX_MESSAGES = int(os.environ.get("NAOMI_BENCH_MAX_MESSAGES", "100000"))
+CONVERSATION_SIZES = [size for size in (10, 100, 1_000, 10_000, 100_000) if size <= MAX_MESSAGES]
+DATABASES = ["memory", "file"]
+CONVERSATION_ID = 1
+SEED_BATCH = 5_000
+
+_results: list[dict] = []
+
+
+def message_body(index: int) -> str:
+    return f"Message {index}: " + "lorem ipsum dolor sit amet " * 8
+
+
+@contextmanager
+def conversation_database(kind: str, size: int, tmp_dir) -> Iterator[sessionmaker]:
+    """Creates a database holding one conversation of `size` messages."""
+    url = "sqlite:///:memory:" if kind == "memory" else f"sqlite:///{tmp_dir / 'bench.sqlite'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for start in range(0, size, SEED_BATCH):
+            rows = [
+                {
+                    "conversation_id": CONVERSATION_ID,
+                    "id": index + 1,
+                    "content": Message.from_user_input(message_body(index)).to_json(),
+                }
+                for index in range(start, min(start + SEED_BATCH, size))
+            ]
+            connection.execute(insert(MessageModel), rows)
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture(scope="module", params=[(db, n) for n in CONVERSATION_SIZES for db in DATABASES])
+def conversation_db(request, tmp_path_factory):
+    kind, size = request.param
+    with conversation_database(kind, size, tmp_path_factory.mktemp(kind)) as session_factory:
+        session_factory.bench_params = {"database": kind, "messages": size}
+        yield session_factory
+
+
+class Bench:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(
+        self,
+        fn: Callable[[], object],
+        rounds: int = 20,
+        setup: Optional[Callable[[], None]] = None,
+        **params,
+    ) -> dict:
+        timings = []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        result = {
+            "name": self.name,
+            "params": params,
+            "rounds": rounds,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings),
+        }
+        _results.append(result)
+        return result
+
+    def record(self, **fields) -> dict:
+        """Records a non-timing measurement, e.g. memory usage."""
+        result = {"name": self.name, **fields}
+        _results.append(result)
+        return result
+
+
+@pytest.fixture
+def bench(request) -> Bench:
+    return Bench(request.node.originalname)
+
+
+def pytest_sessionfinish(session):
+    if not _results:
+        return
+    with open(RESULTS_PATH, "w") as output:
+        json.dump(
+            {"python": platform.python_version(), "benchmarks": _results},
+            output,
+            indent=2,
+        )
@@ -0,0 +1,62 @@
+from naomi_core.db.chat import (
+    DEFAULT_TENANT_ID,
+    Message,
+    MessageModel,
+    add_message_to_db,
+    delete_messages_after,
+    fetch_messages,
+)
+
+from benchmarks.conftest import CONVERSATION_ID, message_body
+
+
+def test_add_message_to_db(bench, conversation_db):
+    session = conversation_db()
+    message = Message.from_llm_response(message_body(0))
+
+    def add():
+        add_message_to_db(message, session, CONVERSATION_ID)
+        session.commit()
+
+    bench(add, **conversation_db.bench_params)
+    session.close()
+
+
+def test_fetch_messages(bench, conversation_db):
+    session = conversation_db()
+
+    def fetch():
+        fetch_messages(session, CONVERSATION_ID, DEFAULT_TENANT_ID)
+        session.expunge_all()
+
+    bench(fetch, rounds=5, **conversation_db.bench_params)
+    session.close()
+
+
+def test_delete_messages_after(bench, conversation_db):
+    session = conversation_db()
+    message = Message.from_llm_response(message_body(0))
+    last: list[MessageModel] = []
+
+    def add_last():
+        last[:] = [add_message_to_db(message, session, CONVERSATION_ID)]
+        session.commit()
+
+    bench(
+        lambda: delete_messages_after(session, last[0], DEFAULT_TENANT_ID),
+        setup=add_last,
+        **conversation_db.bench_params
+    )
+    session.close()
+
+
+def test_message_payload(bench, conversation_db):
+    session = conversation_db()
+    models = fetch_messages(session, CONVERSATION_ID, DEFAULT_TENANT_ID)[:1000]
+
+    def decode():
+        for model in models:
+            model.payload
+
+    bench(decode, decoded_messages=len(models), **conversation_db.bench_params)
+    session.close()
@@ -0,0 +1,41 @@
+import pytest
+
+from naomi_core.db import codec
+from naomi_core.db.chat import Message
+
+from benchmarks.conftest import message_body
+
+MESSAGES_PER_ROUND = 1_000
+# Roughly a short chat turn, a long answer and a large tool output
+MESSAGE_SIZES = {"short": 1, "medium": 10, "large": 100}
+
+
+@pytest.fixture(params=list(codec.available_codecs()))
+def json_codec(request):
+    active = codec.codec.name
+    yield codec.set_codec(request.param)
+    codec.set_codec(active)
+
+
+@pytest.mark.parametrize("size", list(MESSAGE_SIZES))
+def test_codec_encode(bench, json_codec, size):
+    message = Message.from_llm_response(message_body(0) * MESSAGE_SIZES[size])
+
+    def encode():
+        for _ in range(MESSAGES_PER_ROUND):
+            message.to_json()
+
+    result = bench(encode, codec=json_codec.name, size=size, bytes=len(message.to_json()))
+    result["messages_per_second"] = MESSAGES_PER_ROUND / result["median"]
+
+
+@pytest.mark.parametrize("size", list(MESSAGE_SIZES))
+def test_codec_decode(bench, json_codec, size):
+    encoded = Message.from_llm_response(message_body(0) * MESSAGE_SIZES[size]).to_json()
+
+    def decode():
+        for _ in range(MESSAGES_PER_ROUND):
+            Message.from_json(encoded)
+
+    result = bench(decode, codec=json_codec.name, size=size, bytes=len(encoded))
+    result["messages_per_second"] = MESSAGES_PER_ROUND / result["median"]
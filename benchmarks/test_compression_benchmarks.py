@@ -0,0 +1,60 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from naomi_core.db.chat import DEFAULT_TENANT_ID, Message, MessageModel, fetch_messages
+from naomi_core.db.compression import ContentCompressor, storage_stats
+from naomi_core.db.core import Base
+
+from benchmarks.conftest import CONVERSATION_ID
+
+LARGE_MESSAGES = 2_000
+# A tool output of ~20KB, e.g. a calendar listing
+TOOL_OUTPUT = json.dumps(
+    [
+        {"id": f"event{i}", "summary": f"Meeting {i}", "start": {"dateTime": "2025-01-01T10:00"}}
+        for i in range(250)
+    ]
+)
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_large_message_storage(bench, tmp_path, compressed):
+    threshold = 4096 if compressed else 1 << 30
+    compressor = ContentCompressor(threshold=threshold)
+    engine = create_engine(f"sqlite:///{tmp_path / 'compression.sqlite'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        rows = []
+        for message_id in range(1, LARGE_MESSAGES + 1):
+            content, is_compressed = compressor.encode(
+                Message.from_llm_response(TOOL_OUTPUT).to_json()
+            )
+            rows.append(
+                {
+                    "conversation_id": CONVERSATION_ID,
+                    "id": message_id,
+                    "content": content,
+                    "compressed": is_compressed,
+                }
+            )
+        connection.execute(insert(MessageModel), rows)
+
+    session = sessionmaker(bind=engine)()
+
+    def read_history():
+        for model in fetch_messages(session, CONVERSATION_ID, DEFAULT_TENANT_ID):
+            model.payload
+        session.expunge_all()
+
+    with patch("naomi_core.db.compression.compressor", compressor):
+        result = bench(read_history, rounds=5, compressed=compressed, messages=LARGE_MESSAGES)
+        stats = storage_stats(engine)
+    result["database_bytes"] = os.path.getsize(tmp_path / "compression.sqlite")
+    result["stored_content_bytes"] = stats["stored_content_bytes"]
+    session.close()
+    engine.dispose()
@@ -0,0 +1,46 @@
+import gc
+import tracemalloc
+from typing import Callable
+
+from naomi_core.db.chat import DEFAULT_TENANT_ID, fetch_message_views, fetch_messages
+
+from benchmarks.conftest import CONVERSATION_ID
+
+
+def measure_allocated(load: Callable[[], list]) -> tuple[list, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        loaded = load()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return loaded, allocated
+
+
+def test_history_memory_per_message(bench, conversation_db):
+    """Compares the memory held by a loaded history: ORM models plus payloads vs message views."""
+    session = conversation_db()
+
+    def load_orm():
+        models = fetch_messages(session, CONVERSATION_ID, DEFAULT_TENANT_ID)
+        return [models, [model.payload for model in models]]
+
+    (models, payloads), orm_bytes = measure_allocated(load_orm)
+    count = len(models)
+    text_bytes = sum(len(payload.body) for payload in payloads)
+    del models, payloads
+    session.expunge_all()
+
+    views, view_bytes = measure_allocated(
+        lambda: fetch_message_views(session, CONVERSATION_ID, DEFAULT_TENANT_ID)
+    )
+    assert len(views) == count
+
+    bench.record(
+        params=conversation_db.bench_params,
+        orm_bytes_per_message=orm_bytes / count,
+        view_bytes_per_message=view_bytes / count,
+        text_bytes_per_message=text_bytes / count,
+    )
+    session.close()
@@ -0,0 +1,32 @@
+from typing import Iterator
+from unittest.mock import patch
+
+from naomi_core.assistant.persistence import generate_and_persist_llm_response
+from naomi_core.db.chat import MessageModel
+
+from benchmarks.conftest import CONVERSATION_ID
+
+STREAMED_CHUNKS = ["chunk "] * 200
+
+
+def stub_llm_stream(*_, **__) -> Iterator[str]:
+    return iter(STREAMED_CHUNKS)
+
+
+def collect(chunks: Iterator[str]) -> str:
+    return "".join(chunks)
+
+
+def test_generate_and_persist_llm_response(bench, conversation_db):
+    session = conversation_db()
+
+    def turn():
+        message = MessageModel(conversation_id=CONVERSATION_ID, content="{}")
+        generate_and_persist_llm_response(message, collect, session)
+
+    with patch("naomi_core.assistant.agent.llm_client") as llm_client, patch(
+        "naomi_core.assistant.persistence.process_llm_response", side_effect=lambda chunks: chunks
+    ):
+        llm_client.return_value.run.side_effect = stub_llm_stream
+        bench(turn, rounds=5, **conversation_db.bench_params)
+    session.close()
@@ -5,17 +5,26 @@ from llm.llm import handle_base_model_arg, llm_client
 from llm.stream_processing import MessageStream, ToolStream, parse_streaming_response
 from swarm import Agent  # type: ignore[import]
 
+from naomi_core.assistant.swarm_builder import build_swarm
+from naomi_core.db.agent import AgentModel
 from naomi_core.db.chat import Message
 
 
-def generate_llm_response(messages: list[Message], model: Optional[str] = None) -> Iterator[str]:
+def generate_llm_response(
+    messages: list[Message],
+    model: Optional[str] = None,
+    agents: Optional[list[AgentModel]] = None,
+) -> Iterator[str]:
     model = handle_base_model_arg(model)
-    agent = Agent(
-        name="Creative Assistant",
-        model=model,
-        instructions="You are a helpful assistant.",
-        stream=True,
-    )
+    if agents:
+        agent = build_swarm(agents, model)
+    else:
+        agent = Agent(
+            name="Creative Assistant",
+            model=model,
+            instructions="You are a helpful assistant.",
+            stream=True,
+        )
     return llm_client().run(agent, messages, stream=True)
 
 
@@ -1,12 +1,14 @@
 import logging
+from contextlib import contextmanager
 from typing import Callable, Iterator
 
-from sqlalchemy import Column
-
 from naomi_core.assistant.agent import generate_llm_response, process_llm_response
+from naomi_core.assistant.tracing import trace_turn
+from naomi_core.db.agent import load_agents
 from naomi_core.db.chat import (
     MessageModel,
     add_message_to_db,
+    conversation_tenant,
     delete_messages_after,
     fetch_messages,
 )
@@ -15,28 +17,65 @@ from naomi_core.db.chat import (
 def persist_llm_response(message: MessageModel, session):
     """
     Persists an LLM response, optionally deleting messages after the current ID if it exists.
+    The message is written for the tenant owning its conversation; a message carrying another
+    tenant raises TenantMismatchError.
     """
     payload = message.payload
     logging.debug(f"Persisting AI response: {payload.body}")
+    conversation_id = int(message.conversation_id)
+    tenant_id = conversation_tenant(session, conversation_id, message.tenant_id)
     if message.id is not None:
-        delete_messages_after(session, message)
-    add_message_to_db(message.payload, session, int(message.conversation_id))
+        delete_messages_after(session, message, tenant_id)
+    add_message_to_db(message.payload, session, conversation_id, tenant_id)
     session.commit()
 
 
+@contextmanager
+def conversation_scope(session, conversation_id: int, readonly: bool = False):
+    """
+    Yields the given session or, when there is none, a session_scope routed for the conversation:
+    to its shard when sharding is configured, otherwise to a replica for reads.
+    """
+    if session is not None:
+        yield session
+        return
+    from naomi_core.db.core import session_scope
+
+    with session_scope(readonly=readonly, conversation_id=conversation_id) as scoped_session:
+        yield scoped_session
+
+
 def generate_and_persist_llm_response(
     message: MessageModel,
     stream_collector: Callable[[Iterator[str]], str],
-    session,
+    session=None,
 ):
     """
     Generates an LLM response, processes it, and persists the updated message.
+    Without a session the conversation is read through a read-only scope and the response written
+    through another, both routed by conversation_id, see `conversation_scope`; agents are then
+    loaded through their own scopes too, see `load_agents`.
+    Each stage is traced, see `naomi_core.assistant.tracing`.
     """
-    messages = [msg.payload for msg in fetch_messages(session, int(message.conversation_id))]
-    response = generate_llm_response(messages)
-    chunks = process_llm_response(response)
-    payload = message.payload
-    response_text = stream_collector(chunks)
-    payload.body = response_text
-    message.content = Column[str](payload.to_json())
-    persist_llm_response(message, session)
+    conversation_id = int(message.conversation_id)
+    with trace_turn(conversation_id=conversation_id) as trace:
+        with conversation_scope(session, conversation_id, readonly=True) as read_session:
+            with trace.stage("fetch_messages"):
+                tenant_id = conversation_tenant(read_session, conversation_id, message.tenant_id)
+                message_models = fetch_messages(read_session, conversation_id, tenant_id)
+            with trace.stage("decode_payloads"):
+                messages = [msg.payload for msg in message_models]
+        with trace.stage("load_agents"):
+            agents = load_agents(session)
+        with trace.stage("generate"):
+            trace.mark_generation_started()
+            response = generate_llm_response(messages, agents=agents)
+        chunks = trace.measure_stream(process_llm_response(response))
+        payload = message.payload
+        with trace.stage("consume_stream"):
+            response_text = stream_collector(chunks)
+        payload.body = response_text
+        message.set_payload(payload)
+        with trace.stage("persist"):
+            with conversation_scope(session, conversation_id) as write_session:
+                persist_llm_response(message, write_session)
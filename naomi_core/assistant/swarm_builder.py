@@ -0,0 +1,108 @@
+import hashlib
+import json
+import re
+import threading
+from typing import Callable
+
+from swarm import Agent  # type: ignore[import]
+
+from naomi_core.db.agent import LEAD_AGENT_NAME, AgentModel
+
+MAX_CACHED_SWARMS = 8
+
+# The only cache of agents: keyed by their content, so edits made by any means are picked up
+_compiled_swarms: dict[str, Agent] = {}
+_compiled_swarms_lock = threading.Lock()
+
+
+def build_swarm(agents: list[AgentModel], model: str) -> Agent:
+    """
+    Returns the Lead swarm agent for the given DB agents.
+    Agents are only recompiled when their content (or the model) changes.
+    """
+    key = agents_content_hash(agents, model)
+    with _compiled_swarms_lock:
+        lead = _compiled_swarms.get(key)
+    if lead is None:
+        lead = compile_swarm(agents, model)
+        with _compiled_swarms_lock:
+            if len(_compiled_swarms) >= MAX_CACHED_SWARMS:
+                _compiled_swarms.clear()
+            lead = _compiled_swarms.setdefault(key, lead)
+    return lead
+
+
+def agents_content_hash(agents: list[AgentModel], model: str) -> str:
+    rows = sorted(
+        (
+            str(agent.name),
+            str(agent.prompt),
+            [(str(r.name), str(r.description)) for r in agent.responsibilities],
+        )
+        for agent in agents
+    )
+    return hashlib.sha256(json.dumps([model, rows]).encode()).hexdigest()
+
+
+def compile_swarm(agents: list[AgentModel], model: str) -> Agent:
+    """
+    Compiles DB agents into swarm agents.
+    The Lead can hand off to every other agent, and every other agent can hand back to the Lead.
+    """
+    compiled = {
+        str(agent.name): Agent(
+            name=agent.name, model=model, instructions=compile_instructions(agent)
+        )
+        for agent in agents
+    }
+    identifiers = _unique_identifiers(list(compiled))
+    lead = compiled[LEAD_AGENT_NAME]
+    lead.functions = [
+        handoff_to(agent, identifiers[name])
+        for name, agent in compiled.items()
+        if agent is not lead
+    ]
+    for agent in compiled.values():
+        if agent is not lead:
+            agent.functions = [handoff_to(lead, identifiers[LEAD_AGENT_NAME])]
+    return lead
+
+
+def compile_instructions(agent: AgentModel) -> str:
+    if not agent.responsibilities:
+        return str(agent.prompt)
+    responsibilities = "\n".join(f"- {r.name}: {r.description}" for r in agent.responsibilities)
+    return f"{agent.prompt}\n\nYour responsibilities:\n{responsibilities}"
+
+
+def handoff_to(target: Agent, identifier: str) -> Callable[[], Agent]:
+    def handoff() -> Agent:
+        return target
+
+    handoff.__name__ = f"transfer_to_{identifier}"
+    handoff.__doc__ = f"Hand the conversation off to the {target.name} agent."
+    return handoff
+
+
+def _unique_identifiers(names: list[str]) -> dict[str, str]:
+    """
+    Maps agent names to distinct identifiers. Names that reduce to the same identifier, such as
+    "Travel Agent" and "travel-agent", get numbered suffixes in name order, so tool names never
+    collide.
+    """
+    identifiers: dict[str, str] = {}
+    used: set[str] = set()
+    for name in sorted(names):
+        base = identifier = _identifier(name)
+        suffix = 2
+        while identifier in used:
+            identifier = f"{base}_{suffix}"
+            suffix += 1
+        used.add(identifier)
+        identifiers[name] = identifier
+    return identifiers
+
+
+def _identifier(name: str) -> str:
+    """Reduces an agent name to something usable as a tool name (e.g. '👑Lead' -> 'lead')."""
+    return re.sub(r"[^0-9a-zA-Z]+", "_", name).strip("_").lower() or "agent"
@@ -0,0 +1,99 @@
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - OpenTelemetry is optional
+    otel_trace = None  # type: ignore[assignment]
+
+
+@dataclass
+class TurnMetrics:
+    """Timings of a single assistant turn, in seconds."""
+
+    stages: dict[str, float] = field(default_factory=dict)
+    time_to_first_token: Optional[float] = None
+    tokens: int = 0
+    tokens_per_second: Optional[float] = None
+    total: float = 0.0
+
+
+turn_listeners: list[Callable[[TurnMetrics], None]] = []
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Opens an OpenTelemetry span when the opentelemetry package is installed, otherwise does nothing.
+    Without a configured OpenTelemetry SDK the span is a no-op as well.
+    """
+    if otel_trace is None:
+        yield None
+        return
+    with otel_trace.get_tracer("naomi_core").start_as_current_span(
+        name, attributes=attributes
+    ) as current:
+        yield current
+
+
+class TurnTrace:
+    def __init__(self, turn_span: Any = None):
+        self.metrics = TurnMetrics()
+        self._span = turn_span
+        self._generation_started: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        with span(f"naomi.{name}"):
+            try:
+                yield
+            finally:
+                self.metrics.stages[name] = self.metrics.stages.get(name, 0.0) + (
+                    time.perf_counter() - start
+                )
+
+    def mark_generation_started(self):
+        self._generation_started = time.perf_counter()
+
+    def measure_stream(self, chunks: Iterator[str]) -> Iterator[str]:
+        """Passes chunks through while recording time-to-first-token and throughput."""
+        first_chunk: Optional[float] = None
+        for chunk in chunks:
+            if first_chunk is None:
+                first_chunk = time.perf_counter()
+                if self._generation_started is not None:
+                    self.metrics.time_to_first_token = first_chunk - self._generation_started
+            self.metrics.tokens += 1
+            yield chunk
+        if first_chunk is not None:
+            elapsed = time.perf_counter() - first_chunk
+            if elapsed > 0:
+                self.metrics.tokens_per_second = self.metrics.tokens / elapsed
+
+    def finish(self, total: float):
+        self.metrics.total = total
+        if self._span is not None:
+            self._span.set_attribute("naomi.tokens", self.metrics.tokens)
+            for name, value in (
+                ("naomi.time_to_first_token", self.metrics.time_to_first_token),
+                ("naomi.tokens_per_second", self.metrics.tokens_per_second),
+            ):
+                if value is not None:
+                    self._span.set_attribute(name, value)
+        logging.info(f"Turn metrics: {self.metrics}")
+        for listener in turn_listeners:
+            listener(self.metrics)
+
+
+@contextmanager
+def trace_turn(**attributes: Any) -> Iterator[TurnTrace]:
+    """Traces one assistant turn; listeners in `turn_listeners` receive its metrics when it ends."""
+    start = time.perf_counter()
+    with span("naomi.turn", **attributes) as turn_span:
+        trace = TurnTrace(turn_span)
+        yield trace
+        trace.finish(time.perf_counter() - start)
@@ -1,4 +1,12 @@
-from sqlalchemy import Column, ForeignKey, String, Text
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import Column, ForeignKey, String, Text, delete, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import ORMExecuteState, Session, relationship, selectinload
 
 from naomi_core.db.core import Base
 
@@ -8,6 +16,10 @@ class AgentModel(Base):
     name = Column(String, primary_key=True, nullable=False)
     prompt = Column(Text, nullable=False)
 
+    responsibilities = relationship(
+        "AgentResponsibilityModel", order_by="AgentResponsibilityModel.name"
+    )
+
 
 class AgentResponsibilityModel(Base):
     __tablename__ = "agent_responsibility"
@@ -16,27 +28,146 @@ class AgentResponsibilityModel(Base):
     description = Column(Text, nullable=False)
 
 
+LEAD_AGENT_NAME = "👑Lead"
 LEAD_DEFAULT_PROMPT = "You are a helpful assistant."
+# Seconds agents loaded without a session stay cached. Edits committed through any session of
+# this process drop the cache at once; this bounds how long edits by other processes go unseen.
+AGENT_CACHE_TTL = float(os.environ.get("AGENT_CACHE_TTL", "60"))
 
 
 def get_all_agents(session) -> list[AgentModel]:
-    agents = session.query(AgentModel).all()
-    agent_names = {agent.name for agent in agents}
-    if "👑Lead" not in agent_names:
-        lead_agent = get_lead_agent(session)
-        agents.append(lead_agent)
+    """
+    Loads every agent together with its responsibilities in a single round-trip.
+    The Lead agent is seeded (but not committed) if the database has not been initialized yet.
+    """
+    agents = _query_agents(session)
+    if not any(agent.name == LEAD_AGENT_NAME for agent in agents):
+        agents.append(_seed_lead_agent(session))
     return agents
 
 
+def _query_agents(session) -> list[AgentModel]:
+    return (
+        session.query(AgentModel)
+        .options(selectinload(AgentModel.responsibilities))
+        .order_by(AgentModel.name)
+        .all()
+    )
+
+
 def get_lead_agent(session) -> AgentModel:
-    lead_agent = session.query(AgentModel).first()
-    if not lead_agent:
-        lead_agent = AgentModel(name="👑Lead", prompt=LEAD_DEFAULT_PROMPT)
-        session.add(lead_agent)
-        session.commit()
+    lead_agent = session.get(AgentModel, LEAD_AGENT_NAME)
+    if lead_agent is None:
+        lead_agent = _seed_lead_agent(session)
+    return lead_agent
+
+
+def _seed_lead_agent(session) -> AgentModel:
+    lead_agent = AgentModel(name=LEAD_AGENT_NAME, prompt=LEAD_DEFAULT_PROMPT, responsibilities=[])
+    session.add(lead_agent)
+    session.flush()
     return lead_agent
 
 
+def load_agents(session=None) -> list[AgentModel]:
+    """
+    Loads every agent with its responsibilities. Given a session, agents are loaded through it,
+    seeding the Lead agent there if missing. Otherwise they come from `agent_cache`, which reads
+    them through a read-only scope, i.e. from a replica when configured, detached so they can be
+    used after the read ends; only when the Lead agent is missing are they read again on the
+    primary, which seeds it. Compiled swarms are cached by the agents' content on top of this,
+    see naomi_core.assistant.swarm_builder.
+    """
+    if session is not None:
+        return get_all_agents(session)
+    return agent_cache.agents(_load_detached_agents)
+
+
+def _load_detached_agents() -> list[AgentModel]:
+    from naomi_core.db.core import session_scope
+
+    with session_scope(readonly=True) as read_session:
+        agents = _detach(read_session, _query_agents(read_session))
+    if not any(agent.name == LEAD_AGENT_NAME for agent in agents):
+        with session_scope() as write_session:
+            agents = _detach(write_session, get_all_agents(write_session))
+    return agents
+
+
+class AgentCache:
+    """
+    Process-wide in-memory cache of the agent set, kept for up to `ttl` seconds.
+    Any session that commits a change to agents or responsibilities, whether through ORM objects
+    or insert, update and delete statements, invalidates it. A load that overlaps an invalidation
+    is returned but not cached, so the cache never holds agents older than a committed edit.
+    """
+
+    def __init__(self, ttl: float = AGENT_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._agents: Optional[list[AgentModel]] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def agents(self, load: Callable[[], list[AgentModel]]) -> list[AgentModel]:
+        with self._lock:
+            if self._agents is not None and self._clock() - self._loaded_at < self.ttl:
+                return list(self._agents)
+            generation = self._generation
+        agents = load()
+        with self._lock:
+            if self._generation == generation:
+                self._agents, self._loaded_at = agents, self._clock()
+        return list(agents)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._agents = None
+            self._generation += 1
+
+
+agent_cache = AgentCache()
+
+_AGENT_TABLES = {AgentModel.__tablename__, AgentResponsibilityModel.__tablename__}
+_AGENTS_CHANGED = "agents_changed"
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_agent_changes(session, flush_context) -> None:
+    changed = itertools.chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, (AgentModel, AgentResponsibilityModel)) for obj in changed):
+        session.info[_AGENTS_CHANGED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_agent_statements(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if getattr(table, "name", None) in _AGENT_TABLES:
+            state.session.info[_AGENTS_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_agent_cache(session) -> None:
+    if session.info.pop(_AGENTS_CHANGED, False):
+        agent_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_agent_changes(session) -> None:
+    session.info.pop(_AGENTS_CHANGED, None)
+
+
+def _detach(session, agents: list[AgentModel]) -> list[AgentModel]:
+    session.flush()
+    for agent in agents:
+        session.expunge(agent)
+        for responsibility in agent.responsibilities:
+            session.expunge(responsibility)
+    return agents
+
+
 def save_responsibility(goal: AgentResponsibilityModel):
     from naomi_core.db.core import session_scope
 
@@ -44,6 +175,55 @@ def save_responsibility(goal: AgentResponsibilityModel):
         session.add(goal)
 
 
+def save_responsibilities(agent: AgentModel, responsibilities: list[AgentResponsibilityModel]):
+    """
+    Syncs an agent's full responsibility list in a single transaction.
+    Only the differences against what is stored are written: new and changed responsibilities are
+    upserted in one statement and missing ones are deleted in another.
+    """
+    from naomi_core.db.core import session_scope
+
+    agent_name = agent.name
+    desired = {responsibility.name: responsibility for responsibility in responsibilities}
+    with session_scope() as session:
+        stored = {r.name: r.description for r in load_responsibilities_from_db(agent, session)}
+        upserts = [
+            {"agent_name": agent_name, "name": name, "description": r.description}
+            for name, r in desired.items()
+            if stored.get(name) != r.description
+        ]
+        deletions = [name for name in stored if name not in desired]
+
+        if upserts:
+            _upsert_responsibilities(session, upserts)
+        if deletions:
+            session.execute(
+                delete(AgentResponsibilityModel)
+                .where(AgentResponsibilityModel.agent_name == agent_name)
+                .where(AgentResponsibilityModel.name.in_(deletions))
+                .execution_options(synchronize_session=False)
+            )
+
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _upsert_responsibilities(session, rows: list[dict[str, str]]):
+    insert = _UPSERT_DIALECTS.get(session.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            session.merge(AgentResponsibilityModel(**row))
+        return
+
+    statement = insert(AgentResponsibilityModel).values(rows)
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[AgentResponsibilityModel.agent_name, AgentResponsibilityModel.name],
+            set_={"description": statement.excluded.description},
+        )
+    )
+
+
 def load_responsibilities_from_db(agent: AgentModel, session) -> list[AgentResponsibilityModel]:
     return (
         session.query(AgentResponsibilityModel)
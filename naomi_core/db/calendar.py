@@ -0,0 +1,44 @@
+from sqlalchemy import Column, DateTime, Index, String, Text
+
+from naomi_core.db.core import Base
+
+
+class CalendarEventModel(Base):
+    """A Google Calendar event mirrored locally, see naomi_core.tools.calendar.event_cache."""
+
+    __tablename__ = "calendar_event"
+    calendar_id = Column(String, primary_key=True, nullable=False)
+    id = Column(String, primary_key=True, nullable=False)
+    # Naive UTC; all-day events span from midnight to midnight UTC
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime, nullable=False)
+    # The event resource as returned by the API
+    content = Column(Text, nullable=False)
+
+    __table_args__ = (Index("ix_calendar_event_calendar_start", "calendar_id", "start"),)
+
+
+class CalendarSyncStateModel(Base):
+    __tablename__ = "calendar_sync_state"
+    calendar_id = Column(String, primary_key=True, nullable=False)
+    sync_token = Column(String, nullable=False)
+    synced_at = Column(DateTime, nullable=False)
+
+
+class CalendarWatchChannelModel(Base):
+    """A push notification channel watching a calendar's events, see tools.calendar.watch."""
+
+    __tablename__ = "calendar_watch_channel"
+    id = Column(String, primary_key=True, nullable=False)
+    calendar_id = Column(String, nullable=False)
+    # Identifies the watched resource when stopping the channel
+    resource_id = Column(String, nullable=False)
+    # Secret echoed in every notification, to tell genuine notifications from forged ones
+    token = Column(String, nullable=False)
+    # Naive UTC
+    expiration = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_calendar_watch_channel_calendar_id", "calendar_id"),
+        Index("ix_calendar_watch_channel_expiration", "expiration"),
+    )
@@ -1,7 +1,25 @@
-import json
+import datetime
+from typing import Any, NamedTuple, Optional
 
-from sqlalchemy import Column, Integer, String, Text, func
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+    and_,
+    false,
+    func,
+    or_,
+    select,
+    update,
+)
 
+from naomi_core.db import codec
+from naomi_core.db.compression import decode_content, encode_content
 from naomi_core.db.core import Base
 
 
@@ -16,10 +34,10 @@ class Message(dict[str, str]):
 
     @staticmethod
     def from_json(json_str: str) -> "Message":
-        return Message(**json.loads(json_str))
+        return Message(codec.loads(json_str))
 
     def to_json(self) -> str:
-        return json.dumps(self)
+        return codec.dumps(self)
 
     @property
     def body(self) -> str:
@@ -30,7 +48,38 @@ class Message(dict[str, str]):
         self["content"] = value
 
 
+class MessageView(NamedTuple):
+    """
+    Lightweight read-only message, as returned by `fetch_message_views`.
+    Unlike MessageModel it carries no ORM state, and unlike Message it keeps no per-message dict
+    unless the payload holds keys besides role and content.
+    """
+
+    conversation_id: int
+    id: int
+    role: str
+    content: str
+    extra: Optional[dict[str, Any]] = None
+
+    @property
+    def body(self) -> str:
+        return self.content
+
+    def to_message(self) -> Message:
+        message = Message(role=self.role, content=self.content)
+        if self.extra:
+            message.update(self.extra)
+        return message
+
+
 DEFAULT_CONVERSATION_ID = 0
+# Owner of rows written before conversations were scoped to tenants
+DEFAULT_TENANT_ID = "default"
+PREVIEW_LENGTH = 100
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
 
 
 class Conversation(Base):
@@ -38,6 +87,32 @@ class Conversation(Base):
     id = Column(Integer, primary_key=True, nullable=False)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=False)
+    tenant_id = Column(String, nullable=False, server_default=DEFAULT_TENANT_ID)
+    # Denormalized from the message table, kept up to date by add_message_to_db and
+    # delete_messages_after so that listing conversations never aggregates messages
+    message_count = Column(Integer, nullable=False, server_default="0")
+    last_message_id = Column(Integer)
+    # Never NULL, so that the (updated_at, id) keyset of list_conversations is total
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_now)
+
+    __table_args__ = (
+        Index("ix_conversation_updated_at_id", "updated_at", "id"),
+        Index("ix_conversation_tenant_updated_at_id", "tenant_id", "updated_at", "id"),
+    )
+
+
+class ConversationSummary(NamedTuple):
+    """A row of `list_conversations`."""
+
+    id: int
+    name: str
+    description: str
+    message_count: int
+    updated_at: datetime.datetime
+    last_message_preview: Optional[str]
+
+
+ConversationCursor = tuple[datetime.datetime, int]
 
 
 class MessageModel(Base):
@@ -45,10 +120,22 @@ class MessageModel(Base):
     conversation_id = Column(Integer, primary_key=True, nullable=False)
     id = Column(Integer, primary_key=True, nullable=False)
     content = Column(Text, nullable=False)
+    # Set when content holds a compressed body, see naomi_core.db.compression
+    compressed = Column(Boolean, nullable=False, server_default=false())
+    tenant_id = Column(String, nullable=False, server_default=DEFAULT_TENANT_ID)
+
+    __table_args__ = (
+        Index("ix_message_tenant_conversation_id", "tenant_id", "conversation_id", "id"),
+    )
 
     @property
     def payload(self) -> Message:
-        return Message.from_json(str(self.content))
+        return Message.from_json(decode_content(str(self.content), bool(self.compressed)))
+
+    def set_payload(self, message: Message) -> None:
+        content, compressed = encode_content(message.to_json())
+        self.content = content  # type: ignore[assignment]
+        self.compressed = compressed  # type: ignore[assignment]
 
     @staticmethod
     def from_llm_response(conversation_id: int, assistant_message: str) -> "MessageModel":
@@ -65,7 +152,54 @@ class SummaryModel(Base):
     content = Column(Text, nullable=False)
 
 
-def add_message_to_db(message: Message, session, conversation_id: int) -> MessageModel:
+def conversation_tables() -> list[tuple[Table, str]]:
+    """The tables holding a conversation's rows, each with its conversation id column."""
+    return [
+        (Conversation.__table__, "id"),
+        (MessageModel.__table__, "conversation_id"),
+        (SummaryModel.__table__, "conversation_id"),
+    ]
+
+
+class TenantMismatchError(ValueError):
+    """Raised when a caller acts on a conversation on behalf of a tenant that does not own it."""
+
+
+def conversation_tenant(session, conversation_id: int, tenant_id: Optional[str] = None) -> str:
+    """
+    Returns the tenant owning a conversation: the only source of truth for the tenant its messages
+    are written for. A conversation without a row is owned by the tenant of its messages or,
+    without any, by the caller's tenant (the default one if not given).
+
+    Raises:
+        TenantMismatchError: If tenant_id is given and another tenant owns the conversation
+    """
+    owner = session.scalar(select(Conversation.tenant_id).where(Conversation.id == conversation_id))
+    if owner is None:
+        owner = session.scalar(
+            select(MessageModel.tenant_id)
+            .where(MessageModel.conversation_id == conversation_id)
+            .limit(1)
+        )
+    if owner is None:
+        return tenant_id or DEFAULT_TENANT_ID
+    if tenant_id is not None and tenant_id != owner:
+        raise TenantMismatchError(
+            f"Conversation {conversation_id} does not belong to tenant {tenant_id}"
+        )
+    return owner
+
+
+def add_message_to_db(
+    message: Message, session, conversation_id: int, tenant_id: Optional[str] = None
+) -> MessageModel:
+    """
+    Appends a message to a conversation, written for the tenant owning it.
+
+    Raises:
+        TenantMismatchError: If tenant_id is given and another tenant owns the conversation
+    """
+    tenant_id = conversation_tenant(session, conversation_id, tenant_id)
     max_id = (
         session.query(func.max(MessageModel.id))
         .where(MessageModel.conversation_id == conversation_id)
@@ -73,26 +207,161 @@ def add_message_to_db(message: Message, session, conversation_id: int) -> Messag
     )
     if max_id is None:
         max_id = 0
+    content, compressed = encode_content(codec.dumps(message))
     message_model = MessageModel(
         conversation_id=conversation_id,
         id=max_id + 1,
-        content=json.dumps(message),
+        content=content,
+        compressed=compressed,
+        tenant_id=tenant_id,
     )
     session.add(message_model)
+    session.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .where(Conversation.tenant_id == tenant_id)
+        .values(
+            message_count=Conversation.message_count + 1,
+            last_message_id=max_id + 1,
+            updated_at=_now(),
+        )
+    )
     return message_model
 
 
-def fetch_messages(session, conversation_id) -> list[MessageModel]:
+def fetch_messages(session, conversation_id, tenant_id: str) -> list[MessageModel]:
     return (
         session.query(MessageModel)
         .where(MessageModel.conversation_id == conversation_id)
+        .where(MessageModel.tenant_id == tenant_id)
         .order_by(MessageModel.id)
         .all()
     )
 
 
-def delete_messages_after(session, message: MessageModel):
-    session.query(MessageModel).where(
-        MessageModel.conversation_id == message.conversation_id
-    ).where(MessageModel.id >= message.id).delete()
+def fetch_message_views(session, conversation_id, tenant_id: str) -> list[MessageView]:
+    """Fetches a conversation's messages through a Core select, bypassing the ORM identity map."""
+    rows = session.execute(
+        select(MessageModel.id, MessageModel.content, MessageModel.compressed)
+        .where(MessageModel.conversation_id == conversation_id)
+        .where(MessageModel.tenant_id == tenant_id)
+        .order_by(MessageModel.id)
+    )
+    return [_message_view(conversation_id, *row) for row in rows]
+
+
+def get_conversation(session, conversation_id: int, tenant_id: str) -> Optional[Conversation]:
+    """Returns the conversation if it belongs to the tenant."""
+    conversation = session.get(Conversation, conversation_id)
+    return (
+        conversation if conversation is not None and conversation.tenant_id == tenant_id else None
+    )
+
+
+def _message_view(
+    conversation_id: int, message_id: int, content: str, compressed: bool
+) -> MessageView:
+    payload = codec.loads(decode_content(content, compressed))
+    role = payload.pop("role", "")
+    body = payload.pop("content", "")
+    return MessageView(conversation_id, message_id, role, body, payload or None)
+
+
+def delete_messages_after(session, message: MessageModel, tenant_id: str):
+    deleted = (
+        session.query(MessageModel)
+        .where(MessageModel.conversation_id == message.conversation_id)
+        .where(MessageModel.tenant_id == tenant_id)
+        .where(MessageModel.id >= message.id)
+        .delete()
+    )
+    # Message ids are allocated consecutively, so the one before is now the last
+    session.execute(
+        update(Conversation)
+        .where(Conversation.id == message.conversation_id)
+        .where(Conversation.tenant_id == tenant_id)
+        .values(
+            message_count=Conversation.message_count - deleted,
+            last_message_id=message.id - 1 if message.id > 1 else None,
+            updated_at=_now(),
+        )
+    )
     session.commit()
+
+
+def list_conversations(
+    session,
+    tenant_id: str,
+    limit: int = 50,
+    cursor: Optional[ConversationCursor] = None,
+) -> tuple[list[ConversationSummary], Optional[ConversationCursor]]:
+    """
+    Lists a tenant's conversations, most recently updated first, with a preview of their last
+    message. Pass the returned cursor back in to fetch the next page; it is None on the last page.
+    Pages are read from ix_conversation_tenant_updated_at_id, so each costs one indexed query.
+    """
+    return _list_conversations(session, limit, cursor, tenant_id)
+
+
+def list_conversations_across_tenants(
+    session,
+    limit: int = 50,
+    cursor: Optional[ConversationCursor] = None,
+) -> tuple[list[ConversationSummary], Optional[ConversationCursor]]:
+    """
+    Like `list_conversations`, but lists the conversations of every tenant, e.g. for
+    administration. Pages are read from ix_conversation_updated_at_id.
+    """
+    return _list_conversations(session, limit, cursor)
+
+
+def _list_conversations(
+    session,
+    limit: int,
+    cursor: Optional[ConversationCursor],
+    tenant_id: Optional[str] = None,
+) -> tuple[list[ConversationSummary], Optional[ConversationCursor]]:
+    query = (
+        select(
+            Conversation.id,
+            Conversation.name,
+            Conversation.description,
+            Conversation.message_count,
+            Conversation.updated_at,
+            MessageModel.content,
+            MessageModel.compressed,
+        )
+        .outerjoin(
+            MessageModel,
+            and_(
+                MessageModel.conversation_id == Conversation.id,
+                MessageModel.id == Conversation.last_message_id,
+            ),
+        )
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+        .limit(limit)
+    )
+    if tenant_id is not None:
+        query = query.where(Conversation.tenant_id == tenant_id)
+    if cursor is not None:
+        updated_at, conversation_id = cursor
+        query = query.where(
+            or_(
+                Conversation.updated_at < updated_at,
+                and_(Conversation.updated_at == updated_at, Conversation.id < conversation_id),
+            )
+        )
+    conversations = [
+        ConversationSummary(*row[:5], _preview(*row[5:])) for row in session.execute(query)
+    ]
+    if not conversations or len(conversations) < limit:
+        return conversations, None
+    last = conversations[-1]
+    return conversations, (last.updated_at, last.id)
+
+
+def _preview(content: Optional[str], compressed: Optional[bool]) -> Optional[str]:
+    if content is None:
+        return None
+    body = codec.loads(decode_content(content, compressed)).get("content", "")
+    return body[:PREVIEW_LENGTH]
@@ -0,0 +1,66 @@
+"""
+Pluggable JSON codec used to (de)serialize message payloads.
+
+msgspec or orjson are used when installed, falling back to the standard library. Set
+NAOMI_JSON_CODEC to force a specific codec. All codecs read each other's output.
+"""
+
+import json
+import os
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+
+class JsonCodec(NamedTuple):
+    name: str
+    dumps: Callable[[Any], str]
+    loads: Callable[[Union[str, bytes]], Any]
+
+
+def _stdlib_codec() -> JsonCodec:
+    return JsonCodec("json", json.dumps, json.loads)
+
+
+def _orjson_codec() -> Optional[JsonCodec]:
+    try:
+        import orjson  # type: ignore[import]
+    except ImportError:
+        return None
+    return JsonCodec("orjson", lambda obj: orjson.dumps(obj).decode(), orjson.loads)
+
+
+def _msgspec_codec() -> Optional[JsonCodec]:
+    try:
+        import msgspec  # type: ignore[import]
+    except ImportError:
+        return None
+    return JsonCodec("msgspec", lambda obj: msgspec.json.encode(obj).decode(), msgspec.json.decode)
+
+
+def available_codecs() -> dict[str, JsonCodec]:
+    """Returns the installed codecs, fastest first."""
+    codecs = [_msgspec_codec(), _orjson_codec(), _stdlib_codec()]
+    return {codec.name: codec for codec in codecs if codec is not None}
+
+
+def set_codec(name: Optional[str] = None) -> JsonCodec:
+    """Switches the active codec, defaulting to the fastest one installed."""
+    global codec
+    codecs = available_codecs()
+    if name is None:
+        codec = next(iter(codecs.values()))
+    elif name in codecs:
+        codec = codecs[name]
+    else:
+        raise ValueError(f"JSON codec '{name}' is not available, choose from: {list(codecs)}")
+    return codec
+
+
+codec: JsonCodec = set_codec(os.environ.get("NAOMI_JSON_CODEC") or None)
+
+
+def dumps(obj: Any) -> str:
+    return codec.dumps(obj)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return codec.loads(data)
@@ -0,0 +1,228 @@
+"""
+Transparent compression of large message bodies.
+
+Message content above NAOMI_COMPRESSION_THRESHOLD bytes is stored compressed, base64 encoded and
+prefixed with the algorithm, e.g. "zstd:KLUv/...", with MessageModel.compressed set. zstd (from the
+optional zstandard package) is preferred, optionally with a shared trained dictionary from
+NAOMI_COMPRESSION_DICT, whose id then follows the algorithm, e.g. "zstd.1234:KLUv/..."; zlib from
+the standard library is the fallback.
+"""
+
+import argparse
+import base64
+import math
+import os
+import time
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy import Engine, func, select, update
+
+try:
+    import zstandard  # type: ignore[import]
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+NAOMI_COMPRESSION_THRESHOLD = int(os.environ.get("NAOMI_COMPRESSION_THRESHOLD", "4096"))
+# Path to a zstd dictionary trained with `python -m naomi_core.db.compression train`.
+# Rows compressed with a dictionary can only be read with that same dictionary configured.
+NAOMI_COMPRESSION_DICT = os.environ.get("NAOMI_COMPRESSION_DICT", "")
+
+
+class ContentCompressor:
+    def __init__(
+        self,
+        threshold: int = NAOMI_COMPRESSION_THRESHOLD,
+        dictionary: Optional[bytes] = None,
+        algorithm: Optional[str] = None,
+    ):
+        self.threshold = threshold
+        self.algorithm = algorithm or ("zstd" if zstandard is not None else "zlib")
+        if self.algorithm == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        self._zstd_dict: Any = None
+        if dictionary is not None and zstandard is not None:
+            self._zstd_dict = zstandard.ZstdCompressionDict(dictionary)
+
+    @property
+    def dictionary_id(self) -> int:
+        """Id of the zstd dictionary in use, 0 without one."""
+        return self._zstd_dict.dict_id() if self._zstd_dict is not None else 0
+
+    def encode(self, content: str) -> tuple[str, bool]:
+        """Returns the content to store and whether it was compressed."""
+        raw = content.encode()
+        if len(raw) < self.threshold:
+            return content, False
+        prefix = self.algorithm
+        if self.algorithm == "zstd":
+            compressed = zstandard.ZstdCompressor(dict_data=self._zstd_dict).compress(raw)
+            if self.dictionary_id:
+                prefix = f"zstd.{self.dictionary_id}"
+        else:
+            compressed = zlib.compress(raw)
+        return f"{prefix}:{base64.b64encode(compressed).decode()}", True
+
+    def decode(self, stored: str) -> str:
+        prefix, _, data = stored.partition(":")
+        algorithm, _, dictionary_id = prefix.partition(".")
+        compressed = base64.b64decode(data)
+        if algorithm == "zstd":
+            if zstandard is None:
+                raise ValueError("Reading zstd compressed messages requires the zstandard package")
+            if dictionary_id and int(dictionary_id) != self.dictionary_id:
+                raise ValueError(
+                    f"Message was compressed with zstd dictionary {dictionary_id}, "
+                    f"but dictionary {self.dictionary_id or 'none'} is configured"
+                )
+            return (
+                zstandard.ZstdDecompressor(dict_data=self._zstd_dict)
+                .decompress(compressed)
+                .decode()
+            )
+        if algorithm == "zlib":
+            return zlib.decompress(compressed).decode()
+        raise ValueError(f"Unknown message compression: {algorithm}")
+
+
+def _load_dictionary(path: str) -> Optional[bytes]:
+    if not path:
+        return None
+    with open(path, "rb") as dictionary:
+        return dictionary.read()
+
+
+compressor = ContentCompressor(dictionary=_load_dictionary(NAOMI_COMPRESSION_DICT))
+
+
+def encode_content(content: str) -> tuple[str, bool]:
+    return compressor.encode(content)
+
+
+def decode_content(stored: str, compressed: bool) -> str:
+    return compressor.decode(stored) if compressed else stored
+
+
+def backfill(engine: Engine, batch_size: int = 500) -> int:
+    """
+    Compresses existing messages above the threshold, one committed batch at a time so that
+    the table stays writable. Returns the number of messages compressed.
+    The threshold is in bytes but SQL length counts characters, so rows are only prefiltered by
+    the shortest length that could reach it (4 bytes per character in UTF-8) and checked exactly
+    when encoded.
+    """
+    from naomi_core.db.chat import MessageModel
+
+    compressed_count = 0
+    last_key = (-1, -1)
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(MessageModel.conversation_id, MessageModel.id, MessageModel.content)
+                .where(MessageModel.compressed.is_(False))
+                .where(func.length(MessageModel.content) >= math.ceil(compressor.threshold / 4))
+                .where(
+                    (MessageModel.conversation_id > last_key[0])
+                    | (
+                        (MessageModel.conversation_id == last_key[0])
+                        & (MessageModel.id > last_key[1])
+                    )
+                )
+                .order_by(MessageModel.conversation_id, MessageModel.id)
+                .limit(batch_size)
+            ).all()
+            for conversation_id, message_id, content in rows:
+                stored, compressed = compressor.encode(content)
+                if compressed:
+                    connection.execute(
+                        update(MessageModel)
+                        .where(MessageModel.conversation_id == conversation_id)
+                        .where(MessageModel.id == message_id)
+                        .values(content=stored, compressed=True)
+                    )
+                    compressed_count += 1
+        if len(rows) < batch_size:
+            return compressed_count
+        last_key = (rows[-1].conversation_id, rows[-1].id)
+
+
+def storage_stats(engine: Engine, sample_size: int = 1000) -> dict[str, Any]:
+    """Reports stored vs decompressed message sizes and the cost of reading compressed rows."""
+    from naomi_core.db.chat import MessageModel
+
+    with engine.connect() as connection:
+        count, stored_bytes = connection.execute(
+            select(func.count(), func.coalesce(func.sum(func.length(MessageModel.content)), 0))
+        ).one()
+        samples = connection.execute(
+            select(MessageModel.content, MessageModel.compressed)
+            .where(MessageModel.compressed.is_(True))
+            .limit(sample_size)
+        ).all()
+        database_bytes = _database_size(connection)
+
+    start = time.perf_counter()
+    decoded_bytes = sum(len(decode_content(content, compressed)) for content, compressed in samples)
+    decode_seconds = time.perf_counter() - start
+    return {
+        "messages": count,
+        "stored_content_bytes": stored_bytes,
+        "database_bytes": database_bytes,
+        "sampled_compressed_messages": len(samples),
+        "sampled_compression_ratio": (
+            decoded_bytes / sum(len(content) for content, _ in samples) if samples else None
+        ),
+        "decode_microseconds_per_message": (
+            decode_seconds / len(samples) * 1e6 if samples else None
+        ),
+    }
+
+
+def _database_size(connection) -> Optional[int]:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+        page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        return page_count * page_size
+    if dialect == "postgresql":
+        return connection.exec_driver_sql("SELECT pg_database_size(current_database())").scalar()
+    return None
+
+
+def train_dictionary(engine: Engine, path: str, size: int = 112_640, samples: int = 10_000):
+    """Trains a zstd dictionary on a sample of message bodies and writes it to `path`."""
+    from naomi_core.db.chat import MessageModel
+
+    if zstandard is None:
+        raise ValueError("Training a dictionary requires the zstandard package")
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(MessageModel.content, MessageModel.compressed).limit(samples)
+        ).all()
+    corpus = [decode_content(content, compressed).encode() for content, compressed in rows]
+    dictionary = zstandard.train_dictionary(size, corpus)
+    with open(path, "wb") as output:
+        output.write(dictionary.as_bytes())
+
+
+if __name__ == "__main__":
+    from naomi_core.db.core import engine, initialize_db
+
+    parser = argparse.ArgumentParser(description="Manage compressed message storage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subparsers.add_parser("backfill", help="Compress existing large messages")
+    backfill_parser.add_argument("--batch", type=int, default=500, help="Messages per batch")
+    subparsers.add_parser("stats", help="Report storage size and decode latency")
+    train_parser = subparsers.add_parser("train", help="Train a shared zstd dictionary")
+    train_parser.add_argument("path", help="Where to write the dictionary")
+    args = parser.parse_args()
+
+    initialize_db()
+    if args.command == "backfill":
+        print(f"Compressed {backfill(engine, args.batch)} messages")
+    elif args.command == "stats":
+        for key, value in storage_stats(engine).items():
+            print(f"{key}: {value}")
+    else:
+        train_dictionary(engine, args.path)
+        print(f"Wrote dictionary to {args.path}")
@@ -1,47 +1,153 @@
+import itertools
 import os
+import threading
+import time
 from contextlib import contextmanager
-from typing import Any
+from typing import Any, Iterator, Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import Engine, create_engine, inspect
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from naomi_core.db.instrumentation import query_scope
+from naomi_core.db.sharding import ShardRouter, parse_shard_urls
+
 DB_PATH = os.environ.get("DB_PATH", "sqlite:///db.sqlite")
+# Comma separated replica URLs used by session_scope(readonly=True)
+DB_REPLICA_PATHS = [path for path in os.environ.get("DB_REPLICA_PATHS", "").split(",") if path]
+# Either "round_robin" or "least_connections"
+DB_REPLICA_STRATEGY = os.environ.get("DB_REPLICA_STRATEGY", "round_robin")
+# How long reads of a conversation stick to the primary after a write to it (read-your-writes)
+DB_REPLICA_STICKY_SECONDS = float(os.environ.get("DB_REPLICA_STICKY_SECONDS", "0"))
+# Comma separated 'name=url' shards that conversations are spread across by conversation_id
+DB_SHARD_PATHS = parse_shard_urls(os.environ.get("DB_SHARD_PATHS", ""))
 
 Base: Any = declarative_base()
 engine = create_engine(DB_PATH)
 Session = sessionmaker(bind=engine)
 
 
+class ReplicaPool:
+    """Selects a read replica engine and tracks which conversations must read from the primary."""
+
+    STRATEGIES = ("round_robin", "least_connections")
+
+    def __init__(
+        self,
+        engines: list[Engine],
+        strategy: str = "round_robin",
+        sticky_seconds: float = 0.0,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._last_writes: dict[int, float] = {}
+
+    def select(self, conversation_id: Optional[int] = None) -> Optional[Engine]:
+        """Returns the replica to read from, or None if the read should go to the primary."""
+        if not self.engines or self.is_sticky(conversation_id):
+            return None
+        if self.strategy == "least_connections":
+            return min(self.engines, key=_checked_out_connections)
+        return self.engines[next(self._counter) % len(self.engines)]
+
+    def record_write(self, conversation_id: Optional[int]):
+        if conversation_id is None or self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._last_writes[conversation_id] = now
+            expired = [cid for cid, t in self._last_writes.items() if now - t > self.sticky_seconds]
+            for cid in expired:
+                del self._last_writes[cid]
+
+    def is_sticky(self, conversation_id: Optional[int]) -> bool:
+        if conversation_id is None:
+            return False
+        with self._lock:
+            last_write = self._last_writes.get(conversation_id)
+        return last_write is not None and time.monotonic() - last_write <= self.sticky_seconds
+
+
+def _checked_out_connections(replica: Engine) -> int:
+    checkedout = getattr(replica.pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
+
+replicas = ReplicaPool(
+    [create_engine(path) for path in DB_REPLICA_PATHS],
+    DB_REPLICA_STRATEGY,
+    DB_REPLICA_STICKY_SECONDS,
+)
+
+shards: Optional[ShardRouter] = ShardRouter.from_urls(DB_SHARD_PATHS) if DB_SHARD_PATHS else None
+
+
 @contextmanager
-def session_scope():
-    session = Session()
-    try:
-        yield session
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+def _route(readonly: bool, conversation_id: Optional[int]) -> Iterator[Optional[Engine]]:
+    if shards is not None and conversation_id is not None:
+        if readonly:
+            yield shards.engine_for(conversation_id)
+        else:
+            with shards.writing(conversation_id) as shard_engine:
+                yield shard_engine
+    else:
+        yield replicas.select(conversation_id) if readonly else None
+
+
+@contextmanager
+def session_scope(readonly: bool = False, conversation_id: Optional[int] = None):
+    """
+    Provides a transactional session.
+    When shards are configured, passing the conversation_id binds the session to its shard, and
+    a writing scope keeps the conversation from being moved to another shard until it ends.
+    Otherwise read-only scopes are routed to a replica (when configured) and are never committed,
+    and the conversation_id lets writes pin that conversation's subsequent reads to the primary.
+    """
+    with _route(readonly, conversation_id) as routed_engine, query_scope("session_scope"):
+        session = Session(bind=routed_engine) if routed_engine is not None else Session()
+        try:
+            yield session
+            if readonly:
+                session.rollback()
+            else:
+                session.commit()
+                replicas.record_write(conversation_id)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
 
 # Database setup
 def initialize_db():
     import naomi_core.db.agent  # noqa
+    import naomi_core.db.calendar  # noqa
     import naomi_core.db.chat  # noqa
     import naomi_core.db.property  # noqa
     import naomi_core.db.webhook  # noqa
+    from naomi_core.db.migrations import migrate
 
-    Base.metadata.create_all(engine)
+    migrate(engine)
+    if shards is not None:
+        for shard_engine in shards.shards.values():
+            migrate(shard_engine)
+
+    with Session(bind=engine) as session, session.begin():
+        naomi_core.db.agent.get_lead_agent(session)
 
 
 def wipe_db():
+    from naomi_core.db.agent import agent_cache
+
     Base.metadata.drop_all(engine)
+    agent_cache.invalidate()
     initialize_db()
 
 
-# Save message to database
-def get_all_tables():
-    with engine.connect() as connection:
-        result = connection.execute(text("SELECT name, sql FROM sqlite_master WHERE type='table';"))
-        return [(name, sql) for name, sql in result]
+def get_all_tables() -> list[str]:
+    return inspect(engine).get_table_names()
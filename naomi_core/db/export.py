@@ -0,0 +1,120 @@
+"""
+Streaming export and import of conversations as line-delimited JSON.
+
+Each line holds one row: {"table": "message", "row": {...}}. Rows are read with server-side cursors
+in batches and inserted in batches, so memory use does not grow with the conversation size.
+"""
+
+import argparse
+import datetime
+import json
+import sys
+from typing import IO, Any, Iterator, Optional
+
+from sqlalchemy import DateTime, Table, insert, select
+
+from naomi_core.db.chat import conversation_tables
+from naomi_core.db.compression import decode_content
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_conversations(
+    session,
+    output: IO[str],
+    conversation_ids: Optional[list[int]] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    decompress: bool = False,
+) -> int:
+    """
+    Writes conversations (all of them by default) to `output`. Returns the number of rows written.
+    With `decompress`, compressed message bodies are written as plain JSON, e.g. for analytics.
+    """
+    written = 0
+    options = {"stream_results": True, "yield_per": batch_size}
+    for table, key in conversation_tables():
+        query = select(table).order_by(*table.primary_key.columns)
+        if conversation_ids is not None:
+            query = query.where(table.c[key].in_(conversation_ids))
+        result = session.execute(query, execution_options=options)
+        for partition in result.mappings().partitions():
+            lines = []
+            for row in partition:
+                values = {column: _to_json(value) for column, value in row.items()}
+                if decompress and values.get("compressed"):
+                    values["content"] = decode_content(values["content"], True)
+                    values["compressed"] = False
+                lines.append(json.dumps({"table": table.name, "row": values}) + "\n")
+            output.writelines(lines)
+            written += len(lines)
+    return written
+
+
+def import_conversations(session, lines: IO[str], batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    """Inserts the rows of an export in batches. Returns the number of rows imported."""
+    tables = {table.name: table for table, _ in conversation_tables()}
+    pending: dict[str, list[dict[str, Any]]] = {name: [] for name in tables}
+    imported = 0
+    for record in _read_records(lines):
+        table = tables[record["table"]]
+        batch = pending[table.name]
+        batch.append(_from_json(table, record["row"]))
+        if len(batch) >= batch_size:
+            session.execute(insert(table), batch)
+            imported += len(batch)
+            batch.clear()
+    for name, batch in pending.items():
+        if batch:
+            session.execute(insert(tables[name]), batch)
+            imported += len(batch)
+    return imported
+
+
+def _read_records(lines: IO[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _from_json(table: Table, row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        column: (
+            datetime.datetime.fromisoformat(value)
+            if value is not None and isinstance(table.c[column].type, DateTime)
+            else value
+        )
+        for column, value in row.items()
+    }
+
+
+if __name__ == "__main__":
+    from naomi_core.db.core import initialize_db, session_scope
+
+    parser = argparse.ArgumentParser(description="Export or import conversations as JSON lines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Export conversations")
+    export_parser.add_argument("path", help="Output file, or - for stdout")
+    export_parser.add_argument("--conversation", type=int, nargs="*", help="Conversation ids")
+    export_parser.add_argument("--decompress", action="store_true", help="Decompress bodies")
+    import_parser = subparsers.add_parser("import", help="Import conversations")
+    import_parser.add_argument("path", help="Input file, or - for stdin")
+    parser.add_argument("--batch", type=int, default=EXPORT_BATCH_SIZE, help="Rows per batch")
+    args = parser.parse_args()
+
+    initialize_db()
+    with session_scope() as session:
+        if args.command == "export":
+            with open(args.path, "w") if args.path != "-" else sys.stdout as output:
+                count = export_conversations(
+                    session, output, args.conversation, args.batch, args.decompress
+                )
+        else:
+            with open(args.path) if args.path != "-" else sys.stdin as source:
+                count = import_conversations(session, source, args.batch)
+    print(f"{args.command.capitalize()}ed {count} rows", file=sys.stderr)
@@ -0,0 +1,220 @@
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import Engine, event
+
+# Queries slower than this are logged as warnings
+DB_SLOW_QUERY_MS = float(os.environ.get("DB_SLOW_QUERY_MS", "200"))
+# A statement repeated this many times within one session scope is reported as a likely N+1
+DB_N_PLUS_ONE_THRESHOLD = int(os.environ.get("DB_N_PLUS_ONE_THRESHOLD", "10"))
+
+LATENCY_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SCOPE_QUERY_BUCKETS = (1, 2, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        total, result = 0, []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "buckets": dict(self.cumulative())}
+
+
+class QueryProfiler:
+    """
+    Records per-statement latency histograms and per-session-scope query counts for an engine.
+    Attach it with `enable_profiling`, or `attach` for engines other than the default one.
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float = DB_SLOW_QUERY_MS,
+        n_plus_one_threshold: int = DB_N_PLUS_ONE_THRESHOLD,
+    ):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.engines: list[Engine] = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.statements: dict[str, Histogram] = {}
+            self.queries_per_scope = Histogram(SCOPE_QUERY_BUCKETS)
+            self.n_plus_one: list[dict] = []
+
+    def attach(self, engine: Engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+        self.engines.append(engine)
+
+    def detach(self, engine: Engine):
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(engine, "handle_error", self._handle_error)
+        self.engines.remove(engine)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute, so drop its start time here
+        connection = context.connection
+        if connection is not None and connection.info.get("query_start_time"):
+            connection.info["query_start_time"].pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        statement = normalize_statement(statement)
+        with self._lock:
+            histogram = self.statements.get(statement)
+            if histogram is None:
+                histogram = self.statements[statement] = Histogram(LATENCY_BUCKETS_SECONDS)
+            histogram.observe(elapsed)
+
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.statements[statement] += 1
+        if elapsed * 1000 >= self.slow_query_ms:
+            logging.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement}")
+
+    def record_scope(self, scope: "QueryScope"):
+        repeated = {s: n for s, n in scope.statements.items() if n >= self.n_plus_one_threshold}
+        with self._lock:
+            self.queries_per_scope.observe(sum(scope.statements.values()))
+            for statement, count in repeated.items():
+                self.n_plus_one.append(
+                    {"scope": scope.name, "statement": statement, "count": count}
+                )
+        for statement, count in repeated.items():
+            logging.warning(f"Possible N+1 in {scope.name}: {count}x {statement}")
+
+    def to_json(self) -> str:
+        with self._lock:
+            return json.dumps(
+                {
+                    "statements": {s: h.to_dict() for s, h in self.statements.items()},
+                    "queries_per_scope": self.queries_per_scope.to_dict(),
+                    "n_plus_one": list(self.n_plus_one),
+                }
+            )
+
+    def to_prometheus(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format, labelled by operation."""
+        by_operation: dict[str, Histogram] = {}
+        with self._lock:
+            for statement, histogram in self.statements.items():
+                operation = statement.split(" ", 1)[0].upper()
+                merged = by_operation.setdefault(operation, Histogram(LATENCY_BUCKETS_SECONDS))
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.sum += histogram.sum
+                merged.count += histogram.count
+            scopes = self.queries_per_scope
+            n_plus_one = len(self.n_plus_one)
+
+        lines = [
+            "# HELP naomi_db_query_duration_seconds Database statement latency.",
+            "# TYPE naomi_db_query_duration_seconds histogram",
+        ]
+        for operation, histogram in sorted(by_operation.items()):
+            lines += _prometheus_histogram(
+                "naomi_db_query_duration_seconds", histogram, f'operation="{operation}"'
+            )
+        lines += [
+            "# HELP naomi_db_queries_per_scope Statements issued per session scope.",
+            "# TYPE naomi_db_queries_per_scope histogram",
+            *_prometheus_histogram("naomi_db_queries_per_scope", scopes),
+            "# HELP naomi_db_n_plus_one_total Session scopes that repeated a statement.",
+            "# TYPE naomi_db_n_plus_one_total counter",
+            f"naomi_db_n_plus_one_total {n_plus_one}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_histogram(name: str, histogram: Histogram, labels: str = "") -> list[str]:
+    prefix = f"{labels}," if labels else ""
+    suffix = f"{{{labels}}}" if labels else ""
+    lines = [
+        f'{name}_bucket{{{prefix}le="{bound}"}} {count}' for bound, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def normalize_statement(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()
+
+
+class QueryScope:
+    def __init__(self, name: str):
+        self.name = name
+        self.statements: Counter[str] = Counter()
+
+
+_current_scope: ContextVar[Optional[QueryScope]] = ContextVar("query_scope", default=None)
+
+active_profiler: Optional[QueryProfiler] = None
+
+
+@contextmanager
+def query_scope(name: str):
+    """Groups the statements issued inside the block, e.g. a session_scope, for N+1 detection."""
+    profiler = active_profiler
+    if profiler is None:
+        yield
+        return
+    scope = QueryScope(name)
+    token = _current_scope.set(scope)
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+        profiler.record_scope(scope)
+
+
+def enable_profiling(engine: Optional[Engine] = None, **kwargs) -> QueryProfiler:
+    """Opts in to query profiling on the given engine (default: the primary engine)."""
+    global active_profiler
+    if engine is None:
+        from naomi_core.db import core
+
+        engine = core.engine
+    disable_profiling()
+    active_profiler = QueryProfiler(**kwargs)
+    active_profiler.attach(engine)
+    return active_profiler
+
+
+def disable_profiling():
+    global active_profiler
+    if active_profiler is not None:
+        for engine in list(active_profiler.engines):
+            active_profiler.detach(engine)
+        active_profiler = None
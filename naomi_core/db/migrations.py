@@ -0,0 +1,212 @@
+import argparse
+import logging
+from typing import Callable, NamedTuple
+
+from sqlalchemy import Column, Engine, Index, func, inspect, select, update
+from sqlalchemy.schema import CreateIndex
+
+from naomi_core.db.core import Base
+from naomi_core.db.property import PropertyModel
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Engine], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Registers an upgrade step. Steps must be idempotent, since fresh databases get them too."""
+
+    def register(upgrade: Callable[[Engine], None]) -> Callable[[Engine], None]:
+        assert not MIGRATIONS or MIGRATIONS[-1].version < version, "Migrations must be ordered"
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        return upgrade
+
+    return register
+
+
+def head_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(engine: Engine) -> int:
+    if not inspect(engine).has_table(PropertyModel.__tablename__):
+        return 0
+    with engine.connect() as connection:
+        version = connection.execute(
+            select(PropertyModel.value).where(PropertyModel.key == SCHEMA_VERSION_KEY)
+        ).scalar()
+    return int(version) if version is not None else 0
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Brings the schema up to date without touching existing data.
+    Missing tables are created from the models, then every pending migration is applied in order,
+    each recording the new schema version as it completes.
+    """
+    Base.metadata.create_all(engine)
+    version = current_version(engine)
+    for step in MIGRATIONS:
+        if step.version <= version:
+            continue
+        logging.info(f"Applying migration {step.version}: {step.description}")
+        step.upgrade(engine)
+        _set_version(engine, step.version)
+        version = step.version
+    return version
+
+
+def _set_version(engine: Engine, version: int):
+    with engine.begin() as connection:
+        updated = connection.execute(
+            PropertyModel.__table__.update()
+            .where(PropertyModel.key == SCHEMA_VERSION_KEY)
+            .values(value=str(version))
+        ).rowcount
+        if not updated:
+            connection.execute(
+                PropertyModel.__table__.insert().values(key=SCHEMA_VERSION_KEY, value=str(version))
+            )
+
+
+def get_indexes(engine: Engine, table_name: str) -> set[str]:
+    return {str(index["name"]) for index in inspect(engine).get_indexes(table_name)}
+
+
+def get_columns(engine: Engine, table_name: str) -> set[str]:
+    return {column["name"] for column in inspect(engine).get_columns(table_name)}
+
+
+def create_index(engine: Engine, index: Index):
+    """
+    Creates a model-declared index if it is missing.
+    On Postgres the index is built with CREATE INDEX CONCURRENTLY so writes are not blocked.
+    """
+    if index.name in get_indexes(engine, index.table.name):  # type: ignore[union-attr]
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        ddl = str(CreateIndex(index).compile(dialect=connection.dialect))
+        if connection.dialect.name == "postgresql":
+            ddl = ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)
+        connection.exec_driver_sql(ddl)
+
+
+def add_column(engine: Engine, table_name: str, column: Column):
+    """Adds a model-declared column to an existing table if it is missing."""
+    if column.name in get_columns(engine, table_name):
+        return
+    with engine.begin() as connection:
+        column_type = column.type.compile(dialect=connection.dialect)
+        ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"
+        if column.server_default is not None:
+            default = column.server_default.arg  # type: ignore[attr-defined]
+            ddl += f" DEFAULT {_compile_default(default, connection.dialect)}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+        connection.exec_driver_sql(ddl)
+
+
+def set_not_null(engine: Engine, table_name: str, column_name: str):
+    """
+    Adds a NOT NULL constraint to an existing column. SQLite cannot alter a column's constraints,
+    so there the column is only kept filled by its backfill and the model's default.
+    """
+    if engine.dialect.name == "sqlite":
+        return
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET NOT NULL"
+        )
+
+
+def _compile_default(default, dialect) -> str:
+    if isinstance(default, str):
+        return "'" + default.replace("'", "''") + "'"
+    return str(default.compile(dialect=dialect))
+
+
+@migration(1, "Index webhook events by status")
+def _index_webhook_events(engine: Engine):
+    from naomi_core.db.webhook import WebhookEvent
+
+    for index in WebhookEvent.__table__.indexes:
+        create_index(engine, index)
+
+
+@migration(2, "Flag compressed message bodies")
+def _add_message_compressed_flag(engine: Engine):
+    from naomi_core.db.chat import MessageModel
+
+    add_column(engine, MessageModel.__tablename__, MessageModel.__table__.c.compressed)
+
+
+@migration(3, "Denormalize conversation counters for listing")
+def _add_conversation_counters(engine: Engine):
+    from naomi_core.db.chat import Conversation, MessageModel, _now
+
+    table = Conversation.__table__
+    for name in ("message_count", "last_message_id"):
+        add_column(engine, Conversation.__tablename__, table.c[name])
+    # Added nullable, then constrained once backfilled
+    add_column(engine, Conversation.__tablename__, Column("updated_at", table.c.updated_at.type))
+    for index in table.indexes:
+        if index.name == "ix_conversation_updated_at_id":
+            create_index(engine, index)
+    messages = MessageModel.conversation_id == Conversation.id
+    with engine.begin() as connection:
+        connection.execute(
+            update(table).values(
+                message_count=select(func.count()).where(messages).scalar_subquery(),
+                last_message_id=select(func.max(MessageModel.id)).where(messages).scalar_subquery(),
+            )
+        )
+        connection.execute(
+            update(table).where(table.c.updated_at.is_(None)).values(updated_at=_now())
+        )
+    set_not_null(engine, Conversation.__tablename__, "updated_at")
+
+
+@migration(4, "Scope conversations and messages to tenants")
+def _add_tenant_ids(engine: Engine):
+    from naomi_core.db.chat import Conversation, MessageModel
+
+    for model in (Conversation, MessageModel):
+        add_column(engine, model.__tablename__, model.__table__.c.tenant_id)
+        for index in model.__table__.indexes:
+            create_index(engine, index)
+
+
+@migration(5, "Count webhook event processing attempts")
+def _add_webhook_event_attempts(engine: Engine):
+    from naomi_core.db.webhook import WebhookEvent
+
+    add_column(engine, WebhookEvent.__tablename__, WebhookEvent.__table__.c.attempts)
+
+
+@migration(6, "Record when webhook events were claimed")
+def _add_webhook_event_claimed_at(engine: Engine):
+    from naomi_core.db.webhook import WebhookEvent
+
+    add_column(engine, WebhookEvent.__tablename__, WebhookEvent.__table__.c.claimed_at)
+
+
+if __name__ == "__main__":
+    from naomi_core.db.core import engine, initialize_db
+
+    parser = argparse.ArgumentParser(description="NAOMI database schema migrations")
+    parser.add_argument("command", choices=["upgrade", "current", "head"])
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        initialize_db()
+    if args.command == "head":
+        print(head_version())
+    else:
+        print(current_version(engine))
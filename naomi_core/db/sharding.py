@@ -0,0 +1,254 @@
+import argparse
+import bisect
+import hashlib
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import Engine, Table, create_engine, delete, select, union
+
+VIRTUAL_NODES_PER_SHARD = 64
+
+
+class ShardRouter:
+    """
+    Maps conversation ids to shard engines using a consistent-hash ring.
+    Each shard owns many virtual nodes, so adding or removing a shard only remaps
+    roughly 1/N of the conversations.
+
+    Conversations can be moved while the router serves traffic: writes to a conversation hold a
+    lease (see `writing`) that a move fences off, and a moved conversation is rerouted to its new
+    shard until the whole layout is switched with `adopt`.
+    """
+
+    def __init__(self, shards: dict[str, Engine], virtual_nodes: int = VIRTUAL_NODES_PER_SHARD):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.virtual_nodes = virtual_nodes
+        self._condition = threading.Condition()
+        self._writers: Counter[int] = Counter()
+        self._fenced: set[int] = set()
+        self._rerouted: dict[int, Engine] = {}
+        self._set_layout(shards)
+
+    @staticmethod
+    def from_urls(urls: dict[str, str]) -> "ShardRouter":
+        return ShardRouter({name: create_engine(url) for name, url in urls.items()})
+
+    def _set_layout(self, shards: dict[str, Engine]):
+        ring = sorted(
+            (_hash(f"{name}#{node}"), name) for name in shards for node in range(self.virtual_nodes)
+        )
+        self.shards = shards
+        self._ring_hashes = [point for point, _ in ring]
+        self._ring_names = [name for _, name in ring]
+
+    def shard_for(self, conversation_id: int) -> str:
+        """Returns the shard the layout places the conversation on, ignoring reroutes."""
+        position = bisect.bisect(self._ring_hashes, _hash(str(conversation_id)))
+        return self._ring_names[position % len(self._ring_names)]
+
+    def engine_for(self, conversation_id: int) -> Engine:
+        with self._condition:
+            rerouted = self._rerouted.get(conversation_id)
+            return rerouted or self.shards[self.shard_for(conversation_id)]
+
+    @contextmanager
+    def writing(self, conversation_id: int) -> Iterator[Engine]:
+        """
+        Yields the engine to write the conversation to, holding off any move of it until the
+        block ends. Waits for a move already in progress to finish first.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: conversation_id not in self._fenced)
+            self._writers[conversation_id] += 1
+        try:
+            yield self.engine_for(conversation_id)
+        finally:
+            with self._condition:
+                self._writers[conversation_id] -= 1
+                if not self._writers[conversation_id]:
+                    del self._writers[conversation_id]
+                self._condition.notify_all()
+
+    @contextmanager
+    def fence(self, conversation_id: int) -> Iterator[None]:
+        """Blocks new writes to the conversation and waits for those in progress to end."""
+        with self._condition:
+            self._condition.wait_for(lambda: conversation_id not in self._fenced)
+            self._fenced.add(conversation_id)
+            self._condition.wait_for(lambda: not self._writers[conversation_id])
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._fenced.discard(conversation_id)
+                self._condition.notify_all()
+
+    def reroute(self, conversation_id: int, engine: Engine):
+        """Sends every later read and write of the conversation to `engine`."""
+        with self._condition:
+            self._rerouted[conversation_id] = engine
+
+    def adopt(self, other: "ShardRouter"):
+        """Switches to another router's layout at once, dropping reroutes it makes redundant."""
+        with self._condition:
+            self._set_layout(other.shards)
+            self._rerouted = {
+                conversation_id: engine
+                for conversation_id, engine in self._rerouted.items()
+                if not same_database(engine, self.shards[self.shard_for(conversation_id)])
+            }
+
+
+def parse_shard_urls(spec: str) -> dict[str, str]:
+    """Parses 'name=url,name=url' into a mapping of shard names to database URLs."""
+    urls = {}
+    for entry in filter(None, spec.split(",")):
+        name, _, url = entry.partition("=")
+        if not url:
+            raise ValueError(f"Expected 'name=url' for shard, got: {entry}")
+        urls[name.strip()] = url.strip()
+    return urls
+
+
+def same_database(first: Engine, second: Engine) -> bool:
+    """
+    Whether two engines connect to the same database, which separately created engines can.
+    Compares their URLs with the password hidden; in-memory SQLite databases are private to
+    their engine.
+    """
+    if first is second:
+        return True
+    return _database_key(first) is not None and _database_key(first) == _database_key(second)
+
+
+def _database_key(engine: Engine) -> Optional[str]:
+    url = engine.url
+    if url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    ):
+        return None
+    return url.render_as_string(hide_password=True)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+def list_conversation_ids(engine: Engine) -> list[int]:
+    """Lists every conversation id that has any rows on the given database."""
+    from naomi_core.db.chat import conversation_tables
+
+    query = union(*(select(table.c[key]) for table, key in conversation_tables()))
+    with engine.connect() as connection:
+        return sorted(connection.execute(query).scalars())
+
+
+def move_conversation(
+    conversation_id: int,
+    source: Engine,
+    target: Engine,
+    batch_size: int = 500,
+    router: Optional[ShardRouter] = None,
+):
+    """
+    Moves every row of a conversation from one shard to another.
+    Rows are streamed in batches and committed on the target before they are deleted from the
+    source, so the conversation stays readable throughout. Rerunning after a failure is safe.
+    Given the live router, writes to the conversation are fenced off for the duration of the move
+    and the router is switched to the target as soon as the copy is committed, so no write is lost.
+    Raises ValueError if source and target are the same database, which the move would empty.
+    """
+    if same_database(source, target):
+        raise ValueError(
+            f"Cannot move conversation {conversation_id} onto its own database: "
+            f"{source.url.render_as_string(hide_password=True)}"
+        )
+    if router is None:
+        _move_rows(conversation_id, source, target, batch_size)
+        return
+    with router.fence(conversation_id):
+        _move_rows(conversation_id, source, target, batch_size, router)
+
+
+def _move_rows(
+    conversation_id: int,
+    source: Engine,
+    target: Engine,
+    batch_size: int,
+    router: Optional[ShardRouter] = None,
+):
+    from naomi_core.db.chat import conversation_tables
+
+    tables = conversation_tables()
+    with source.connect() as source_connection, target.begin() as target_connection:
+        for table, key in tables:
+            target_connection.execute(delete(table).where(table.c[key] == conversation_id))
+            for batch in _stream_rows(source_connection, table, key, conversation_id, batch_size):
+                target_connection.execute(table.insert(), batch)
+    if router is not None:
+        router.reroute(conversation_id, target)
+
+    with source.begin() as source_connection:
+        for table, key in tables:
+            source_connection.execute(delete(table).where(table.c[key] == conversation_id))
+
+
+def _stream_rows(
+    connection, table: Table, key: str, conversation_id: int, batch_size: int
+) -> Iterator[list[dict]]:
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+        select(table).where(table.c[key] == conversation_id)
+    )
+    for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+
+def rebalance(current: ShardRouter, target: ShardRouter, batch_size: int = 500) -> int:
+    """
+    Moves conversations whose shard differs between two router layouts, one conversation at a time.
+    `current` is fenced and rerouted as conversations move, then switched to the target layout,
+    so passing the live router (naomi_core.db.core.shards) rebalances without downtime.
+    Returns the number of conversations moved.
+    """
+    moved = 0
+    for name, engine in current.shards.items():
+        for conversation_id in list_conversation_ids(engine):
+            destination = target.shard_for(conversation_id)
+            if same_database(target.shards[destination], engine):
+                continue
+            logging.info(f"Moving conversation {conversation_id} from {name} to {destination}")
+            move_conversation(
+                conversation_id, engine, target.shards[destination], batch_size, current
+            )
+            moved += 1
+    current.adopt(target)
+    return moved
+
+
+if __name__ == "__main__":
+    # Writes are only fenced within this process, so stop writers to the shards while it runs
+    parser = argparse.ArgumentParser(description="Rebalance conversations across shards")
+    parser.add_argument("--current", required=True, help="Current layout as 'name=url,...'")
+    parser.add_argument("--target", required=True, help="Target layout as 'name=url,...'")
+    parser.add_argument("--batch", type=int, default=500, help="Rows copied per batch")
+    args = parser.parse_args()
+
+    current_urls = parse_shard_urls(args.current)
+    target_urls = parse_shard_urls(args.target)
+    engines = {url: create_engine(url) for url in {**current_urls, **target_urls}.values()}
+
+    import naomi_core.db.chat  # noqa
+    from naomi_core.db.migrations import migrate
+
+    for shard_engine in engines.values():
+        migrate(shard_engine)
+    moved_count = rebalance(
+        ShardRouter({name: engines[url] for name, url in current_urls.items()}),
+        ShardRouter({name: engines[url] for name, url in target_urls.items()}),
+        args.batch,
+    )
+    print(f"Moved {moved_count} conversations")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String, Text, func
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
 
 from naomi_core.db.core import Base
 
@@ -10,3 +10,9 @@ class WebhookEvent(Base):
     payload = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String, nullable=False, server_default="NEW")
+    # Times processing the event failed
+    attempts = Column(Integer, nullable=False, server_default="0")
+    # When a processor last claimed the event, so claims abandoned by a crash can be taken over
+    claimed_at = Column(DateTime)
+
+    __table_args__ = (Index("ix_event_status_created_at", "status", "created_at"),)
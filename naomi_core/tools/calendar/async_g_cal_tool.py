@@ -0,0 +1,471 @@
+"""
+Asynchronous counterpart of GoogleCalendarTool, for use inside an asyncio event loop.
+
+Requests are sent with an httpx.AsyncClient that pools its connections, so calls from concurrent
+conversations overlap on a few connections instead of each blocking the loop or taking a thread.
+Credentials come from the same process-wide cache as the blocking tool, and are refreshed once
+when the API rejects them. Requests follow the same retry policy and shared rate limiter, and
+writes are applied to the same local event cache.
+"""
+
+import asyncio
+import datetime
+import urllib.parse
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httplib2  # type: ignore[import]
+import httpx
+from googleapiclient.errors import HttpError  # type: ignore[import]
+
+from naomi_core.tools.calendar.g_cal_tool import (
+    DEFAULT_PAGE_SIZE,
+    EventModifiedError,
+    GoogleCalendarTool,
+)
+from naomi_core.tools.calendar.google_auth import (
+    DEFAULT_CALENDAR_SCOPES,
+    GOOGLE_API_TIMEOUT,
+    service_factory,
+)
+from naomi_core.tools.calendar.retry import (
+    DEFAULT_RETRY_POLICY,
+    RetryPolicy,
+    TokenBucket,
+    calendar_rate_limiter,
+)
+
+CALENDAR_API_URL = "https://www.googleapis.com/calendar/v3"
+# Connections each tool keeps to the API
+MAX_CONNECTIONS = 20
+
+
+class AsyncGoogleCalendarTool:
+    """
+    Google Calendar access without blocking the event loop.
+
+    The tool owns an HTTP client; close it with `aclose`, or use the tool as an async context
+    manager.
+    """
+
+    def __init__(
+        self,
+        credentials_path: str,
+        token_path: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limiter: Optional[TokenBucket] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        event_cache: Any = None,
+    ):
+        """
+        Initialize the asynchronous Google Calendar Tool.
+
+        Args:
+            credentials_path: Path to the credentials JSON file
+            token_path: Path to store/read the token file
+            page_size: Number of items to request per page when listing
+            retry_policy: How transient API failures are retried
+            rate_limiter: Token bucket every request takes a token from, by default the one shared
+                by all tools in the process
+            client: HTTP client to send requests with, by default a pooled client for the
+                Calendar API
+            event_cache: CalendarEventCache to apply created, updated and deleted events to,
+                e.g. that of a blocking tool
+        """
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self.page_size = page_size
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter if rate_limiter is not None else calendar_rate_limiter
+        self.event_cache = event_cache
+        self.credentials: Any = None
+        self._client = client
+        # Concurrent first requests load the credentials once
+        self._auth_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=CALENDAR_API_URL,
+                timeout=GOOGLE_API_TIMEOUT,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the HTTP client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncGoogleCalendarTool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def authenticate(self, rejected_token: Optional[str] = None) -> None:
+        """
+        Load credentials from the shared cache, in a worker thread as it may read or refresh.
+
+        Args:
+            rejected_token: Access token the API rejected, to refresh unless already refreshed
+        """
+        self.credentials = await asyncio.to_thread(
+            service_factory.credentials,
+            self.credentials_path,
+            self.token_path,
+            DEFAULT_CALENDAR_SCOPES,
+            rejected_token,
+        )
+
+    async def _token(self, rejected_token: Optional[str] = None) -> str:
+        async with self._auth_lock:
+            if (
+                self.credentials is None
+                or service_factory.expires_soon(self.credentials)
+                or (rejected_token is not None and self.credentials.token == rejected_token)
+            ):
+                await self.authenticate(rejected_token)
+            return self.credentials.token
+
+    async def get_upcoming_events(
+        self, max_results: int = 10, calendar_id: str = "primary"
+    ) -> List[Dict[str, Any]]:
+        """
+        Get upcoming events from the calendar.
+
+        Args:
+            max_results: Maximum number of events to return
+            calendar_id: Calendar ID to fetch events from (default: primary)
+
+        Returns:
+            List of event objects
+        """
+        events = self.iter_events(
+            calendar_id,
+            time_min=datetime.datetime.utcnow(),
+            page_size=min(max_results, self.page_size),
+        )
+        return await _take(events, max_results)
+
+    async def get_events_by_date_range(
+        self,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+        calendar_id: str = "primary",
+        max_results: Optional[int] = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get events within a specific date range.
+
+        Args:
+            start_date: Start date for the range
+            end_date: End date for the range
+            calendar_id: Calendar ID to fetch events from (default: primary)
+            max_results: Maximum number of events to return, or None for all of them
+
+        Returns:
+            List of event objects
+        """
+        events = self.iter_events(
+            calendar_id,
+            time_min=start_date,
+            time_max=end_date,
+            page_size=min(max_results, self.page_size) if max_results else None,
+        )
+        return await _take(events, max_results)
+
+    async def get_calendar_list(self) -> List[Dict[str, Any]]:
+        """
+        Get list of calendars available to the user.
+
+        Returns:
+            List of calendar objects
+        """
+        return [calendar async for calendar in self.iter_calendars()]
+
+    def iter_events(
+        self,
+        calendar_id: str = "primary",
+        time_min: Optional[datetime.datetime] = None,
+        time_max: Optional[datetime.datetime] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Lazily iterate over events ordered by start time, fetching further pages as needed.
+
+        Args:
+            calendar_id: Calendar ID to fetch events from (default: primary)
+            time_min: Only include events ending after this (naive UTC) time
+            time_max: Only include events starting before this (naive UTC) time
+            page_size: Number of events per request (default: the tool's page size)
+
+        Returns:
+            Async iterator of event objects
+        """
+        params: Dict[str, Any] = {
+            "maxResults": page_size or self.page_size,
+            "singleEvents": True,
+            "orderBy": "startTime",
+        }
+        if time_min is not None:
+            params["timeMin"] = time_min.isoformat() + "Z"
+        if time_max is not None:
+            params["timeMax"] = time_max.isoformat() + "Z"
+        path = f"calendars/{_quote(calendar_id)}/events"
+        return self._paginate(path, "calendar.events.list", "fetching events", params)
+
+    def iter_calendars(self, page_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Lazily iterate over the calendars available to the user, fetching further pages as needed.
+
+        Args:
+            page_size: Number of calendars per request (default: the tool's page size)
+
+        Returns:
+            Async iterator of calendar objects
+        """
+        params = {"maxResults": page_size or self.page_size}
+        return self._paginate(
+            "users/me/calendarList", "calendar.calendarList.list", "fetching calendars", params
+        )
+
+    async def get_event_details(
+        self, event_id: str, calendar_id: str = "primary"
+    ) -> Dict[str, Any]:
+        """
+        Get details of a specific event.
+
+        Args:
+            event_id: ID of the event to fetch
+            calendar_id: Calendar ID the event belongs to (default: primary)
+
+        Returns:
+            Event object
+        """
+        try:
+            return await self._request(
+                "GET", _event_path(calendar_id, event_id), "calendar.events.get"
+            )
+        except HttpError as error:
+            raise Exception(f"An error occurred while fetching event details: {error}")
+
+    async def create_event(
+        self,
+        summary: str,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        description: str = "",
+        location: str = "",
+        attendees: Optional[List[Dict[str, str]]] = None,
+        calendar_id: str = "primary",
+        timezone: str = "UTC",
+    ) -> Dict[str, Any]:
+        """
+        Create a new event in the calendar.
+
+        Args:
+            summary: Title of the event
+            start_time: Start time of the event
+            end_time: End time of the event
+            description: Description of the event
+            location: Location of the event
+            attendees: List of attendees, each a dict with at least 'email' key
+            calendar_id: Calendar ID to add event to (default: primary)
+            timezone: Timezone for the event times
+
+        Returns:
+            Created event object
+        """
+        event_body = GoogleCalendarTool._event_body(
+            summary, start_time, end_time, description, location, attendees, timezone
+        )
+        try:
+            event = await self._request(
+                "POST",
+                f"calendars/{_quote(calendar_id)}/events",
+                "calendar.events.insert",
+                json=event_body,
+            )
+        except HttpError as error:
+            raise Exception(f"An error occurred while creating the event: {error}")
+        await self._apply_to_cache(calendar_id, event)
+        return event
+
+    async def update_event(
+        self,
+        event_id: str,
+        summary: Optional[str] = None,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+        description: Optional[str] = None,
+        location: Optional[str] = None,
+        attendees: Optional[List[Dict[str, str]]] = None,
+        calendar_id: str = "primary",
+        timezone: str = "UTC",
+        etag: Optional[str] = None,
+        full_replace: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Update an existing event in the calendar.
+
+        By default only the given fields are sent, in a single patch request. With `full_replace`
+        the event is fetched and the whole modified event is sent back with an update request.
+
+        Args:
+            event_id: ID of the event to update
+            summary: New title of the event
+            start_time: New start time of the event
+            end_time: New end time of the event
+            description: New description of the event
+            location: New location of the event
+            attendees: New list of attendees, each a dict with at least 'email' key
+            calendar_id: Calendar ID the event belongs to (default: primary)
+            timezone: Timezone for the event times
+            etag: Only apply the update if the event still has this ETag (sent as If-Match)
+            full_replace: Replace the whole event instead of patching the changed fields
+
+        Returns:
+            Updated event object
+
+        Raises:
+            EventModifiedError: If the event no longer matches `etag`
+        """
+        changes = GoogleCalendarTool._event_changes(
+            summary, start_time, end_time, description, location, attendees, timezone
+        )
+        path = _event_path(calendar_id, event_id)
+        headers = {"If-Match": etag} if etag is not None else None
+        try:
+            if full_replace:
+                event = await self._request("GET", path, "calendar.events.get")
+                updated_event = await self._request(
+                    "PUT",
+                    path,
+                    "calendar.events.update",
+                    json={**event, **changes},
+                    headers=headers,
+                )
+            else:
+                updated_event = await self._request(
+                    "PATCH", path, "calendar.events.patch", json=changes, headers=headers
+                )
+        except HttpError as error:
+            if error.resp.status == 412:
+                raise EventModifiedError(f"Event {event_id} was modified since {etag}: {error}")
+            raise Exception(f"An error occurred while updating the event: {error}")
+        await self._apply_to_cache(calendar_id, updated_event)
+        return updated_event
+
+    async def delete_event(self, event_id: str, calendar_id: str = "primary") -> bool:
+        """
+        Delete an event from the calendar.
+
+        Args:
+            event_id: ID of the event to delete
+            calendar_id: Calendar ID the event belongs to (default: primary)
+
+        Returns:
+            True if successful
+        """
+        try:
+            await self._request(
+                "DELETE", _event_path(calendar_id, event_id), "calendar.events.delete"
+            )
+        except HttpError as error:
+            raise Exception(f"An error occurred while deleting the event: {error}")
+        await self._apply_to_cache(calendar_id, {"id": event_id, "status": "cancelled"})
+        return True
+
+    async def _apply_to_cache(self, calendar_id: str, event: Dict[str, Any]) -> None:
+        if self.event_cache is not None:
+            # The cache writes to the database, which would block the event loop
+            await asyncio.to_thread(self.event_cache.apply_events, calendar_id, [event])
+
+    async def _paginate(
+        self, path: str, method_id: str, action: str, params: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yields the items of every page of a list request, following nextPageToken."""
+        page_token = None
+        while True:
+            page_params = dict(params, pageToken=page_token) if page_token else params
+            try:
+                response = await self._request("GET", path, method_id, params=page_params)
+            except HttpError as error:
+                raise Exception(f"An error occurred while {action}: {error}")
+            for item in response.get("items", []):
+                yield item
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        method_id: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        """
+        Sends an API request under the rate limiter, retrying transient failures. If the API
+        rejects the credentials, they are refreshed and the request is sent again, once.
+        Error responses raise HttpError, as they do with googleapiclient.
+        """
+        refreshed = False
+
+        async def send() -> Any:
+            nonlocal refreshed
+            token = await self._token()
+            response = await self._send(method, path, token, params, json, headers)
+            if response.status_code == 401 and not refreshed:
+                refreshed = True
+                token = await self._token(rejected_token=token)
+                response = await self._send(method, path, token, params, json, headers)
+            if response.is_error:
+                resp = httplib2.Response({**response.headers, "status": response.status_code})
+                raise HttpError(resp, response.content, uri=str(response.url))
+            return response.json() if response.content else None
+
+        return await self.retry_policy.call_async(
+            send, method_id, self.rate_limiter, conditional="If-Match" in (headers or {})
+        )
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        token: str,
+        params: Optional[Dict[str, Any]],
+        json: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+    ) -> httpx.Response:
+        request_headers = {"Authorization": f"Bearer {token}", **(headers or {})}
+        try:
+            return await self.client.request(
+                method, path, params=params, json=json, headers=request_headers
+            )
+        except httpx.TransportError as error:
+            raise ConnectionError(f"{method} {path} failed: {error}") from error
+
+
+async def _take(items: AsyncIterator[Dict[str, Any]], limit: Optional[int]) -> List[Dict[str, Any]]:
+    taken: List[Dict[str, Any]] = []
+    if limit is not None and limit <= 0:
+        return taken
+    async for item in items:
+        taken.append(item)
+        if limit is not None and len(taken) >= limit:
+            break
+    return taken
+
+
+def _quote(value: str) -> str:
+    return urllib.parse.quote(value, safe="")
+
+
+def _event_path(calendar_id: str, event_id: str) -> str:
+    return f"calendars/{_quote(calendar_id)}/events/{_quote(event_id)}"
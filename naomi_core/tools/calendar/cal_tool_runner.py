@@ -176,6 +176,10 @@ def main():
         "--calendar", default="primary", help="Calendar ID the event belongs to"
     )
     update_parser.add_argument("--timezone", default="UTC", help="Timezone for the event")
+    update_parser.add_argument("--etag", help="Only update if the event still has this ETag")
+    update_parser.add_argument(
+        "--full_replace", action="store_true", help="Replace the whole event instead of patching"
+    )
     update_parser.add_argument("--json", action="store_true", help="Output in JSON format")
 
     # delete event command
@@ -276,6 +280,8 @@ def main():
                 attendees=attendees,
                 calendar_id=args.calendar,
                 timezone=args.timezone,
+                etag=args.etag,
+                full_replace=args.full_replace,
             )
 
             if hasattr(args, "json") and args.json:
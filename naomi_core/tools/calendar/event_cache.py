@@ -0,0 +1,180 @@
+"""
+Local mirror of Google Calendar events, kept current with incremental sync.
+
+The first sync of a calendar lists every event; later syncs pass the stored `nextSyncToken` and
+apply only what changed. Every page is fetched before the changes are written in one short
+transaction, so no database lock is held across API calls. Queries are answered from the
+calendar_event table, syncing first when the mirror is older than the configured maximum age.
+They read on the primary, like the writes the tool applies, so they see events just written.
+"""
+
+import datetime
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+
+from naomi_core.db import codec
+from naomi_core.db.calendar import CalendarEventModel, CalendarSyncStateModel
+from naomi_core.tools.calendar.g_cal_tool import GoogleCalendarTool, SyncTokenExpiredError
+from naomi_core.tools.calendar.intervals import IntervalIndex, parse_event_time
+
+# How stale, in seconds, cached events may be before a query triggers an incremental sync
+CALENDAR_CACHE_MAX_AGE = float(os.environ.get("CALENDAR_CACHE_MAX_AGE", "300"))
+
+
+class CalendarEventCache:
+    def __init__(
+        self,
+        tool: GoogleCalendarTool,
+        max_age: datetime.timedelta = datetime.timedelta(seconds=CALENDAR_CACHE_MAX_AGE),
+    ):
+        self.tool = tool
+        self.max_age = max_age
+        # Per calendar: the sync time an index was built at, and the index
+        self._indexes: Dict[str, Tuple[Optional[datetime.datetime], IntervalIndex]] = {}
+
+    def sync(self, calendar_id: str = "primary") -> int:
+        """
+        Brings the local copy of a calendar up to date, incrementally when possible.
+        Returns the number of changed events applied.
+        """
+        from naomi_core.db.core import session_scope
+
+        with session_scope() as session:
+            sync_token = session.scalar(
+                select(CalendarSyncStateModel.sync_token).where(
+                    CalendarSyncStateModel.calendar_id == calendar_id
+                )
+            )
+        pages = None
+        if sync_token is not None:
+            try:
+                pages = list(self.tool.iter_event_changes(calendar_id, str(sync_token)))
+            except SyncTokenExpiredError:
+                logging.info(f"Sync token of calendar {calendar_id} expired, resyncing")
+        full = pages is None
+        if pages is None:
+            pages = list(self.tool.iter_event_changes(calendar_id, None))
+
+        self._indexes.pop(calendar_id, None)
+        with session_scope() as session:
+            if full:
+                session.execute(
+                    delete(CalendarEventModel).where(CalendarEventModel.calendar_id == calendar_id)
+                )
+            changes = 0
+            next_sync_token = None
+            for page in pages:
+                changes += _apply_events(session, calendar_id, page.get("items", []))
+                next_sync_token = page.get("nextSyncToken", next_sync_token)
+            if next_sync_token is not None:
+                session.merge(
+                    CalendarSyncStateModel(
+                        calendar_id=calendar_id, sync_token=next_sync_token, synced_at=_utcnow()
+                    )
+                )
+            return changes
+
+    def ensure_fresh(self, calendar_id: str = "primary") -> None:
+        from naomi_core.db.core import session_scope
+
+        with session_scope() as session:
+            synced_at = session.scalar(
+                select(CalendarSyncStateModel.synced_at).where(
+                    CalendarSyncStateModel.calendar_id == calendar_id
+                )
+            )
+        if synced_at is None or _utcnow() - synced_at > self.max_age:
+            self.sync(calendar_id)
+
+    def events_between(
+        self,
+        calendar_id: str,
+        start: Optional[datetime.datetime],
+        end: Optional[datetime.datetime],
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the cached events overlapping [start, end), ordered by start time.
+        Times are naive UTC, as elsewhere in GoogleCalendarTool; None leaves a side open.
+        """
+        from naomi_core.db.core import session_scope
+
+        self.ensure_fresh(calendar_id)
+        query = (
+            select(CalendarEventModel.content)
+            .where(CalendarEventModel.calendar_id == calendar_id)
+            .order_by(CalendarEventModel.start, CalendarEventModel.id)
+            .limit(limit)
+        )
+        if start is not None:
+            query = query.where(CalendarEventModel.end > start)
+        if end is not None:
+            query = query.where(CalendarEventModel.start < end)
+        with session_scope() as session:
+            return [codec.loads(content) for content in session.scalars(query)]
+
+    def interval_index(self, calendar_id: str = "primary") -> IntervalIndex[Dict[str, Any]]:
+        """
+        Returns an in-memory interval index of the calendar's cached events, for overlap queries.
+        The index is rebuilt whenever the calendar has been synced or changed since it was built.
+        """
+        from naomi_core.db.core import session_scope
+
+        self.ensure_fresh(calendar_id)
+        with session_scope() as session:
+            synced_at = session.scalar(
+                select(CalendarSyncStateModel.synced_at).where(
+                    CalendarSyncStateModel.calendar_id == calendar_id
+                )
+            )
+            cached = self._indexes.get(calendar_id)
+            if cached is not None and cached[0] == synced_at:
+                return cached[1]
+            rows = session.execute(
+                select(
+                    CalendarEventModel.start, CalendarEventModel.end, CalendarEventModel.content
+                ).where(CalendarEventModel.calendar_id == calendar_id)
+            )
+            index = IntervalIndex(
+                (start, end, codec.loads(content)) for start, end, content in rows
+            )
+        self._indexes[calendar_id] = (synced_at, index)
+        return index
+
+    def apply_events(self, calendar_id: str, events: Iterable[Dict[str, Any]]) -> int:
+        """Applies event changes, e.g. ones just made through the API, to the local copy."""
+        from naomi_core.db.core import session_scope
+
+        self._indexes.pop(calendar_id, None)
+        with session_scope() as session:
+            return _apply_events(session, calendar_id, events)
+
+
+def _apply_events(session, calendar_id: str, events: Iterable[Dict[str, Any]]) -> int:
+    count = 0
+    for event in events:
+        if event.get("status") == "cancelled":
+            session.execute(
+                delete(CalendarEventModel)
+                .where(CalendarEventModel.calendar_id == calendar_id)
+                .where(CalendarEventModel.id == event["id"])
+            )
+        else:
+            session.merge(
+                CalendarEventModel(
+                    calendar_id=calendar_id,
+                    id=event["id"],
+                    start=parse_event_time(event["start"]),
+                    end=parse_event_time(event["end"]),
+                    content=codec.dumps(event),
+                )
+            )
+        count += 1
+    return count
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow()
@@ -1,30 +1,148 @@
 import datetime
-from typing import Any, Dict, List, Optional
+import itertools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
 
 from googleapiclient.errors import HttpError  # type: ignore[import]
+from googleapiclient.http import BatchHttpRequest  # type: ignore[import]
 
-from naomi_core.tools.calendar.google_auth import DEFAULT_CALENDAR_SCOPES, authenticate_google_api
+from naomi_core.tools.calendar.google_auth import DEFAULT_CALENDAR_SCOPES, service_factory
+from naomi_core.tools.calendar.intervals import Interval, free_slots, parse_rfc3339, to_utc
+from naomi_core.tools.calendar.retry import (
+    DEFAULT_RETRY_POLICY,
+    RetryPolicy,
+    TokenBucket,
+    calendar_rate_limiter,
+    is_rate_limited,
+)
+
+# Items requested per page; the API allows up to 2500 events or 250 calendars per page
+DEFAULT_PAGE_SIZE = 250
+
+# The Calendar API accepts at most 50 requests per batch, and 50 calendars per free/busy query
+MAX_BATCH_SIZE = 50
+MAX_FREEBUSY_CALENDARS = 50
+# Threads and per-calendar seconds used by query_calendars
+QUERY_WORKERS = 8
+QUERY_TIMEOUT = 30.0
+
+
+class BatchItemResult(NamedTuple):
+    """Outcome of one request of a batch: the response, or the error it failed with."""
+
+    response: Any = None
+    error: Optional[HttpError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class CalendarQueryResult(NamedTuple):
+    """Events of one calendar from `query_calendars`, or the error fetching them failed with."""
+
+    events: List[Dict[str, Any]]
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class CalendarConflictError(Exception):
+    """An event was not created because it overlaps existing events."""
+
+    def __init__(self, message: str, conflicts: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.conflicts = conflicts
+
+
+class EventModifiedError(Exception):
+    """An update was rejected because the event changed since the given ETag (HTTP 412)."""
+
+
+class FreeBusyUnavailableError(Exception):
+    """Free/busy times of some calendars could not be fetched, so free slots are unknown."""
+
+    def __init__(self, message: str, errors: Dict[str, List[Dict[str, Any]]]):
+        super().__init__(message)
+        self.errors = errors
+
+
+class SyncTokenExpiredError(Exception):
+    """The API no longer accepts a sync token (HTTP 410), so a full sync is required."""
 
 
 class GoogleCalendarTool:
     """Tool for interacting with Google Calendar API."""
 
-    def __init__(self, credentials_path: str, token_path: str):
+    def __init__(
+        self,
+        credentials_path: str,
+        token_path: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cache_max_age: Optional[datetime.timedelta] = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
         """
         Initialize the Google Calendar Tool.
 
         Args:
             credentials_path: Path to the credentials JSON file
             token_path: Path to store/read the token file
+            page_size: Number of items to request per page when listing
+            cache_max_age: If set, answer event queries from a local cache of the calendar that is
+                synced incrementally whenever it is older than this
+            retry_policy: How transient API failures are retried
+            rate_limiter: Token bucket every request takes a token from, by default the one shared
+                by all tools in the process
         """
         self.credentials_path = credentials_path
         self.token_path = token_path
-        self.service: Any = None
+        self.page_size = page_size
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter if rate_limiter is not None else calendar_rate_limiter
+        self._service: Any = None
+        self._local = threading.local()
+        self.event_cache = None
+        if cache_max_age is not None:
+            from naomi_core.tools.calendar.event_cache import CalendarEventCache
+
+            self.event_cache = CalendarEventCache(self, cache_max_age)
+
+    @property
+    def service(self) -> Any:
+        """
+        The API service: one set explicitly, else the current thread's authenticated one, fetched
+        from the factory on every use so its credentials are refreshed before they expire.
+        """
+        if self._service is not None:
+            return self._service
+        if not getattr(self._local, "authenticated", False):
+            return None
+        return self._thread_service()
+
+    @service.setter
+    def service(self, service: Any) -> None:
+        self._service = service
 
     def authenticate(self) -> None:
-        """Authenticate with Google Calendar API."""
-        self.service = authenticate_google_api(
-            self.credentials_path, self.token_path, "calendar", "v3", DEFAULT_CALENDAR_SCOPES
+        """Authenticate with Google Calendar API, using the current thread's shared service."""
+        self._thread_service()
+        self._local.authenticated = True
+
+    def _thread_service(self) -> Any:
+        # query_calendars bounds the socket timeout of its worker threads by theirs
+        return service_factory.service(
+            self.credentials_path,
+            self.token_path,
+            "calendar",
+            "v3",
+            DEFAULT_CALENDAR_SCOPES,
+            timeout=getattr(self._local, "timeout", None),
         )
 
     def get_upcoming_events(
@@ -40,42 +158,222 @@ class GoogleCalendarTool:
         Returns:
             List of event objects
         """
-        if not self.service:
-            self.authenticate()
+        now = datetime.datetime.utcnow()
+        if self.event_cache is not None:
+            return self.event_cache.events_between(calendar_id, now, None, max_results)
+        events = self.iter_events(
+            calendar_id, time_min=now, page_size=min(max_results, self.page_size)
+        )
+        return list(itertools.islice(events, max_results))
+
+    def get_calendar_list(self) -> List[Dict[str, Any]]:
+        """
+        Get list of calendars available to the user.
+
+        Returns:
+            List of calendar objects
+        """
+        return list(self.iter_calendars())
+
+    def iter_events(
+        self,
+        calendar_id: str = "primary",
+        time_min: Optional[datetime.datetime] = None,
+        time_max: Optional[datetime.datetime] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over events ordered by start time, fetching further pages as needed.
+
+        Args:
+            calendar_id: Calendar ID to fetch events from (default: primary)
+            time_min: Only include events ending after this (naive UTC) time
+            time_max: Only include events starting before this (naive UTC) time
+            page_size: Number of events per request (default: the tool's page size)
+
+        Returns:
+            Iterator of event objects
+        """
+        params: Dict[str, Any] = {
+            "calendarId": calendar_id,
+            "maxResults": page_size or self.page_size,
+            "singleEvents": True,
+            "orderBy": "startTime",
+        }
+        if time_min is not None:
+            params["timeMin"] = time_min.isoformat() + "Z"
+        if time_max is not None:
+            params["timeMax"] = time_max.isoformat() + "Z"
+        return self._paginate("events", "fetching events", params)
+
+    def iter_calendars(self, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over the calendars available to the user, fetching further pages as needed.
+
+        Args:
+            page_size: Number of calendars per request (default: the tool's page size)
+
+        Returns:
+            Iterator of calendar objects
+        """
+        params = {"maxResults": page_size or self.page_size}
+        return self._paginate("calendarList", "fetching calendars", params)
+
+    def iter_event_changes(
+        self,
+        calendar_id: str = "primary",
+        sync_token: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over the pages of an event sync.
+
+        Without a sync token every event is listed; with one, only events changed since the sync
+        that returned it, including cancelled ones. The last page carries a `nextSyncToken`.
+
+        Args:
+            calendar_id: Calendar ID to sync events from (default: primary)
+            sync_token: `nextSyncToken` of the previous sync, if any
+            page_size: Number of events per request (default: the tool's page size)
+
+        Returns:
+            Iterator of event list responses
+
+        Raises:
+            SyncTokenExpiredError: If the sync token is no longer valid
+        """
+        params: Dict[str, Any] = {
+            "calendarId": calendar_id,
+            "maxResults": page_size or self.page_size,
+            "singleEvents": True,
+        }
+        if sync_token is not None:
+            params["syncToken"] = sync_token
+        return self._pages("events", "syncing events", params)
 
+    def _execute(self, request: Any, method: Optional[str] = None, cost: float = 1.0) -> Any:
+        """
+        Executes a request under the rate limiter, retrying transient failures until the current
+        thread's deadline, if `query_calendars` set one. If the API rejects the credentials, they
+        are refreshed through the service factory and the request is sent again, once.
+        """
+        method = method or getattr(request, "methodId", None)
+        deadline = getattr(self._local, "deadline", None)
+        conditional = "If-Match" in (getattr(request, "headers", None) or {})
+        token = self._token()
+        if token is not None and isinstance(request, BatchHttpRequest):
+            # googleapiclient refreshes on 401 items of a batch itself, which would bypass the
+            # factory's lock and leave the new token unsaved
+            request._refresh_and_apply_credentials = lambda *_: self._refresh_credentials(token)
         try:
-            now = datetime.datetime.utcnow().isoformat() + "Z"  # 'Z' indicates UTC time
-            events_result = (
-                self.service.events()
-                .list(
-                    calendarId=calendar_id,
-                    timeMin=now,
-                    maxResults=max_results,
-                    singleEvents=True,
-                    orderBy="startTime",
-                )
-                .execute()
+            return self.retry_policy.call(
+                request.execute, method, self.rate_limiter, cost, deadline, conditional
             )
-            return events_result.get("items", [])
-
         except HttpError as error:
-            raise Exception(f"An error occurred while fetching events: {error}")
+            if token is None or error.resp.status != 401:
+                raise
+        self._refresh_credentials(token)
+        return self.retry_policy.call(
+            request.execute, method, self.rate_limiter, cost, deadline, conditional
+        )
 
-    def get_calendar_list(self) -> List[Dict[str, Any]]:
+    def _token(self) -> Optional[str]:
+        """The access token requests are sent with, unless the service was set explicitly."""
+        if self._service is not None or not getattr(self._local, "authenticated", False):
+            return None
+        return service_factory.credentials(
+            self.credentials_path, self.token_path, DEFAULT_CALENDAR_SCOPES
+        ).token
+
+    def _refresh_credentials(self, rejected_token: str) -> None:
+        # Credentials are refreshed in place, so services built on them send the new token
+        service_factory.credentials(
+            self.credentials_path, self.token_path, DEFAULT_CALENDAR_SCOPES, rejected_token
+        )
+
+    def _paginate(
+        self, resource: str, action: str, params: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Yields the items of every page of a resource's list request."""
+        for page in self._pages(resource, action, params):
+            yield from page.get("items", [])
+
+    def _pages(
+        self, resource: str, action: str, params: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Yields every page of a resource's list request, following nextPageToken."""
+        if not self.service:
+            self.authenticate()
+
+        page_token = None
+        while True:
+            page_params = dict(params, pageToken=page_token) if page_token else params
+            try:
+                response = self._execute(getattr(self.service, resource)().list(**page_params))
+            except HttpError as error:
+                if error.resp.status == 410 and "syncToken" in params:
+                    raise SyncTokenExpiredError(f"Sync token expired while {action}: {error}")
+                raise Exception(f"An error occurred while {action}: {error}")
+            yield response
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    def watch_events(
+        self,
+        calendar_id: str,
+        channel_id: str,
+        address: str,
+        token: str,
+        ttl: Optional[datetime.timedelta] = None,
+    ) -> Dict[str, Any]:
         """
-        Get list of calendars available to the user.
+        Open a channel that pushes a notification to `address` whenever the calendar's events
+        change.
+
+        Args:
+            calendar_id: Calendar ID to watch
+            channel_id: Unique ID for the new channel
+            address: HTTPS URL notifications are posted to
+            token: Secret sent back in the X-Goog-Channel-Token header of every notification
+            ttl: How long the channel should live; the API caps and defaults it
 
         Returns:
-            List of calendar objects
+            Channel object, with the watched resourceId and the expiration in epoch milliseconds
+        """
+        if not self.service:
+            self.authenticate()
+
+        body: Dict[str, Any] = {
+            "id": channel_id,
+            "type": "web_hook",
+            "address": address,
+            "token": token,
+        }
+        if ttl is not None:
+            body["params"] = {"ttl": str(int(ttl.total_seconds()))}
+        try:
+            return self._execute(self.service.events().watch(calendarId=calendar_id, body=body))
+        except HttpError as error:
+            raise Exception(f"An error occurred while watching events: {error}")
+
+    def stop_channel(self, channel_id: str, resource_id: str) -> None:
+        """
+        Stop a channel opened with `watch_events`.
+
+        Args:
+            channel_id: ID of the channel
+            resource_id: Resource ID returned when the channel was opened
         """
         if not self.service:
             self.authenticate()
 
         try:
-            calendars_result = self.service.calendarList().list().execute()
-            return calendars_result.get("items", [])
+            self._execute(
+                self.service.channels().stop(body={"id": channel_id, "resourceId": resource_id})
+            )
         except HttpError as error:
-            raise Exception(f"An error occurred while fetching calendars: {error}")
+            raise Exception(f"An error occurred while stopping the channel: {error}")
 
     def get_event_details(self, event_id: str, calendar_id: str = "primary") -> Dict[str, Any]:
         """
@@ -92,7 +390,9 @@ class GoogleCalendarTool:
             self.authenticate()
 
         try:
-            event = self.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+            event = self._execute(
+                self.service.events().get(calendarId=calendar_id, eventId=event_id)
+            )
             return event
         except HttpError as error:
             raise Exception(f"An error occurred while fetching event details: {error}")
@@ -102,7 +402,7 @@ class GoogleCalendarTool:
         start_date: datetime.datetime,
         end_date: datetime.datetime,
         calendar_id: str = "primary",
-        max_results: int = 100,
+        max_results: Optional[int] = 100,
     ) -> List[Dict[str, Any]]:
         """
         Get events within a specific date range.
@@ -111,34 +411,169 @@ class GoogleCalendarTool:
             start_date: Start date for the range
             end_date: End date for the range
             calendar_id: Calendar ID to fetch events from (default: primary)
-            max_results: Maximum number of events to return
+            max_results: Maximum number of events to return, or None for all of them
 
         Returns:
             List of event objects
         """
+        if self.event_cache is not None:
+            return self.event_cache.events_between(calendar_id, start_date, end_date, max_results)
+        events = self.iter_events(
+            calendar_id,
+            time_min=start_date,
+            time_max=end_date,
+            page_size=min(max_results, self.page_size) if max_results else None,
+        )
+        return list(itertools.islice(events, max_results))
+
+    def query_calendars(
+        self,
+        calendar_ids: List[str],
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+        max_results: Optional[int] = None,
+        timeout: float = QUERY_TIMEOUT,
+    ) -> Dict[str, CalendarQueryResult]:
+        """
+        Get events within a date range from several calendars concurrently.
+
+        Args:
+            calendar_ids: Calendar IDs to fetch events from
+            start_date: Start date for the range
+            end_date: End date for the range
+            max_results: Maximum number of events to return per calendar, or None for all of them
+            timeout: Seconds each calendar may take, counted from when its query starts, before
+                it is reported as timed out; its query then stops retrying
+
+        Returns:
+            One result per calendar ID, holding its events or the error fetching them failed with
+        """
         if not self.service:
             self.authenticate()
 
+        started: Dict[str, float] = {}
+
+        def query(calendar_id: str) -> List[Dict[str, Any]]:
+            started[calendar_id] = time.monotonic()
+            self._local.deadline = started[calendar_id] + timeout
+            self._local.timeout = timeout
+            try:
+                return self.get_events_by_date_range(start_date, end_date, calendar_id, max_results)
+            finally:
+                self._local.deadline = self._local.timeout = None
+
+        results: Dict[str, CalendarQueryResult] = {}
+        executor = ThreadPoolExecutor(max_workers=min(QUERY_WORKERS, len(calendar_ids) or 1))
         try:
-            time_min = start_date.isoformat() + "Z"
-            time_max = end_date.isoformat() + "Z"
-
-            events_result = (
-                self.service.events()
-                .list(
-                    calendarId=calendar_id,
-                    timeMin=time_min,
-                    timeMax=time_max,
-                    maxResults=max_results,
-                    singleEvents=True,
-                    orderBy="startTime",
+            pending: Dict[Future, str] = {
+                executor.submit(query, calendar_id): calendar_id for calendar_id in calendar_ids
+            }
+            while pending:
+                now = time.monotonic()
+                for future, calendar_id in list(pending.items()):
+                    if calendar_id in started and now >= started[calendar_id] + timeout:
+                        del pending[future]
+                        error = TimeoutError(f"Querying calendar {calendar_id} timed out")
+                        results[calendar_id] = CalendarQueryResult([], error)
+                if not pending:
+                    break
+                # Calendars still queued have not started their timeout yet
+                deadlines = [started[c] + timeout for c in pending.values() if c in started]
+                done, _ = wait(
+                    pending,
+                    timeout=min(deadlines, default=now + timeout) - now,
+                    return_when=FIRST_COMPLETED,
                 )
-                .execute()
+                for future in done:
+                    calendar_id = pending.pop(future)
+                    try:
+                        results[calendar_id] = CalendarQueryResult(future.result())
+                    except Exception as error:
+                        results[calendar_id] = CalendarQueryResult([], error)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return {calendar_id: results[calendar_id] for calendar_id in calendar_ids}
+
+    def find_free_slots(
+        self,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+        duration: datetime.timedelta,
+        calendar_ids: Optional[List[str]] = None,
+    ) -> List[Interval]:
+        """
+        Find the time slots within a range when none of the calendars are busy.
+
+        Args:
+            start_date: Start of the range to search (naive UTC)
+            end_date: End of the range to search (naive UTC)
+            duration: Minimum length of a slot
+            calendar_ids: Calendars to check (default: primary)
+
+        Returns:
+            List of free (start, end) slots of at least `duration`, in order
+
+        Raises:
+            FreeBusyUnavailableError: If the free/busy times of any calendar could not be fetched
+        """
+        if not self.service:
+            self.authenticate()
+
+        calendar_ids = calendar_ids or ["primary"]
+        busy: List[Interval] = []
+        errors: Dict[str, List[Dict[str, Any]]] = {}
+        for offset in range(0, len(calendar_ids), MAX_FREEBUSY_CALENDARS):
+            chunk = calendar_ids[offset : offset + MAX_FREEBUSY_CALENDARS]  # noqa: E203
+            body = {
+                "timeMin": start_date.isoformat() + "Z",
+                "timeMax": end_date.isoformat() + "Z",
+                "items": [{"id": calendar_id} for calendar_id in chunk],
+            }
+            try:
+                response = self._execute(self.service.freebusy().query(body=body))
+            except HttpError as error:
+                raise Exception(f"An error occurred while fetching free/busy times: {error}")
+            for calendar_id, calendar in response.get("calendars", {}).items():
+                if calendar.get("errors"):
+                    errors[calendar_id] = calendar["errors"]
+                busy.extend(
+                    (parse_rfc3339(period["start"]), parse_rfc3339(period["end"]))
+                    for period in calendar.get("busy", [])
+                )
+        if errors:
+            raise FreeBusyUnavailableError(
+                f"Free/busy times unavailable for calendars: {', '.join(errors)}", errors
             )
-            return events_result.get("items", [])
+        return free_slots(busy, start_date, end_date, duration)
 
-        except HttpError as error:
-            raise Exception(f"An error occurred while fetching events: {error}")
+    def check_conflicts(
+        self,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        calendar_id: str = "primary",
+        timezone: str = "UTC",
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the events that overlap a time range. Events marked as free (transparent) are ignored.
+
+        With an event cache this is answered from an in-memory interval index of the cached events,
+        otherwise the range is fetched from the API.
+
+        Args:
+            start_time: Start of the range
+            end_time: End of the range
+            calendar_id: Calendar ID to check (default: primary)
+            timezone: Timezone of naive start and end times
+
+        Returns:
+            List of overlapping event objects, ordered by start time
+        """
+        start, end = to_utc(start_time, timezone), to_utc(end_time, timezone)
+        if self.event_cache is not None:
+            events = self.event_cache.interval_index(calendar_id).overlapping(start, end)
+        else:
+            events = list(self.iter_events(calendar_id, time_min=start, time_max=end))
+        return [event for event in events if event.get("transparency") != "transparent"]
 
     def format_event_time(self, event: Dict[str, Any]) -> str:
         """
@@ -163,6 +598,7 @@ class GoogleCalendarTool:
         attendees: Optional[List[Dict[str, str]]] = None,
         calendar_id: str = "primary",
         timezone: str = "UTC",
+        reject_on_conflict: bool = False,
     ) -> Dict[str, Any]:
         """
         Create a new event in the calendar.
@@ -176,16 +612,48 @@ class GoogleCalendarTool:
             attendees: List of attendees, each a dict with at least 'email' key
             calendar_id: Calendar ID to add event to (default: primary)
             timezone: Timezone for the event times
+            reject_on_conflict: Don't create the event if it overlaps existing events
 
         Returns:
             Created event object
+
+        Raises:
+            CalendarConflictError: If `reject_on_conflict` is set and the event overlaps others
         """
         if not self.service:
             self.authenticate()
 
-        if attendees is None:
-            attendees = []
+        if reject_on_conflict:
+            conflicts = self.check_conflicts(start_time, end_time, calendar_id, timezone)
+            if conflicts:
+                summaries = ", ".join(event.get("summary", event["id"]) for event in conflicts)
+                raise CalendarConflictError(f"Event conflicts with: {summaries}", conflicts)
 
+        event_body = self._event_body(
+            summary, start_time, end_time, description, location, attendees, timezone
+        )
+
+        try:
+            event = self._execute(
+                self.service.events().insert(calendarId=calendar_id, body=event_body)
+            )
+            if self.event_cache is not None:
+                self.event_cache.apply_events(calendar_id, [event])
+
+            return event
+        except HttpError as error:
+            raise Exception(f"An error occurred while creating the event: {error}")
+
+    @staticmethod
+    def _event_body(
+        summary: str,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        description: str = "",
+        location: str = "",
+        attendees: Optional[List[Dict[str, str]]] = None,
+        timezone: str = "UTC",
+    ) -> Dict[str, Any]:
         event_body: Dict[str, Any] = {
             "summary": summary,
             "location": location,
@@ -203,12 +671,132 @@ class GoogleCalendarTool:
         if attendees:
             event_body["attendees"] = attendees.copy()
 
-        try:
-            event = self.service.events().insert(calendarId=calendar_id, body=event_body).execute()
+        return event_body
 
-            return event
-        except HttpError as error:
-            raise Exception(f"An error occurred while creating the event: {error}")
+    def get_events_details(
+        self, event_ids: List[str], calendar_id: str = "primary"
+    ) -> List[BatchItemResult]:
+        """
+        Get details of several events using batched requests.
+
+        Args:
+            event_ids: IDs of the events to fetch
+            calendar_id: Calendar ID the events belong to (default: primary)
+
+        Returns:
+            One result per event ID, in order, holding the event object or the error
+        """
+        if not self.service:
+            self.authenticate()
+
+        events = self.service.events()
+        return self._execute_batch(
+            [events.get(calendarId=calendar_id, eventId=event_id) for event_id in event_ids]
+        )
+
+    def create_events(
+        self, events: List[Dict[str, Any]], calendar_id: str = "primary"
+    ) -> List[BatchItemResult]:
+        """
+        Create several events using batched requests.
+
+        Args:
+            events: Keyword arguments of `create_event` for each event, e.g.
+                {"summary": ..., "start_time": ..., "end_time": ...}
+            calendar_id: Calendar ID to add the events to (default: primary)
+
+        Returns:
+            One result per event, in order, holding the created event object or the error
+        """
+        if not self.service:
+            self.authenticate()
+
+        requests = [
+            self.service.events().insert(calendarId=calendar_id, body=self._event_body(**event))
+            for event in events
+        ]
+        results = self._execute_batch(requests)
+        if self.event_cache is not None:
+            created = [result.response for result in results if result.ok]
+            self.event_cache.apply_events(calendar_id, created)
+        return results
+
+    def delete_events(
+        self, event_ids: List[str], calendar_id: str = "primary"
+    ) -> List[BatchItemResult]:
+        """
+        Delete several events using batched requests.
+
+        Args:
+            event_ids: IDs of the events to delete
+            calendar_id: Calendar ID the events belong to (default: primary)
+
+        Returns:
+            One result per event ID, in order, with the error of any that failed
+        """
+        if not self.service:
+            self.authenticate()
+
+        events = self.service.events()
+        results = self._execute_batch(
+            [events.delete(calendarId=calendar_id, eventId=event_id) for event_id in event_ids]
+        )
+        if self.event_cache is not None:
+            deleted = [
+                {"id": event_id, "status": "cancelled"}
+                for event_id, result in zip(event_ids, results)
+                if result.ok
+            ]
+            self.event_cache.apply_events(calendar_id, deleted)
+        return results
+
+    def _execute_batch(self, requests: List[Any]) -> List[BatchItemResult]:
+        """
+        Executes requests in batches of up to MAX_BATCH_SIZE, collecting each outcome. Requests
+        that were rate limited are sent again in later batches, as often as the retry policy allows.
+        """
+        results: Dict[int, BatchItemResult] = {}
+        # Every request calls the same method, which decides whether to retry
+        method = getattr(requests[0], "methodId", None) if requests else None
+        pending = list(range(len(requests)))
+        attempt = 0
+        while pending:
+            attempt += 1
+            self._send_batches(requests, pending, method, results)
+            retries: Dict[int, float] = {}
+            for index in pending:
+                error = results[index].error
+                if error is None or not is_rate_limited(error):
+                    continue
+                delay = self.retry_policy.retry_delay(
+                    error, attempt, method, getattr(self._local, "deadline", None)
+                )
+                if delay is not None:
+                    retries[index] = delay
+            pending = list(retries)
+            if retries:
+                self.retry_policy.sleep(max(retries.values()))
+        return [results[index] for index in range(len(requests))]
+
+    def _send_batches(
+        self,
+        requests: List[Any],
+        indexes: List[int],
+        method: Optional[str],
+        results: Dict[int, BatchItemResult],
+    ) -> None:
+        def collect(request_id: str, response: Any, exception: Optional[HttpError]):
+            results[int(request_id)] = BatchItemResult(response, exception)
+
+        for offset in range(0, len(indexes), MAX_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=collect)
+            chunk = list(itertools.islice(indexes, offset, offset + MAX_BATCH_SIZE))
+            for index in chunk:
+                batch.add(requests[index], request_id=str(index))
+            try:
+                self._execute(batch, method, cost=len(chunk))
+            except HttpError as error:
+                raise Exception(f"An error occurred while executing a batch request: {error}")
 
     def update_event(
         self,
@@ -221,10 +809,15 @@ class GoogleCalendarTool:
         attendees: Optional[List[Dict[str, str]]] = None,
         calendar_id: str = "primary",
         timezone: str = "UTC",
+        etag: Optional[str] = None,
+        full_replace: bool = False,
     ) -> Dict[str, Any]:
         """
         Update an existing event in the calendar.
 
+        By default only the given fields are sent, in a single patch request. With `full_replace`
+        the event is fetched and the whole modified event is sent back with an update request.
+
         Args:
             event_id: ID of the event to update
             summary: New title of the event
@@ -235,55 +828,83 @@ class GoogleCalendarTool:
             attendees: New list of attendees, each a dict with at least 'email' key
             calendar_id: Calendar ID the event belongs to (default: primary)
             timezone: Timezone for the event times
+            etag: Only apply the update if the event still has this ETag (sent as If-Match)
+            full_replace: Replace the whole event instead of patching the changed fields
 
         Returns:
             Updated event object
+
+        Raises:
+            EventModifiedError: If the event no longer matches `etag`
         """
         if not self.service:
             self.authenticate()
 
-        # First get the existing event
+        changes = self._event_changes(
+            summary, start_time, end_time, description, location, attendees, timezone
+        )
+
         try:
-            event: Dict[str, Any] = (
-                self.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-            )
+            if full_replace:
+                event: Dict[str, Any] = self._execute(
+                    self.service.events().get(calendarId=calendar_id, eventId=event_id)
+                )
+                request = self.service.events().update(
+                    calendarId=calendar_id, eventId=event_id, body={**event, **changes}
+                )
+            else:
+                request = self.service.events().patch(
+                    calendarId=calendar_id, eventId=event_id, body=changes
+                )
+            if etag is not None:
+                request.headers["If-Match"] = etag
+            updated_event = self._execute(request)
+            if self.event_cache is not None:
+                self.event_cache.apply_events(calendar_id, [updated_event])
 
-            # Update fields if provided
-            if summary is not None:
-                event["summary"] = summary
+            return updated_event
 
-            if description is not None:
-                event["description"] = description
+        except HttpError as error:
+            if error.resp.status == 412:
+                raise EventModifiedError(f"Event {event_id} was modified since {etag}: {error}")
+            raise Exception(f"An error occurred while updating the event: {error}")
 
-            if location is not None:
-                event["location"] = location
+    @staticmethod
+    def _event_changes(
+        summary: Optional[str] = None,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+        description: Optional[str] = None,
+        location: Optional[str] = None,
+        attendees: Optional[List[Dict[str, str]]] = None,
+        timezone: str = "UTC",
+    ) -> Dict[str, Any]:
+        changes: Dict[str, Any] = {}
+        if summary is not None:
+            changes["summary"] = summary
 
-            if start_time is not None:
-                event["start"] = {
-                    "dateTime": start_time.isoformat(),
-                    "timeZone": timezone,
-                }
+        if description is not None:
+            changes["description"] = description
 
-            if end_time is not None:
-                event["end"] = {
-                    "dateTime": end_time.isoformat(),
-                    "timeZone": timezone,
-                }
+        if location is not None:
+            changes["location"] = location
 
-            if attendees is not None:
-                event["attendees"] = attendees.copy()
+        if start_time is not None:
+            changes["start"] = {
+                "dateTime": start_time.isoformat(),
+                "timeZone": timezone,
+            }
 
-            # Update the event
-            updated_event = (
-                self.service.events()
-                .update(calendarId=calendar_id, eventId=event_id, body=event)
-                .execute()
-            )
+        if end_time is not None:
+            changes["end"] = {
+                "dateTime": end_time.isoformat(),
+                "timeZone": timezone,
+            }
 
-            return updated_event
+        if attendees is not None:
+            changes["attendees"] = attendees.copy()
 
-        except HttpError as error:
-            raise Exception(f"An error occurred while updating the event: {error}")
+        return changes
 
     def delete_event(self, event_id: str, calendar_id: str = "primary") -> bool:
         """
@@ -300,7 +921,11 @@ class GoogleCalendarTool:
             self.authenticate()
 
         try:
-            self.service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+            self._execute(self.service.events().delete(calendarId=calendar_id, eventId=event_id))
+            if self.event_cache is not None:
+                self.event_cache.apply_events(
+                    calendar_id, [{"id": event_id, "status": "cancelled"}]
+                )
 
             return True
 
@@ -1,13 +1,21 @@
+import datetime
 import os.path
-from typing import Any, List
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
+import httplib2  # type: ignore[import]
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp  # type: ignore[import]
 from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore[import]
 from googleapiclient.discovery import build  # type: ignore[import]
 
 # Default scopes for Google Calendar
 DEFAULT_CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+# Socket timeout, in seconds, of the HTTP connections of shared services
+GOOGLE_API_TIMEOUT = float(os.environ.get("GOOGLE_API_TIMEOUT", "60"))
+# Cached credentials are refreshed this long before their access token expires
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
 
 
 def authenticate_google_api(
@@ -30,7 +38,23 @@ def authenticate_google_api(
     Returns:
         Built service for the specified API
     """
+    creds = load_credentials(credentials_path, token_path, scopes)
+    return build(api_name, api_version, credentials=creds)
+
+
+def load_credentials(credentials_path: str, token_path: str, scopes: List[str]) -> Any:
+    """
+    Load credentials from the token file, refreshing them or running the authorization flow if
+    they are not valid.
 
+    Args:
+        credentials_path: Path to the credentials JSON file
+        token_path: Path to store/read the token file
+        scopes: List of OAuth scopes to request
+
+    Returns:
+        Valid credentials
+    """
     creds = None
     # The token file stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first time.
@@ -52,9 +76,122 @@ def authenticate_google_api(
             creds = flow.run_local_server(port=0)
 
         # Save the credentials for the next run
-        # Ensure the directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(token_path)), exist_ok=True)
-        with open(token_path, "w") as token:
-            token.write(creds.to_json())
+        _save_token(token_path, creds)
 
-    return build(api_name, api_version, credentials=creds)
+    return creds
+
+
+def _save_token(token_path: str, creds: Any) -> None:
+    # Ensure the directory exists
+    os.makedirs(os.path.dirname(os.path.abspath(token_path)), exist_ok=True)
+    with open(token_path, "w") as token:
+        token.write(creds.to_json())
+
+
+class GoogleServiceFactory:
+    """
+    Process-wide source of Google API services.
+
+    Credentials are read from each token file once and kept in memory, refreshed shortly before
+    they expire, checked every time a service is asked for. Loading and refreshing hold a lock per
+    token file, so threads using other token files are not held up. Services are built from the
+    discovery documents bundled with googleapiclient, so no discovery request is made, and each
+    thread gets its own service since the underlying httplib2 transport is not thread-safe. Their
+    transport does not refresh credentials itself, as it would do so unlocked and unsaved: callers
+    refresh credentials the API rejected with `credentials(..., rejected_token=...)` instead.
+    """
+
+    def __init__(
+        self,
+        refresh_margin: datetime.timedelta = TOKEN_REFRESH_MARGIN,
+        timeout: float = GOOGLE_API_TIMEOUT,
+    ):
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        # Guards the dicts below; each token file's credentials are loaded under their own lock
+        self._lock = threading.Lock()
+        self._credentials: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+        self._key_locks: Dict[Tuple[str, Tuple[str, ...]], threading.Lock] = {}
+        self._local = threading.local()
+
+    def credentials(
+        self,
+        credentials_path: str,
+        token_path: str,
+        scopes: List[str],
+        rejected_token: Optional[str] = None,
+    ) -> Any:
+        """
+        Returns the cached credentials of a token file, refreshing them if they expire soon.
+
+        Args:
+            rejected_token: Access token the API rejected; credentials still holding it are
+                refreshed, those another caller refreshed meanwhile are returned as they are
+        """
+        key = (os.path.abspath(token_path), tuple(scopes))
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+            creds = self._credentials.get(key)
+        if creds is not None and not self._needs_refresh(creds, rejected_token):
+            return creds
+        with key_lock:
+            with self._lock:
+                creds = self._credentials.get(key)
+            if creds is None:
+                creds = load_credentials(credentials_path, token_path, scopes)
+                with self._lock:
+                    self._credentials[key] = creds
+            elif self._needs_refresh(creds, rejected_token):
+                creds.refresh(Request())
+                _save_token(token_path, creds)
+            return creds
+
+    def _needs_refresh(self, creds: Any, rejected_token: Optional[str] = None) -> bool:
+        if not creds.refresh_token:
+            return False
+        rejected = rejected_token is not None and creds.token == rejected_token
+        return rejected or not creds.valid or self.expires_soon(creds)
+
+    def service(
+        self,
+        credentials_path: str,
+        token_path: str,
+        api_name: str,
+        api_version: str,
+        scopes: List[str],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Returns the current thread's service for an API, building it on first use. Call it for
+        every use of the service, so its credentials are refreshed before they expire.
+
+        Args:
+            timeout: Socket timeout of the service's transport, if shorter than the factory's
+        """
+        creds = self.credentials(credentials_path, token_path, scopes)
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        services = self._local.__dict__.setdefault("services", {})
+        key = (api_name, api_version, os.path.abspath(token_path), tuple(scopes), timeout)
+        cached = services.get(key)
+        if cached is None or cached[0] is not creds:
+            http = AuthorizedHttp(
+                creds, http=httplib2.Http(timeout=timeout), refresh_status_codes=()
+            )
+            service = build(api_name, api_version, http=http, static_discovery=True)
+            cached = services[key] = (creds, service)
+        return cached[1]
+
+    def clear(self) -> None:
+        """Forgets all cached credentials and services."""
+        with self._lock:
+            self._credentials.clear()
+            self._key_locks.clear()
+            self._local = threading.local()
+
+    def expires_soon(self, creds: Any) -> bool:
+        """Whether credentials expire within the refresh margin."""
+        expiry = creds.expiry
+        return expiry is not None and expiry - datetime.datetime.utcnow() < self.refresh_margin
+
+
+service_factory = GoogleServiceFactory()
@@ -0,0 +1,117 @@
+"""
+Time interval helpers for calendar queries. Times are naive UTC datetimes, as elsewhere in the
+calendar tools, and intervals are half-open: (start, end) covers start <= t < end.
+"""
+
+import datetime
+import itertools
+from typing import Dict, Generic, Iterable, List, Tuple, TypeVar
+from zoneinfo import ZoneInfo
+
+Interval = Tuple[datetime.datetime, datetime.datetime]
+T = TypeVar("T")
+
+
+def parse_rfc3339(value: str) -> datetime.datetime:
+    """Parses an API timestamp such as "2025-01-01T10:00:00Z" into naive UTC."""
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def parse_event_time(value: Dict[str, str]) -> datetime.datetime:
+    """Converts an event's start or end to naive UTC. All-day events start at midnight UTC."""
+    if "dateTime" not in value:
+        return datetime.datetime.fromisoformat(value["date"])
+    return parse_rfc3339(value["dateTime"])
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merges overlapping or touching intervals with a sort and a single sweep."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_slots(
+    busy: Iterable[Interval],
+    start: datetime.datetime,
+    end: datetime.datetime,
+    duration: datetime.timedelta,
+) -> List[Interval]:
+    """Returns the gaps of at least `duration` between busy intervals within [start, end)."""
+    slots: List[Interval] = []
+    cursor = start
+    for busy_start, busy_end in merge_intervals(busy):
+        if busy_start >= end:
+            break
+        if busy_start - cursor >= duration:
+            slots.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if end - cursor >= duration:
+        slots.append((cursor, end))
+    return slots
+
+
+def to_utc(value: datetime.datetime, timezone: str = "UTC") -> datetime.datetime:
+    """Converts a time to naive UTC, reading naive times as local to `timezone`."""
+    if value.tzinfo is None:
+        if timezone == "UTC":
+            return value
+        value = value.replace(tzinfo=ZoneInfo(timezone))
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class _Node(Generic[T]):
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, items: List[Tuple[datetime.datetime, datetime.datetime, T]]):
+        self.center = sorted(start for start, _, _ in items)[len(items) // 2]
+        here = [item for item in items if item[0] <= self.center < item[1]]
+        self.by_start = sorted(here, key=lambda item: item[0])
+        self.by_end = sorted(here, key=lambda item: item[1], reverse=True)
+        left = [item for item in items if item[1] <= self.center]
+        right = [item for item in items if item[0] > self.center]
+        self.left = _Node(left) if left else None
+        self.right = _Node(right) if right else None
+
+
+class IntervalIndex(Generic[T]):
+    """
+    Static centered interval tree over (start, end, value) items.
+    Building takes O(n log^2 n); finding the k items overlapping a range takes O(log n + k), plus
+    sorting those k items.
+    Empty intervals never overlap anything and are left out.
+    """
+
+    def __init__(self, items: Iterable[Tuple[datetime.datetime, datetime.datetime, T]]):
+        items = [item for item in items if item[0] < item[1]]
+        self._root = _Node(items) if items else None
+        self.size = len(items)
+
+    def overlapping(self, start: datetime.datetime, end: datetime.datetime) -> List[T]:
+        """Returns the values of the items overlapping [start, end), ordered by start."""
+        found: List[Tuple[datetime.datetime, datetime.datetime, T]] = []
+        nodes = [self._root] if self._root is not None and start < end else []
+        while nodes:
+            node = nodes.pop()
+            if end <= node.center:
+                # Every item here ends after the center, so only its start can rule it out
+                found.extend(itertools.takewhile(lambda item: item[0] < end, node.by_start))
+                next_nodes = [node.left]
+            elif start > node.center:
+                # Every item here starts before the range, so only its end can rule it out
+                found.extend(itertools.takewhile(lambda item: item[1] > start, node.by_end))
+                next_nodes = [node.right]
+            else:
+                found.extend(node.by_start)
+                next_nodes = [node.left, node.right]
+            nodes.extend(child for child in next_nodes if child is not None)
+        found.sort(key=lambda item: item[0])
+        return [value for _, _, value in found]
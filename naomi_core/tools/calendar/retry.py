@@ -0,0 +1,267 @@
+"""
+Retries and client-side rate limiting for Google API calls.
+
+Requests that failed for a transient reason (rate limiting, a server error, or a dropped, refused or
+broken connection) are retried with exponential backoff and full jitter, or after the delay the
+server asked for with Retry-After. Every attempt first takes a token from a token bucket, so bursts
+of calls are spread out to stay under quota instead of being rejected and retried all at once.
+"""
+
+import asyncio
+import datetime
+import email.utils
+import logging
+import os
+import random
+import ssl
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httplib2  # type: ignore[import]
+from googleapiclient.errors import HttpError  # type: ignore[import]
+
+# Average requests per second, and burst size, allowed by the shared Calendar rate limiter
+CALENDAR_RATE_LIMIT = float(os.environ.get("CALENDAR_RATE_LIMIT", "10"))
+CALENDAR_RATE_BURST = float(os.environ.get("CALENDAR_RATE_BURST", "20"))
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Methods that may have taken effect when the server failed, so are only retried when rate limited
+NON_IDEMPOTENT_METHODS = {
+    "calendar.events.import",
+    "calendar.events.insert",
+    "calendar.events.quickAdd",
+}
+# Methods that are only retried when rate limited if sent with If-Match, as a retry of an update
+# that took effect would then fail its precondition
+CONDITIONAL_METHODS = {"calendar.events.patch", "calendar.events.update"}
+# Methods whose retry failing with 404 or 410 means an earlier attempt that failed took effect
+DELETE_METHODS = {
+    "calendar.acl.delete",
+    "calendar.calendarList.delete",
+    "calendar.calendars.delete",
+    "calendar.events.delete",
+}
+GONE_STATUSES = {404, 410}
+# Errors of requests that may succeed when retried; httplib2 raises its own errors, and SSL errors,
+# when a connection fails
+TRANSIENT_ERRORS = (HttpError, ConnectionError, TimeoutError, ssl.SSLError, httplib2.HttpLib2Error)
+
+R = TypeVar("R")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `rate` tokens per second on average, in bursts of up to
+    `capacity`. Callers that find the bucket empty reserve their tokens anyway and sleep until
+    they would have been refilled, so waiting callers are served in order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Takes tokens from the bucket, waiting for them if needed. Returns the seconds waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Takes tokens from the bucket without waiting. Returns the seconds to wait for them."""
+        tokens = min(tokens, self.capacity)
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How often and how long to retry failed requests.
+
+    The n-th retry waits a random time between 0 and min(max_delay, base_delay * 2 ** (n - 1))
+    seconds, unless the response carried a Retry-After header. A Retry-After longer than
+    max_delay is not waited for; the error is raised instead.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 32.0
+    # Attempt limits of specific API methods, by method id such as "calendar.events.list"
+    method_max_attempts: Dict[str, int] = field(default_factory=dict)
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+    # Clock that deadlines passed to call and call_async are measured on
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    def attempts_for(self, method: Optional[str]) -> int:
+        return (
+            self.method_max_attempts.get(method, self.max_attempts) if method else self.max_attempts
+        )
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Returns the seconds to wait before the given retry, or None to give up."""
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def call(
+        self,
+        func: Callable[[], R],
+        method: Optional[str] = None,
+        limiter: Optional[TokenBucket] = None,
+        cost: float = 1.0,
+        deadline: Optional[float] = None,
+        conditional: bool = False,
+    ) -> R:
+        """
+        Calls `func` until it succeeds, retrying transient failures. A delete that fails with 404
+        or 410 after an attempt that may have taken effect has succeeded, and returns None.
+
+        Args:
+            func: The request to make, e.g. the execute method of a googleapiclient request
+            method: API method id of the request, for per-method limits
+            limiter: Rate limiter to take `cost` tokens from before each attempt
+            cost: Tokens each attempt takes, e.g. the number of requests in a batch
+            deadline: Time on `clock` after which no retry is made; the last error is raised
+            conditional: Whether the request is sent with If-Match
+
+        Returns:
+            The result of `func`
+        """
+        attempt = 0
+        applied = False
+        while True:
+            attempt += 1
+            if limiter is not None:
+                limiter.acquire(cost)
+            try:
+                return func()
+            except TRANSIENT_ERRORS as error:
+                if applied and _deleted(error, method):
+                    return None  # type: ignore[return-value]
+                delay = self.retry_delay(error, attempt, method, deadline, conditional)
+                if delay is None:
+                    raise
+                applied = applied or not is_rate_limited(error)
+            self.sleep(delay)
+
+    async def call_async(
+        self,
+        func: Callable[[], Awaitable[R]],
+        method: Optional[str] = None,
+        limiter: Optional[TokenBucket] = None,
+        cost: float = 1.0,
+        deadline: Optional[float] = None,
+        conditional: bool = False,
+    ) -> R:
+        """Like `call`, for a coroutine function, waiting without blocking the event loop."""
+        attempt = 0
+        applied = False
+        while True:
+            attempt += 1
+            if limiter is not None:
+                await asyncio.sleep(limiter.reserve(cost))
+            try:
+                return await func()
+            except TRANSIENT_ERRORS as error:
+                if applied and _deleted(error, method):
+                    return None  # type: ignore[return-value]
+                delay = self.retry_delay(error, attempt, method, deadline, conditional)
+                if delay is None:
+                    raise
+                applied = applied or not is_rate_limited(error)
+            await asyncio.sleep(delay)
+
+    def retry_delay(
+        self,
+        error: Exception,
+        attempt: int,
+        method: Optional[str] = None,
+        deadline: Optional[float] = None,
+        conditional: bool = False,
+    ) -> Optional[float]:
+        """Returns the seconds to wait before retrying a failed attempt, or None to give up."""
+        if attempt >= self.attempts_for(method) or not is_retryable(error, method, conditional):
+            return None
+        delay = self.backoff(attempt, retry_after(error))
+        if delay is not None and deadline is not None and self.clock() + delay >= deadline:
+            return None
+        if delay is not None:
+            logging.warning(f"Retrying {method or 'request'} in {delay:.1f}s after: {error}")
+        return delay
+
+
+def is_retryable(error: Exception, method: Optional[str] = None, conditional: bool = False) -> bool:
+    """Whether a request that failed with `error` may be retried."""
+    rate_limited_only = method in NON_IDEMPOTENT_METHODS or (
+        conditional and method in CONDITIONAL_METHODS
+    )
+    if isinstance(error, HttpError):
+        if rate_limited_only:
+            return is_rate_limited(error)
+        return is_rate_limited(error) or error.resp.status in RETRYABLE_STATUSES
+    # The request was never sent if its server could not be found
+    return not rate_limited_only or isinstance(error, httplib2.ServerNotFoundError)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether a request failed as it was rate limited, so did not take effect."""
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    return status == 429 or (status == 403 and "rate limit" in str(error.reason).lower())
+
+
+def _deleted(error: Exception, method: Optional[str]) -> bool:
+    return (
+        method in DELETE_METHODS
+        and isinstance(error, HttpError)
+        and error.resp.status in GONE_STATUSES
+    )
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked to wait with a Retry-After header, if it did."""
+    if not isinstance(error, HttpError):
+        return None
+    return parse_retry_after(error.resp.get("retry-after"))
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Parses a Retry-After value, given either in seconds or as an HTTP date."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (date - now).total_seconds())
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+# Shared by every GoogleCalendarTool, as the Calendar quota is shared by the whole process
+calendar_rate_limiter = TokenBucket(CALENDAR_RATE_LIMIT, CALENDAR_RATE_BURST)
@@ -0,0 +1,252 @@
+"""
+Push notifications of calendar changes, through Google Calendar watch channels.
+
+A channel asks the API to post to a web hook whenever a calendar's events change. Each genuine
+notification is recorded as a WebhookEvent with event_type "calendar" and, when processed,
+triggers an incremental sync of only the affected calendar's local cache. Notifications are claimed
+before their sync, so concurrent processors never sync for the same ones, and put back to be
+retried if it fails. A claim lapses after a lease, so one abandoned by a crashed processor is
+taken over. Channels expire, so they are renewed shortly before their expiration.
+"""
+
+import datetime
+import logging
+import os
+import secrets
+import uuid
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, case, or_, select, update
+
+from naomi_core.db import codec
+from naomi_core.db.calendar import CalendarWatchChannelModel
+from naomi_core.db.webhook import WebhookEvent
+from naomi_core.tools.calendar.event_cache import CalendarEventCache
+from naomi_core.tools.calendar.g_cal_tool import GoogleCalendarTool
+
+CALENDAR_EVENT_TYPE = "calendar"
+# Requested lifetime, in seconds, of watch channels; the API may grant less
+CALENDAR_WATCH_TTL = float(os.environ.get("CALENDAR_WATCH_TTL", str(7 * 24 * 3600)))
+# Channels expiring within this many seconds are replaced by renew_expiring
+CALENDAR_WATCH_RENEW_BEFORE = float(os.environ.get("CALENDAR_WATCH_RENEW_BEFORE", "3600"))
+# Times a notification's sync is attempted before it is marked failed
+CALENDAR_NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get("CALENDAR_NOTIFICATION_MAX_ATTEMPTS", "5"))
+# Seconds after which claimed notifications that were never marked are claimed again; longer
+# than a sync takes, so only processors that died mid-sync lose their claims
+CALENDAR_NOTIFICATION_LEASE = float(os.environ.get("CALENDAR_NOTIFICATION_LEASE", "900"))
+
+NEW, CLAIMED, PROCESSED, FAILED = "NEW", "CLAIMED", "PROCESSED", "FAILED"
+
+
+class CalendarWatcher:
+    def __init__(
+        self,
+        tool: GoogleCalendarTool,
+        address: str,
+        ttl: datetime.timedelta = datetime.timedelta(seconds=CALENDAR_WATCH_TTL),
+        renew_before: datetime.timedelta = datetime.timedelta(seconds=CALENDAR_WATCH_RENEW_BEFORE),
+    ):
+        """
+        Args:
+            tool: Tool to open and stop channels with
+            address: HTTPS URL of the web hook that calls `record_notification`
+            ttl: Requested lifetime of new channels
+            renew_before: How long before their expiration channels are renewed
+        """
+        self.tool = tool
+        self.address = address
+        self.ttl = ttl
+        self.renew_before = renew_before
+
+    def watch(self, calendar_id: str = "primary") -> CalendarWatchChannelModel:
+        """Opens a channel for the calendar's events and remembers it."""
+        from naomi_core.db.core import session_scope
+
+        channel_id = str(uuid.uuid4())
+        token = secrets.token_urlsafe(32)
+        response = self.tool.watch_events(calendar_id, channel_id, self.address, token, self.ttl)
+        channel = CalendarWatchChannelModel(
+            id=channel_id,
+            calendar_id=calendar_id,
+            resource_id=response["resourceId"],
+            token=token,
+            expiration=_from_epoch_ms(response["expiration"]),
+        )
+        with session_scope() as session:
+            session.add(channel)
+            session.flush()
+            session.expunge(channel)
+        return channel
+
+    def stop(self, channel: CalendarWatchChannelModel) -> None:
+        """Stops a channel and forgets it, even if stopping failed, e.g. as it already expired."""
+        from naomi_core.db.core import session_scope
+
+        try:
+            self.tool.stop_channel(str(channel.id), str(channel.resource_id))
+        finally:
+            with session_scope() as session:
+                stored = session.get(CalendarWatchChannelModel, channel.id)
+                if stored is not None:
+                    session.delete(stored)
+
+    def renew_expiring(self) -> List[CalendarWatchChannelModel]:
+        """
+        Replaces the channels that expire soon. Each new channel is opened before the old one is
+        stopped, so no change goes unnotified in between. A channel that could not be replaced is
+        kept, to be tried again on the next call. Returns the new channels.
+        """
+        from naomi_core.db.core import session_scope
+
+        # Read on the primary, as a lagging replica could still list channels already replaced
+        with session_scope() as session:
+            expiring = session.scalars(
+                select(CalendarWatchChannelModel).where(
+                    CalendarWatchChannelModel.expiration < _utcnow() + self.renew_before
+                )
+            ).all()
+            session.expunge_all()
+        renewed = []
+        for channel in expiring:
+            try:
+                renewed.append(self.watch(str(channel.calendar_id)))
+            except Exception as error:
+                logging.error(f"Failed to renew calendar watch channel {channel.id}: {error}")
+                continue
+            try:
+                self.stop(channel)
+            except Exception as error:
+                # The channel lapses on its own once expired; only notifications are duplicated
+                logging.warning(f"Failed to stop calendar watch channel {channel.id}: {error}")
+        return renewed
+
+
+def record_notification(headers: Mapping[str, str]) -> Optional[int]:
+    """
+    Records a push notification posted by a watch channel, given its HTTP headers.
+
+    Returns:
+        The ID of the recorded WebhookEvent, or None if the notification is not a change seen by
+        a known channel: the "sync" message sent when a channel opens, or one from an unknown
+        channel or with a wrong token. Either way, answer the notification with a 2xx status.
+    """
+    from naomi_core.db.core import session_scope
+
+    headers = {name.lower(): value for name, value in headers.items()}
+    state = headers.get("x-goog-resource-state")
+    if state == "sync":
+        return None
+    with session_scope() as session:
+        channel = session.get(CalendarWatchChannelModel, headers.get("x-goog-channel-id"))
+        if channel is None or not secrets.compare_digest(
+            str(channel.token), headers.get("x-goog-channel-token", "")
+        ):
+            # The headers hold the channel's token, so only its ID is logged
+            channel_id = headers.get("x-goog-channel-id")
+            logging.warning(f"Ignoring notification of unknown channel: {channel_id}")
+            return None
+        event = WebhookEvent(
+            event_type=CALENDAR_EVENT_TYPE,
+            payload=codec.dumps(
+                {
+                    "calendar_id": channel.calendar_id,
+                    "channel_id": channel.id,
+                    "resource_state": state,
+                    "message_number": headers.get("x-goog-message-number"),
+                }
+            ),
+            status=NEW,
+        )
+        session.add(event)
+        session.flush()
+        return int(event.id)  # type: ignore[arg-type]
+
+
+def process_notifications(
+    cache: CalendarEventCache,
+    limit: Optional[int] = None,
+    lease: datetime.timedelta = datetime.timedelta(seconds=CALENDAR_NOTIFICATION_LEASE),
+) -> int:
+    """
+    Syncs the calendars that recorded notifications name, each once however many notifications
+    it received, and marks the notifications processed. Notifications are claimed before the
+    sync, so processes running this concurrently each sync for different ones; claims older than
+    `lease`, left by a processor that died before marking them, are taken over. If a sync fails,
+    its notifications are put back as new to be retried, until they failed
+    CALENDAR_NOTIFICATION_MAX_ATTEMPTS times and are marked failed. Notifications that arrive
+    during a sync stay new and trigger another sync on the next call.
+
+    Returns:
+        The number of calendars synced
+    """
+    from naomi_core.db.core import session_scope
+
+    claimed_at, claimed = _claim_notifications(limit, lease)
+    by_calendar: Dict[str, List[int]] = {}
+    for event_id, payload in claimed:
+        by_calendar.setdefault(codec.loads(payload)["calendar_id"], []).append(event_id)
+
+    for calendar_id, event_ids in by_calendar.items():
+        try:
+            cache.sync(calendar_id)
+            values = {"status": PROCESSED}
+        except Exception as error:
+            logging.error(f"Failed to sync calendar {calendar_id} after notification: {error}")
+            attempts = WebhookEvent.attempts + 1
+            values = {
+                "status": case((attempts >= CALENDAR_NOTIFICATION_MAX_ATTEMPTS, FAILED), else_=NEW),
+                "attempts": attempts,
+            }
+        # Only while still ours: had the lease lapsed, another processor owns the claim now
+        with session_scope() as session:
+            session.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_(event_ids))
+                .where(WebhookEvent.status == CLAIMED)
+                .where(WebhookEvent.claimed_at == claimed_at)
+                .values(**values)
+            )
+    return len(by_calendar)
+
+
+def _claim_notifications(
+    limit: Optional[int], lease: datetime.timedelta
+) -> Tuple[datetime.datetime, List[Tuple[int, str]]]:
+    """
+    Marks the oldest new notifications, and those whose claim lapsed, claimed. Returns the claim
+    time and the claimed IDs and payloads. Rows another transaction is claiming are skipped where
+    the database can lock rows, and the update only takes rows that are still claimable either way.
+    """
+    from naomi_core.db.core import session_scope
+
+    claimed_at = _utcnow()
+    claimable = or_(
+        WebhookEvent.status == NEW,
+        and_(WebhookEvent.status == CLAIMED, WebhookEvent.claimed_at < claimed_at - lease),
+    )
+    oldest = (
+        select(WebhookEvent.id)
+        .where(claimable)
+        .where(WebhookEvent.event_type == CALENDAR_EVENT_TYPE)
+        .order_by(WebhookEvent.created_at, WebhookEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    with session_scope() as session:
+        rows = session.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id.in_(oldest))
+            .where(claimable)
+            .values(status=CLAIMED, claimed_at=claimed_at)
+            .returning(WebhookEvent.id, WebhookEvent.payload)
+        ).all()
+    return claimed_at, sorted((int(event_id), str(payload)) for event_id, payload in rows)
+
+
+def _from_epoch_ms(value: str) -> datetime.datetime:
+    seconds = int(value) / 1000
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow()
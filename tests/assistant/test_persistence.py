@@ -1,9 +1,12 @@
 from typing import Iterator
+from unittest.mock import call, patch
 import pytest
 from naomi_core.assistant.persistence import (
     persist_llm_response,
     generate_and_persist_llm_response,
 )
+from naomi_core.assistant.tracing import TurnMetrics, turn_listeners
+from naomi_core.db import core
 from naomi_core.db.chat import Message, MessageModel
 from tests.matchers import assert_message_persisted
 
@@ -59,3 +62,40 @@ def test_generate_and_persist_llm_response_with_id(db_session, persist_messages,
     assert db_session.query(type(message1)).count() == 1
     saved = db_session.query(type(message1)).first()
     assert saved.payload.body is not None
+
+
+def test_generate_and_persist_llm_response_routes_sessions(db_session, mock_llm_client):
+    mock_llm_client.return_value.run.return_value = iter(["chunk1", "chunk2"])
+    with patch("naomi_core.db.core.session_scope", wraps=core.session_scope) as scope:
+        generate_and_persist_llm_response(MessageModel(conversation_id=1, content="{}"), collector)
+
+    calls = scope.call_args_list
+    assert calls[0] == call(readonly=True, conversation_id=1), "messages are read from a replica"
+    assert call(readonly=True) in calls, "agents are read from a replica"
+    assert calls[-1] == call(readonly=False, conversation_id=1), "the response is written"
+    saved = db_session.query(MessageModel).one()
+    assert saved.payload.body == "chunk1chunk2"
+
+
+def test_generate_and_persist_llm_response_traces_turn(db_session, mock_llm_client):
+    mock_llm_client.return_value.run.return_value = iter(["chunk1", "chunk2"])
+    recorded: list[TurnMetrics] = []
+    turn_listeners.append(recorded.append)
+    try:
+        generate_and_persist_llm_response(
+            MessageModel(conversation_id=1, content="{}"), collector, db_session
+        )
+    finally:
+        turn_listeners.remove(recorded.append)
+
+    [metrics] = recorded
+    assert set(metrics.stages) == {
+        "fetch_messages",
+        "decode_payloads",
+        "load_agents",
+        "generate",
+        "consume_stream",
+        "persist",
+    }
+    assert metrics.tokens == 2
+    assert metrics.time_to_first_token is not None
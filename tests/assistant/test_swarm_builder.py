@@ -0,0 +1,58 @@
+from naomi_core.assistant.swarm_builder import agents_content_hash, build_swarm, compile_swarm
+from naomi_core.db.agent import AgentModel, AgentResponsibilityModel
+from tests.data import agent_model_1, agent_model_2, lead_agent_model
+
+
+def make_agents() -> list[AgentModel]:
+    lead, agent, another = lead_agent_model(), agent_model_1(), agent_model_2()
+    agent.responsibilities = [
+        AgentResponsibilityModel(name="Testing", description="Write the tests"),
+    ]
+    return [lead, agent, another]
+
+
+def test_compile_swarm_handoffs():
+    lead = compile_swarm(make_agents(), "test-model")
+
+    assert lead.name == "👑Lead"
+    assert lead.model == "test-model"
+    assert {f.__name__ for f in lead.functions} == {
+        "transfer_to_testagent",
+        "transfer_to_anotheragent",
+    }
+
+    test_agent = next(f() for f in lead.functions if f.__name__ == "transfer_to_testagent")
+    assert "- Testing: Write the tests" in test_agent.instructions
+    assert [f.__name__ for f in test_agent.functions] == ["transfer_to_lead"]
+    assert test_agent.functions[0]() is lead
+
+
+def test_compile_swarm_disambiguates_tool_names():
+    agents = make_agents() + [
+        AgentModel(name="Travel Agent", prompt="Book trips", responsibilities=[]),
+        AgentModel(name="travel-agent", prompt="Book more trips", responsibilities=[]),
+        AgentModel(name="travel_agent", prompt="Book even more trips", responsibilities=[]),
+    ]
+
+    lead = compile_swarm(agents, "test-model")
+
+    names = {f.__name__: f().name for f in lead.functions}
+    assert len(names) == len(lead.functions)
+    assert names["transfer_to_travel_agent"] == "Travel Agent"
+    assert names["transfer_to_travel_agent_2"] == "travel-agent"
+    assert names["transfer_to_travel_agent_3"] == "travel_agent"
+
+
+def test_build_swarm_reuses_compiled_swarm():
+    lead = build_swarm(make_agents(), "test-model")
+    assert build_swarm(make_agents(), "test-model") is lead
+
+    changed = make_agents()
+    changed[1].prompt = "I am a changed agent"
+    assert build_swarm(changed, "test-model") is not lead
+
+
+def test_agents_content_hash_ignores_order():
+    agents = make_agents()
+    assert agents_content_hash(agents, "m") == agents_content_hash(agents[::-1], "m")
+    assert agents_content_hash(agents, "m") != agents_content_hash(agents, "other-model")
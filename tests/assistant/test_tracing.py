@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from naomi_core.assistant.tracing import TurnMetrics, trace_turn, turn_listeners
+
+
+@pytest.fixture
+def recorded_metrics():
+    recorded: list[TurnMetrics] = []
+    turn_listeners.append(recorded.append)
+    yield recorded
+    turn_listeners.remove(recorded.append)
+
+
+@patch("naomi_core.assistant.tracing.time.perf_counter")
+def test_trace_turn_records_stages_and_stream_metrics(mock_clock, recorded_metrics):
+    mock_clock.side_effect = [0.0, 1.0, 1.5, 2.0, 3.0, 3.5, 4.0, 5.0, 6.0]
+
+    with trace_turn() as trace:
+        with trace.stage("fetch_messages"):  # 1.0 -> 1.5
+            pass
+        trace.mark_generation_started()  # 2.0
+        chunks = list(trace.measure_stream(iter(["a", "b", "c"])))  # first 3.0, last 3.5
+        with trace.stage("persist"):  # 4.0 -> 5.0
+            pass
+    # 6.0 at the end of the turn
+
+    assert chunks == ["a", "b", "c"]
+    [metrics] = recorded_metrics
+    assert metrics.stages == {"fetch_messages": 0.5, "persist": 1.0}
+    assert metrics.time_to_first_token == 1.0
+    assert metrics.tokens == 3
+    assert metrics.tokens_per_second == 6.0
+    assert metrics.total == 6.0
+
+
+def test_trace_turn_without_tokens(recorded_metrics):
+    with trace_turn() as trace:
+        assert list(trace.measure_stream(iter([]))) == []
+
+    [metrics] = recorded_metrics
+    assert metrics.tokens == 0
+    assert metrics.time_to_first_token is None
+    assert metrics.tokens_per_second is None
+
+
+def test_trace_turn_sets_span_attributes():
+    turn_span = MagicMock()
+    with patch("naomi_core.assistant.tracing.span") as mock_span:
+        mock_span.return_value.__enter__.return_value = turn_span
+        with trace_turn(conversation_id=1) as trace:
+            trace.mark_generation_started()
+            list(trace.measure_stream(iter(["a", "b"])))
+
+    mock_span.assert_any_call("naomi.turn", conversation_id=1)
+    turn_span.set_attribute.assert_any_call("naomi.tokens", 2)
@@ -10,7 +10,7 @@ from naomi_core.db.chat import (
     Message,
     MessageModel,
 )
-from naomi_core.db.agent import AgentModel, AgentResponsibilityModel
+from naomi_core.db.agent import AgentModel, AgentResponsibilityModel, agent_cache
 from naomi_core.db.core import get_all_tables
 from tests.data import (
     message_data_1,
@@ -52,6 +52,7 @@ def test_db():
         assert get_all_tables() == []
 
     Base.metadata.create_all(bind=engine)
+    agent_cache.invalidate()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -64,7 +65,7 @@ def db_session(test_db):
     session = TestingSessionLocal()
 
     @contextmanager
-    def mock_session_scope():
+    def mock_session_scope(**_):
         try:
             yield session
             session.commit()
@@ -3,11 +3,16 @@ from contextlib import contextmanager
 
 from naomi_core.db.agent import (
     AgentModel,
+    AgentResponsibilityModel,
     get_all_agents,
     get_lead_agent,
+    load_agents,
     save_responsibility,
+    save_responsibilities,
     load_responsibilities_from_db,
+    LEAD_AGENT_NAME,
     LEAD_DEFAULT_PROMPT,
+    AgentCache,
 )
 
 
@@ -100,3 +105,120 @@ def test_load_responsibilities_ordering(db_session, persist_agent, persist_respo
     # In alphabetical order
     assert responsibilities[0].name == another_responsibility.name
     assert responsibilities[1].name == test_responsibility.name
+
+
+def test_get_lead_agent_ignores_other_agents(db_session, persist_agents):
+    # The lead agent is looked up by name, not by whichever agent happens to come first
+    lead_agent = get_lead_agent(db_session)
+    assert lead_agent.name == LEAD_AGENT_NAME
+    assert db_session.query(AgentModel).count() == 3
+
+
+def test_get_all_agents_loads_responsibilities(db_session, persist_agent, persist_responsibilities):
+    agents = {agent.name: agent for agent in get_all_agents(db_session)}
+    db_session.expunge_all()
+
+    # Responsibilities are eagerly loaded and remain usable once detached from the session
+    responsibilities = agents[persist_agent.name].responsibilities
+    assert [r.name for r in responsibilities] == ["AnotherResponsibility", "TestResponsibility"]
+    assert agents[LEAD_AGENT_NAME].responsibilities == []
+
+
+def test_load_agents_sees_every_edit(db_session, persist_agent):
+    agents = load_agents()
+    assert {agent.name for agent in agents} == {LEAD_AGENT_NAME, persist_agent.name}
+
+    db_session.add(AgentModel(name="LateAgent", prompt="I arrived late"))
+    db_session.commit()
+    assert "LateAgent" in {agent.name for agent in load_agents()}
+
+
+def test_load_agents_uses_given_session(db_session, persist_agent):
+    message_agent = db_session.get(AgentModel, persist_agent.name)
+    with patch("naomi_core.db.core.session_scope") as session_scope:
+        agents = load_agents(db_session)
+
+    session_scope.assert_not_called()
+    assert {agent.name for agent in agents} == {LEAD_AGENT_NAME, persist_agent.name}
+    # The caller's objects stay bound to its session
+    assert message_agent in db_session
+
+
+def test_load_agents_caches_until_an_edit_commits(db_session, persist_agent):
+    load_agents()  # Seeds the Lead agent, which invalidates the cache as it commits
+    agents = load_agents()
+    with patch("naomi_core.db.core.session_scope") as session_scope:
+        assert [agent.name for agent in load_agents()] == [agent.name for agent in agents]
+    session_scope.assert_not_called()
+
+    # Statements and ORM edits only invalidate once committed
+    save_responsibilities(persist_agent, [AgentResponsibilityModel(name="New", description="d")])
+    agent = {agent.name: agent for agent in load_agents()}[persist_agent.name]
+    assert [r.name for r in agent.responsibilities] == ["New"]
+
+    db_session.get(AgentModel, persist_agent.name).prompt = "Edited"
+    db_session.flush()
+    assert {agent.name: agent for agent in load_agents()}[persist_agent.name].prompt != "Edited"
+    db_session.rollback()
+    db_session.get(AgentModel, persist_agent.name).prompt = "Edited"
+    db_session.commit()
+    assert {agent.name: agent for agent in load_agents()}[persist_agent.name].prompt == "Edited"
+
+
+def test_agent_cache_expires_and_skips_overlapping_loads():
+    now = [0.0]
+    cache = AgentCache(ttl=10, clock=lambda: now[0])
+    loads = []
+
+    def load():
+        loads.append(len(loads))
+        return [AgentModel(name=f"Agent{len(loads)}", prompt="")]
+
+    cache.agents(load)
+    cache.agents(load)
+    now[0] = 10
+    cache.agents(load)
+    assert loads == [0, 1]
+
+    def load_during_invalidation():
+        cache.invalidate()
+        return load()
+
+    cache.invalidate()
+    cache.agents(load_during_invalidation)
+    assert [agent.name for agent in cache.agents(load)] == ["Agent4"]
+
+
+def test_save_responsibilities_applies_diff(db_session, persist_agent, persist_responsibilities):
+    test_responsibility, _ = persist_responsibilities
+    agent_name = persist_agent.name
+
+    save_responsibilities(
+        persist_agent,
+        [
+            AgentResponsibilityModel(name=test_responsibility.name, description="Reworded"),
+            AgentResponsibilityModel(name="NewResponsibility", description="Brand new"),
+        ],
+    )
+
+    agent = db_session.get(AgentModel, agent_name)
+    responsibilities = load_responsibilities_from_db(agent, db_session)
+    assert [(r.name, r.description) for r in responsibilities] == [
+        ("NewResponsibility", "Brand new"),
+        ("TestResponsibility", "Reworded"),
+    ]
+
+
+def test_save_responsibilities_skips_unchanged(db_session, persist_agent, persist_responsibilities):
+    agent_name = persist_agent.name
+    unchanged = [
+        AgentResponsibilityModel(name=r.name, description=r.description)
+        for r in persist_responsibilities
+    ]
+
+    with patch("naomi_core.db.agent._upsert_responsibilities") as mock_upsert:
+        save_responsibilities(persist_agent, unchanged)
+
+    mock_upsert.assert_not_called()
+    agent = db_session.get(AgentModel, agent_name)
+    assert len(load_responsibilities_from_db(agent, db_session)) == 2
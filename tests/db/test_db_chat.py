@@ -1,13 +1,21 @@
 import json
 
+import pytest
+
 from naomi_core.db.chat import (
+    DEFAULT_TENANT_ID,
     Message,
     MessageModel,
     delete_messages_after,
     fetch_messages,
+    fetch_message_views,
     add_message_to_db,
     Conversation,
     SummaryModel,
+    list_conversations,
+    list_conversations_across_tenants,
+    get_conversation,
+    TenantMismatchError,
 )
 
 from tests.matchers import assert_message_model
@@ -79,7 +87,7 @@ def test_message_model_from_llm_response(db_session):
 
 def test_fetch_messages(db_session, persist_messages):
     message1, message2 = persist_messages
-    messages = fetch_messages(db_session, conversation_id=1)
+    messages = fetch_messages(db_session, conversation_id=1, tenant_id=DEFAULT_TENANT_ID)
     assert len(messages) == 2
     assert messages[0] == message1
     assert messages[1] == message2
@@ -88,8 +96,8 @@ def test_fetch_messages(db_session, persist_messages):
 def test_delete_messages(
     db_session, persist_messages, message2: MessageModel, message_data: Message
 ):
-    delete_messages_after(db_session, message2)
-    messages = fetch_messages(db_session, conversation_id=1)
+    delete_messages_after(db_session, message2, DEFAULT_TENANT_ID)
+    messages = fetch_messages(db_session, conversation_id=1, tenant_id=DEFAULT_TENANT_ID)
     assert len(messages) == 1
     assert messages[0].payload == message_data
 
@@ -110,3 +118,120 @@ def test_create_summary_model(db_session):
 
     saved_summary = db_session.query(SummaryModel).filter_by(conversation_id=42).one()
     assert saved_summary.content == "Summarized content"
+
+
+def test_fetch_message_views(db_session, persist_messages):
+    message1, message2 = persist_messages
+    views = fetch_message_views(db_session, conversation_id=1, tenant_id=DEFAULT_TENANT_ID)
+
+    assert [(v.conversation_id, v.id) for v in views] == [(1, 1), (1, 2)]
+    assert [v.to_message() for v in views] == [message1.payload, message2.payload]
+    assert views[0].role == "user"
+    assert views[0].body == "Hello, NAOMI!"
+    assert views[0].extra is None
+
+
+def test_message_view_keeps_extra_fields(db_session):
+    payload = Message(role="assistant", content="Hi", sender="👑Lead")
+    add_message_to_db(payload, db_session, conversation_id=3)
+    db_session.commit()
+
+    [view] = fetch_message_views(db_session, conversation_id=3, tenant_id=DEFAULT_TENANT_ID)
+    assert view.extra == {"sender": "👑Lead"}
+    assert view.to_message() == payload
+    with pytest.raises(AttributeError):
+        view.content = "changed"  # type: ignore[misc]
+
+
+def test_conversation_counters(db_session):
+    db_session.add(Conversation(id=5, name="Counted", description=""))
+    db_session.commit()
+    created_at = db_session.get(Conversation, 5).updated_at
+
+    for i in range(3):
+        add_message_to_db(Message.from_user_input(f"Message {i}"), db_session, conversation_id=5)
+        db_session.commit()
+    conversation = db_session.get(Conversation, 5)
+    assert (conversation.message_count, conversation.last_message_id) == (3, 3)
+    assert conversation.updated_at >= created_at
+
+    delete_messages_after(
+        db_session, fetch_messages(db_session, 5, DEFAULT_TENANT_ID)[1], DEFAULT_TENANT_ID
+    )
+    db_session.refresh(conversation)
+    assert (conversation.message_count, conversation.last_message_id) == (1, 1)
+
+    delete_messages_after(
+        db_session, fetch_messages(db_session, 5, DEFAULT_TENANT_ID)[0], DEFAULT_TENANT_ID
+    )
+    db_session.refresh(conversation)
+    assert (conversation.message_count, conversation.last_message_id) == (0, None)
+
+
+def test_list_conversations_paginates_by_activity(db_session):
+    for conversation_id in range(1, 6):
+        db_session.add(Conversation(id=conversation_id, name=f"C{conversation_id}", description=""))
+        db_session.commit()
+    for conversation_id in (2, 4):
+        add_message_to_db(Message.from_user_input("x" * 500), db_session, conversation_id)
+        db_session.commit()
+
+    first, cursor = list_conversations(db_session, DEFAULT_TENANT_ID, limit=2)
+    assert [c.id for c in first] == [4, 2]
+    assert first[0].message_count == 1
+    assert first[0].last_message_preview == "x" * 100
+    second, cursor = list_conversations(db_session, DEFAULT_TENANT_ID, limit=2, cursor=cursor)
+    third, cursor = list_conversations(db_session, DEFAULT_TENANT_ID, limit=2, cursor=cursor)
+    assert [c.id for c in second + third] == [5, 3, 1]
+    assert cursor is None
+    assert third[0].last_message_preview is None
+    assert list_conversations(db_session, DEFAULT_TENANT_ID, limit=0) == ([], None)
+
+
+def test_list_conversations_empty_page(db_session):
+    assert list_conversations(db_session, DEFAULT_TENANT_ID) == ([], None)
+
+
+def test_tenant_scoped_queries(db_session):
+    for conversation_id, tenant_id in ((1, "alice"), (2, "bob"), (3, "alice")):
+        db_session.add(
+            Conversation(id=conversation_id, name="", description="", tenant_id=tenant_id)
+        )
+        db_session.commit()
+        add_message_to_db(
+            Message.from_user_input(tenant_id), db_session, conversation_id, tenant_id
+        )
+        db_session.commit()
+
+    conversations, _ = list_conversations(db_session, tenant_id="alice")
+    assert [c.id for c in conversations] == [3, 1]
+    assert [m.payload.body for m in fetch_messages(db_session, 2, tenant_id="bob")] == ["bob"]
+    assert fetch_messages(db_session, 2, tenant_id="alice") == []
+    assert fetch_message_views(db_session, 1, tenant_id="bob") == []
+    assert get_conversation(db_session, 1, "alice") is not None
+    assert get_conversation(db_session, 1, "bob") is None
+
+
+def test_default_tenant(db_session):
+    add_message_to_db(Message.from_user_input("Hi"), db_session, conversation_id=1)
+    db_session.commit()
+    assert fetch_messages(db_session, 1, tenant_id=DEFAULT_TENANT_ID)[0].tenant_id == "default"
+
+
+def test_messages_are_written_for_the_conversation_tenant(db_session):
+    db_session.add(Conversation(id=1, name="", description="", tenant_id="alice"))
+    db_session.add(Conversation(id=2, name="", description="", tenant_id="bob"))
+    db_session.commit()
+    add_message_to_db(Message.from_user_input("Hi"), db_session, conversation_id=1)
+    db_session.commit()
+
+    [message] = fetch_messages(db_session, 1, tenant_id="alice")
+    assert message.tenant_id == "alice"
+    with pytest.raises(TenantMismatchError):
+        add_message_to_db(Message.from_user_input("Intruder"), db_session, 1, "bob")
+    assert db_session.get(Conversation, 1).message_count == 1
+
+    delete_messages_after(db_session, message, tenant_id="bob")
+    assert fetch_messages(db_session, 1, tenant_id="alice") == [message]
+
+    assert [c.id for c in list_conversations_across_tenants(db_session)[0]] == [1, 2]
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from naomi_core.db import codec
+from naomi_core.db.chat import Message
+
+PAYLOAD = {"role": "assistant", "content": 'Héllo, "NAOMI" 👑\n', "sender": "👑Lead"}
+
+
+@pytest.fixture(autouse=True)
+def restore_codec():
+    active = codec.codec.name
+    yield
+    codec.set_codec(active)
+
+
+@pytest.mark.parametrize("name", list(codec.available_codecs()))
+def test_codec_round_trip(name):
+    codec.set_codec(name)
+    encoded = codec.dumps(Message(PAYLOAD))
+    assert isinstance(encoded, str)
+    assert json.loads(encoded) == PAYLOAD
+    assert codec.loads(encoded) == PAYLOAD
+    assert codec.loads(json.dumps(PAYLOAD)) == PAYLOAD
+
+
+def test_message_round_trip_uses_active_codec():
+    message = Message.from_json(Message(PAYLOAD).to_json())
+    assert type(message) is Message
+    assert message == PAYLOAD
+
+
+def test_default_codec_is_fastest_available():
+    assert codec.set_codec().name == next(iter(codec.available_codecs()))
+    assert "json" in codec.available_codecs()
+
+
+def test_set_unknown_codec():
+    with pytest.raises(ValueError, match="not available"):
+        codec.set_codec("pickle")
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+import pytest
+
+from naomi_core.db.chat import (
+    DEFAULT_TENANT_ID,
+    Message,
+    MessageModel,
+    add_message_to_db,
+    fetch_message_views,
+    fetch_messages,
+)
+from naomi_core.db.compression import ContentCompressor, backfill, storage_stats, zstandard
+
+from tests.conftest import engine
+
+LARGE_BODY = "The quick brown fox jumps over the lazy dog. " * 200
+ALGORITHMS = ["zlib"] + (["zstd"] if zstandard is not None else [])
+
+
+@pytest.fixture
+def small_threshold():
+    with patch("naomi_core.db.compression.compressor", ContentCompressor(threshold=1024)) as c:
+        yield c
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_compressor_round_trip(algorithm):
+    compressor = ContentCompressor(threshold=1024, algorithm=algorithm)
+
+    assert compressor.encode("short") == ("short", False)
+    stored, compressed = compressor.encode(LARGE_BODY)
+    assert compressed
+    assert stored.startswith(f"{algorithm}:")
+    assert len(stored) < len(LARGE_BODY) / 10
+    assert compressor.decode(stored) == LARGE_BODY
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard is not installed")
+def test_compressor_with_trained_dictionary():
+    samples = [f"Message {i}: {LARGE_BODY[: i % 500 + 100]}".encode() for i in range(500)]
+    dictionary = zstandard.train_dictionary(4096, samples).as_bytes()
+    compressor = ContentCompressor(threshold=100, dictionary=dictionary, algorithm="zstd")
+
+    stored, _ = compressor.encode(LARGE_BODY[:300])
+    plain, _ = ContentCompressor(threshold=100, algorithm="zstd").encode(LARGE_BODY[:300])
+    assert len(stored) < len(plain)
+    assert compressor.decode(stored) == LARGE_BODY[:300]
+    assert stored.startswith(f"zstd.{compressor.dictionary_id}:")
+
+    with pytest.raises(ValueError, match="dictionary"):
+        ContentCompressor(algorithm="zstd").decode(stored)
+    other = zstandard.train_dictionary(4096, samples[::-1], dict_id=compressor.dictionary_id + 1)
+    with pytest.raises(ValueError, match="dictionary"):
+        ContentCompressor(dictionary=other.as_bytes(), algorithm="zstd").decode(stored)
+
+
+def test_compressor_unknown_algorithm():
+    with pytest.raises(ValueError, match="Unknown message compression"):
+        ContentCompressor().decode("lz4:AAAA")
+
+
+def test_large_messages_are_stored_compressed(db_session, small_threshold):
+    large = Message.from_llm_response(LARGE_BODY)
+    for message in (Message.from_user_input("Hi"), large):
+        add_message_to_db(message, db_session, conversation_id=1)
+        db_session.commit()
+
+    small_model, large_model = fetch_messages(db_session, 1, DEFAULT_TENANT_ID)
+    assert not small_model.compressed
+    assert large_model.compressed
+    assert large_model.payload == large
+    _, large_view = fetch_message_views(db_session, 1, DEFAULT_TENANT_ID)
+    assert large_view.to_message() == large
+
+
+def test_set_payload(small_threshold):
+    model = MessageModel(conversation_id=1, id=1)
+    model.set_payload(Message.from_llm_response(LARGE_BODY))
+    assert model.compressed
+    model.set_payload(Message.from_llm_response("short"))
+    assert not model.compressed
+    assert model.payload.body == "short"
+
+
+def test_backfill_and_stats(db_session, small_threshold):
+    large = Message.from_llm_response(LARGE_BODY).to_json()
+    for message_id in range(1, 6):
+        db_session.add(MessageModel(conversation_id=1, id=message_id, content=large))
+    db_session.add(MessageModel(conversation_id=2, id=1, content=Message(role="user").to_json()))
+    # Fewer characters than the threshold, but more bytes
+    accented = Message.from_llm_response("é" * 600).to_json()
+    db_session.add(MessageModel(conversation_id=2, id=2, content=accented))
+    db_session.commit()
+    before = storage_stats(engine)
+
+    assert backfill(engine, batch_size=2) == 6
+    assert backfill(engine, batch_size=2) == 0
+
+    after = storage_stats(engine)
+    assert after["messages"] == 7
+    assert after["stored_content_bytes"] < before["stored_content_bytes"] / 10
+    assert after["sampled_compressed_messages"] == 6
+    assert after["sampled_compression_ratio"] > 10
+    assert all(
+        m.payload.body == LARGE_BODY for m in fetch_messages(db_session, 1, DEFAULT_TENANT_ID)
+    )
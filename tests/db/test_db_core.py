@@ -1,10 +1,25 @@
-from unittest.mock import patch
-
-from naomi_core.db.core import Base, initialize_db, session_scope, get_all_tables, wipe_db
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, delete
+
+from naomi_core.db.core import (
+    Base,
+    ReplicaPool,
+    initialize_db,
+    session_scope,
+    get_all_tables,
+    wipe_db,
+)
 from naomi_core.db.chat import Conversation
-from naomi_core.db.agent import AgentModel
+from naomi_core.db.agent import (
+    LEAD_AGENT_NAME,
+    LEAD_DEFAULT_PROMPT,
+    AgentModel,
+    agent_cache,
+    load_agents,
+)
 
-from tests.conftest import engine, TestingSessionLocal
+from tests.conftest import engine, TestingSessionLocal, TEST_DATABASE_URL
 
 
 @patch("naomi_core.db.core.engine", new_callable=lambda: engine)
@@ -20,7 +35,10 @@ def test_initialize_db_and_get_all_tables(_):
         "agent_responsibility",
         "property",
         "event",
-    } == {t[0] for t in get_all_tables()}
+        "calendar_event",
+        "calendar_sync_state",
+        "calendar_watch_channel",
+    } == set(get_all_tables())
 
 
 def test_wipe_db(db_session):
@@ -38,12 +56,12 @@ def test_wipe_db(db_session):
         # Now wipe the database and check it reinitializes correctly
         wipe_db()
 
-        # Verify tables exist but previous data is gone
-        agent_count = db_session.query(AgentModel).count()
-        assert agent_count == 0
+        # Verify tables exist but previous data is gone, leaving only the seeded lead agent
+        agent_names = [agent.name for agent in db_session.query(AgentModel).all()]
+        assert agent_names == [LEAD_AGENT_NAME]
 
         # Verify all tables still exist
-        tables = {t[0] for t in get_all_tables()}
+        tables = set(get_all_tables())
         assert "agent" in tables
         assert "agent_responsibility" in tables
 
@@ -87,3 +105,63 @@ def test_session_scope_rollback(mock_session):
     with session_scope() as session:
         saved_convo = session.query(Conversation).filter_by(name="TestConvo").first()
         assert saved_convo is None  # Ensure rollback occurred
+
+
+def test_replica_pool_round_robin():
+    replica_1, replica_2 = create_engine(TEST_DATABASE_URL), create_engine(TEST_DATABASE_URL)
+    pool = ReplicaPool([replica_1, replica_2])
+    assert [pool.select() for _ in range(3)] == [replica_1, replica_2, replica_1]
+    assert ReplicaPool([]).select() is None
+
+
+def test_replica_pool_least_connections():
+    busy, idle = MagicMock(), MagicMock()
+    busy.pool.checkedout.return_value = 3
+    idle.pool.checkedout.return_value = 1
+    pool = ReplicaPool([busy, idle], strategy="least_connections")
+    assert pool.select() is idle
+
+
+def test_replica_pool_read_your_writes():
+    replica = create_engine(TEST_DATABASE_URL)
+    pool = ReplicaPool([replica], sticky_seconds=60)
+    pool.record_write(conversation_id=1)
+    assert pool.select(conversation_id=1) is None
+    assert pool.select(conversation_id=2) is replica
+    assert pool.select() is replica
+
+
+@patch("naomi_core.db.core.Session", new_callable=lambda: TestingSessionLocal)
+def test_session_scope_readonly_uses_replica(_):
+    replica = create_engine(TEST_DATABASE_URL)
+    with patch("naomi_core.db.core.replicas", ReplicaPool([replica], sticky_seconds=60)) as pool:
+        with session_scope(readonly=True) as session:
+            assert session.get_bind() is replica
+
+        with session_scope(conversation_id=1) as session:
+            assert session.get_bind() is engine
+        with session_scope(readonly=True, conversation_id=1) as session:
+            assert session.get_bind() is engine
+        assert pool.is_sticky(1)
+
+
+@patch("naomi_core.db.core.Session", new_callable=lambda: TestingSessionLocal)
+def test_load_agents_reads_replica_and_seeds_primary(_):
+    replica = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(bind=replica)
+    with TestingSessionLocal(bind=replica) as session:
+        session.add(AgentModel(name=LEAD_AGENT_NAME, prompt="Replicated prompt"))
+        session.commit()
+
+    with patch("naomi_core.db.core.replicas", ReplicaPool([replica])):
+        assert [agent.prompt for agent in load_agents()] == ["Replicated prompt"]
+
+        with replica.begin() as connection:
+            connection.execute(delete(AgentModel))
+        # A change made outside this process's sessions is seen once the cache expires
+        agent_cache.invalidate()
+        assert [agent.prompt for agent in load_agents()] == [LEAD_DEFAULT_PROMPT]
+
+    with TestingSessionLocal() as session:
+        assert session.get(AgentModel, LEAD_AGENT_NAME) is not None, "seeded on the primary"
+    replica.dispose()
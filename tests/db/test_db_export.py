@@ -0,0 +1,92 @@
+import io
+import json
+from unittest.mock import patch
+
+from sqlalchemy import select
+
+from naomi_core.db.chat import (
+    DEFAULT_TENANT_ID,
+    Conversation,
+    Message,
+    MessageModel,
+    SummaryModel,
+    add_message_to_db,
+    fetch_messages,
+)
+from naomi_core.db.compression import ContentCompressor
+from naomi_core.db.export import export_conversations, import_conversations
+
+
+def _populate(session):
+    session.add(Conversation(id=1, name="First", description="One"))
+    session.add(Conversation(id=2, name="Second", description="Two"))
+    session.commit()
+    for conversation_id in (1, 2):
+        for i in range(5):
+            add_message_to_db(Message.from_user_input(f"Hi {i}"), session, conversation_id)
+            session.commit()
+    session.add(SummaryModel(conversation_id=1, summary_until_id=4, content="x"))
+    session.commit()
+
+
+def _clear(session):
+    for model in (SummaryModel, MessageModel, Conversation):
+        session.query(model).delete()
+    session.commit()
+
+
+def test_export_import_round_trip(db_session):
+    _populate(db_session)
+    output = io.StringIO()
+
+    assert export_conversations(db_session, output, batch_size=3) == 2 + 10 + 1
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [record["table"] for record in records] == ["conversation"] * 2 + ["message"] * 10 + [
+        "summary"
+    ]
+
+    _clear(db_session)
+    assert import_conversations(db_session, io.StringIO(output.getvalue()), batch_size=4) == 13
+    db_session.commit()
+
+    assert [c.name for c in db_session.query(Conversation).order_by(Conversation.id)] == [
+        "First",
+        "Second",
+    ]
+    assert [m.payload["content"] for m in fetch_messages(db_session, 2, DEFAULT_TENANT_ID)] == [
+        f"Hi {i}" for i in range(5)
+    ]
+    assert db_session.scalar(select(SummaryModel.content)) == "x"
+
+
+def test_export_leaves_session_connection_unchanged(db_session):
+    _populate(db_session)
+
+    export_conversations(db_session, io.StringIO(), batch_size=3)
+
+    assert "stream_results" not in db_session.connection().get_execution_options()
+
+
+def test_export_selected_conversations(db_session):
+    _populate(db_session)
+    output = io.StringIO()
+
+    assert export_conversations(db_session, output, conversation_ids=[2]) == 6
+    rows = [json.loads(line)["row"] for line in output.getvalue().splitlines()]
+    assert {row.get("conversation_id", row.get("id")) for row in rows} == {2}
+
+
+def test_export_decompress(db_session):
+    body = "All work and no play makes Jack a dull boy. " * 100
+    with patch("naomi_core.db.compression.compressor", ContentCompressor(threshold=1024)):
+        add_message_to_db(Message.from_llm_response(body), db_session, 1)
+        db_session.commit()
+
+        raw, plain = io.StringIO(), io.StringIO()
+        export_conversations(db_session, raw)
+        export_conversations(db_session, plain, decompress=True)
+
+    assert json.loads(raw.getvalue())["row"]["compressed"] is True
+    row = json.loads(plain.getvalue())["row"]
+    assert row["compressed"] is False
+    assert json.loads(row["content"])["content"] == body
@@ -0,0 +1,91 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from naomi_core.db.chat import DEFAULT_TENANT_ID, MessageModel, fetch_messages
+from naomi_core.db.core import session_scope
+from naomi_core.db.instrumentation import (
+    Histogram,
+    disable_profiling,
+    enable_profiling,
+    normalize_statement,
+    query_scope,
+)
+
+from tests.conftest import engine, TestingSessionLocal
+
+
+@pytest.fixture
+def profiler():
+    profiler = enable_profiling(engine, slow_query_ms=10_000, n_plus_one_threshold=3)
+    yield profiler
+    disable_profiling()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 1), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT *\n   FROM  message") == "SELECT * FROM message"
+
+
+def test_profiler_records_statement_latency(profiler, db_session, persist_messages):
+    fetch_messages(db_session, conversation_id=1, tenant_id=DEFAULT_TENANT_ID)
+
+    stats = json.loads(profiler.to_json())["statements"]
+    select = next(s for s in stats if s.startswith("SELECT") and "FROM message" in s)
+    assert stats[select]["count"] == 1
+    assert stats[select]["buckets"]["+Inf"] == 1
+
+
+@patch("naomi_core.db.core.Session", new_callable=lambda: TestingSessionLocal)
+def test_profiler_detects_n_plus_one(_, profiler, persist_messages):
+    with session_scope() as session:
+        for message_id in (1, 2, 1, 2):
+            session.expunge_all()
+            session.get(MessageModel, (1, message_id))
+
+    assert profiler.queries_per_scope.count == 1
+    assert profiler.queries_per_scope.sum >= 4
+    [report] = profiler.n_plus_one
+    assert report["scope"] == "session_scope"
+    assert report["count"] == 4
+
+
+def test_profiler_logs_slow_queries(profiler, db_session, caplog):
+    profiler.slow_query_ms = 0
+    fetch_messages(db_session, conversation_id=1, tenant_id=DEFAULT_TENANT_ID)
+    assert "Slow query" in caplog.text
+
+
+def test_profiler_forgets_failed_queries(profiler, db_session):
+    connection = db_session.connection()
+    with pytest.raises(OperationalError):
+        connection.execute(text("SELECT * FROM missing_table"))
+    assert connection.info["query_start_time"] == []
+
+
+def test_prometheus_export(profiler, db_session):
+    with query_scope("test"):
+        fetch_messages(db_session, conversation_id=1, tenant_id=DEFAULT_TENANT_ID)
+
+    metrics = profiler.to_prometheus()
+    assert "# TYPE naomi_db_query_duration_seconds histogram" in metrics
+    assert 'naomi_db_query_duration_seconds_count{operation="SELECT"} 1' in metrics
+    assert "naomi_db_queries_per_scope_count 1" in metrics
+    assert "naomi_db_n_plus_one_total 0" in metrics
+
+
+def test_disable_profiling_detaches(db_session):
+    profiler = enable_profiling(engine)
+    disable_profiling()
+    fetch_messages(db_session, conversation_id=1, tenant_id=DEFAULT_TENANT_ID)
+    assert profiler.statements == {}
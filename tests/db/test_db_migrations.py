@@ -0,0 +1,149 @@
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, text
+
+from naomi_core.db.core import Base
+from naomi_core.db.migrations import (
+    SCHEMA_VERSION_KEY,
+    add_column,
+    create_index,
+    current_version,
+    get_columns,
+    get_indexes,
+    head_version,
+    migrate,
+)
+from naomi_core.db.property import PropertyModel
+from naomi_core.db.webhook import WebhookEvent  # noqa: F401 - registers the event table
+
+from tests.conftest import engine
+
+
+def test_migrate_fresh_db_stamps_head_version():
+    Base.metadata.drop_all(bind=engine)
+    assert current_version(engine) == 0
+
+    assert migrate(engine) == head_version()
+    assert current_version(engine) == head_version()
+    assert "ix_event_status_created_at" in get_indexes(engine, "event")
+
+
+def test_migrate_existing_db_keeps_data_and_adds_indexes(db_session):
+    db_session.add(PropertyModel(key="keep", value="me"))
+    db_session.commit()
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_event_status_created_at"))
+
+    migrate(engine)
+
+    assert "ix_event_status_created_at" in get_indexes(engine, "event")
+    assert db_session.query(PropertyModel).filter_by(key="keep").one().value == "me"
+    version = db_session.query(PropertyModel).filter_by(key=SCHEMA_VERSION_KEY).one()
+    assert int(version.value) == head_version()
+
+
+def test_migrate_is_idempotent():
+    migrate(engine)
+    assert migrate(engine) == head_version()
+
+
+def test_add_column_and_create_index():
+    metadata = MetaData()
+    Table("scratch", metadata, Column("id", Integer, primary_key=True))
+    metadata.create_all(engine)
+
+    # Declare the newer model shape, as a later migration would
+    later = MetaData()
+    note = Column("note", String, nullable=False, server_default="none")
+    scratch = Table("scratch", later, Column("id", Integer, primary_key=True), note)
+    index = Index("ix_scratch_note", scratch.c.note)
+
+    for _ in range(2):
+        add_column(engine, "scratch", note)
+        create_index(engine, index)
+    assert "note" in get_columns(engine, "scratch")
+    assert "ix_scratch_note" in get_indexes(engine, "scratch")
+
+    later.drop_all(engine)
+
+
+def test_migrate_adds_message_compressed_column():
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE message (conversation_id INTEGER NOT NULL, id INTEGER NOT NULL, "
+                "content TEXT NOT NULL, PRIMARY KEY (conversation_id, id))"
+            )
+        )
+        connection.execute(text('INSERT INTO message VALUES (1, 1, \'{"role": "user"}\')'))
+
+    migrate(engine)
+
+    assert "compressed" in get_columns(engine, "message")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT compressed FROM message")).scalar() == 0
+
+
+def test_migrate_backfills_conversation_counters():
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE conversation (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR NOT NULL,"
+                " description TEXT NOT NULL)"
+            )
+        )
+        connection.execute(text("INSERT INTO conversation VALUES (1, 'a', ''), (2, 'b', '')"))
+        connection.execute(
+            text(
+                "CREATE TABLE message (conversation_id INTEGER NOT NULL, id INTEGER NOT NULL, "
+                "content TEXT NOT NULL, PRIMARY KEY (conversation_id, id))"
+            )
+        )
+        connection.execute(text("INSERT INTO message VALUES (1, 1, '{}'), (1, 2, '{}')"))
+
+    migrate(engine)
+
+    assert "ix_conversation_updated_at_id" in get_indexes(engine, "conversation")
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT id, message_count, last_message_id, updated_at FROM conversation")
+        ).all()
+    assert [row[:3] for row in rows] == [(1, 2, 2), (2, 0, None)]
+    assert all(row.updated_at is not None for row in rows)
+
+
+def test_migrate_adds_tenant_ids():
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE message (conversation_id INTEGER NOT NULL, id INTEGER NOT NULL, "
+                "content TEXT NOT NULL, PRIMARY KEY (conversation_id, id))"
+            )
+        )
+        connection.execute(text("INSERT INTO message VALUES (1, 1, '{}')"))
+
+    migrate(engine)
+
+    assert "ix_message_tenant_conversation_id" in get_indexes(engine, "message")
+    assert "ix_conversation_tenant_updated_at_id" in get_indexes(engine, "conversation")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT tenant_id FROM message")).scalar() == "default"
+
+
+def test_migrate_adds_webhook_event_attempts_and_claimed_at():
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE event (id INTEGER NOT NULL PRIMARY KEY, event_type VARCHAR NOT NULL,"
+                " payload TEXT NOT NULL, created_at DATETIME, status VARCHAR NOT NULL)"
+            )
+        )
+        connection.execute(text("INSERT INTO event VALUES (1, 'calendar', '{}', NULL, 'NEW')"))
+
+    migrate(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT attempts FROM event")).scalar() == 0
+        assert connection.execute(text("SELECT claimed_at FROM event")).scalar() is None
@@ -0,0 +1,165 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from sqlalchemy import create_engine, inspect
+
+from naomi_core.db.chat import Conversation, Message, MessageModel, SummaryModel
+from naomi_core.db.core import Base, initialize_db, session_scope
+from naomi_core.db.sharding import (
+    ShardRouter,
+    list_conversation_ids,
+    move_conversation,
+    parse_shard_urls,
+    rebalance,
+    same_database,
+)
+
+from tests.conftest import TEST_DATABASE_URL, TestingSessionLocal, engine
+
+
+def make_shards(*names: str) -> dict:
+    shards = {name: create_engine(TEST_DATABASE_URL) for name in names}
+    for shard in shards.values():
+        Base.metadata.create_all(shard)
+    return shards
+
+
+def add_conversation(shard, conversation_id: int, message_count: int = 3):
+    with TestingSessionLocal(bind=shard) as session:
+        session.add(Conversation(id=conversation_id, name="Convo", description="Sharded"))
+        session.add(SummaryModel(conversation_id=conversation_id, summary_until_id=1, content="s"))
+        for message_id in range(1, message_count + 1):
+            content = Message.from_user_input(f"Message {message_id}").to_json()
+            session.add(
+                MessageModel(conversation_id=conversation_id, id=message_id, content=content)
+            )
+        session.commit()
+
+
+def test_parse_shard_urls():
+    assert parse_shard_urls("") == {}
+    assert parse_shard_urls("a=sqlite:///a.db, b=sqlite:///b.db") == {
+        "a": "sqlite:///a.db",
+        "b": "sqlite:///b.db",
+    }
+
+
+def test_shard_router_is_stable_and_spreads_conversations():
+    router = ShardRouter(make_shards("a", "b", "c"))
+    assignments = [router.shard_for(conversation_id) for conversation_id in range(3000)]
+
+    assert assignments == [router.shard_for(conversation_id) for conversation_id in range(3000)]
+    assert all(assignments.count(name) > 600 for name in "abc")
+
+
+def test_adding_a_shard_moves_only_a_fraction_of_conversations():
+    shards = make_shards("a", "b", "c", "d")
+    before = ShardRouter({name: shards[name] for name in "abc"})
+    after = ShardRouter(shards)
+
+    moved = [cid for cid in range(3000) if before.shard_for(cid) != after.shard_for(cid)]
+    assert all(after.shard_for(cid) == "d" for cid in moved)
+    assert len(moved) < 3000 / 2
+
+
+@patch("naomi_core.db.core.Session", new_callable=lambda: TestingSessionLocal)
+def test_session_scope_routes_by_conversation_id(_):
+    router = ShardRouter(make_shards("a", "b"))
+    with patch("naomi_core.db.core.shards", router):
+        for conversation_id in range(5):
+            with session_scope(conversation_id=conversation_id) as session:
+                assert session.get_bind() is router.engine_for(conversation_id)
+
+
+def test_move_conversation():
+    shards = make_shards("a", "b")
+    add_conversation(shards["a"], 7, message_count=5)
+    add_conversation(shards["a"], 8)
+
+    move_conversation(7, shards["a"], shards["b"], batch_size=2)
+
+    assert list_conversation_ids(shards["a"]) == [8]
+    assert list_conversation_ids(shards["b"]) == [7]
+    with TestingSessionLocal(bind=shards["b"]) as session:
+        assert session.query(MessageModel).count() == 5
+        assert session.query(SummaryModel).one().content == "s"
+
+
+@patch("naomi_core.db.core.Session", new_callable=lambda: TestingSessionLocal)
+def test_move_conversation_keeps_concurrent_writes(_, tmp_path):
+    # File databases, as the move runs on another thread than the write
+    shards = {name: create_engine(f"sqlite:///{tmp_path / name}.db") for name in "ab"}
+    for shard in shards.values():
+        Base.metadata.create_all(shard)
+    router = ShardRouter({"a": shards["a"]})
+    add_conversation(shards["a"], 7, message_count=2)
+
+    mover = threading.Thread(
+        target=move_conversation, args=(7, shards["a"], shards["b"], 500, router)
+    )
+    with patch("naomi_core.db.core.shards", router):
+        with session_scope(conversation_id=7) as session:
+            mover.start()
+            mover.join(timeout=0.1)
+            assert mover.is_alive(), "the move waits for the write in progress"
+            content = Message.from_user_input("Message 3").to_json()
+            session.add(MessageModel(conversation_id=7, id=3, content=content))
+        mover.join()
+
+        assert router.engine_for(7) is shards["b"], "switched right after the copy"
+        with session_scope(conversation_id=7) as session:
+            content = Message.from_user_input("Message 4").to_json()
+            session.add(MessageModel(conversation_id=7, id=4, content=content))
+
+    assert list_conversation_ids(shards["a"]) == []
+    with TestingSessionLocal(bind=shards["b"]) as session:
+        assert [m.id for m in session.query(MessageModel).order_by(MessageModel.id)] == [1, 2, 3, 4]
+
+
+def test_rebalance_matches_target_layout():
+    shards = make_shards("a", "b", "c")
+    current = ShardRouter({"a": shards["a"]})
+    for conversation_id in range(1, 21):
+        add_conversation(shards["a"], conversation_id, message_count=1)
+
+    target = ShardRouter(shards)
+    moved = rebalance(current, target)
+
+    assert moved == sum(target.shard_for(cid) != "a" for cid in range(1, 21))
+    for name, shard in shards.items():
+        assert all(target.shard_for(cid) == name for cid in list_conversation_ids(shard))
+    assert all(current.engine_for(cid) is target.engine_for(cid) for cid in range(1, 21))
+    assert rebalance(target, target) == 0
+
+
+def test_rebalance_keeps_conversations_on_the_same_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+    current = ShardRouter({"a": create_engine(url)})
+    Base.metadata.create_all(current.shards["a"])
+    for conversation_id in range(1, 6):
+        add_conversation(current.shards["a"], conversation_id)
+
+    # The target layout holds its own Engine for the same database
+    target = ShardRouter.from_urls({"a": url})
+    assert same_database(current.shards["a"], target.shards["a"])
+    assert rebalance(current, target) == 0
+    assert list_conversation_ids(target.shards["a"]) == [1, 2, 3, 4, 5]
+
+    with pytest.raises(ValueError):
+        move_conversation(1, current.shards["a"], target.shards["a"])
+    with TestingSessionLocal(bind=target.shards["a"]) as session:
+        assert session.query(MessageModel).count() == 15
+    assert not same_database(create_engine(TEST_DATABASE_URL), create_engine(TEST_DATABASE_URL))
+
+
+@patch("naomi_core.db.core.engine", new_callable=lambda: engine)
+def test_initialize_db_migrates_shards(_):
+    router = ShardRouter({"a": create_engine(TEST_DATABASE_URL)})
+    with patch("naomi_core.db.core.shards", router):
+        initialize_db()
+
+    assert {"conversation", "message", "summary"} <= set(
+        inspect(router.shards["a"]).get_table_names()
+    )
@@ -3,10 +3,27 @@ Fixtures for testing the Google Calendar Tool.
 """
 
 import datetime
+import json
+import re
 import pytest
 from unittest.mock import MagicMock, patch
 
+import httplib2  # type: ignore[import]
+from googleapiclient.discovery import build  # type: ignore[import]
+from googleapiclient.errors import HttpError  # type: ignore[import]
+
+import naomi_core.db.calendar  # noqa: F401  Registers the calendar tables test_db creates
 from naomi_core.tools.calendar.g_cal_tool import GoogleCalendarTool
+from naomi_core.tools.calendar.retry import TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate(monkeypatch):
+    """Keep the shared rate limiter from slowing tests down."""
+    monkeypatch.setattr(
+        "naomi_core.tools.calendar.g_cal_tool.calendar_rate_limiter",
+        TokenBucket(rate=1e9, capacity=1e9),
+    )
 
 
 @pytest.fixture
@@ -146,3 +163,194 @@ def sample_calendar():
         "timeZone": "UTC",
         "accessRole": "owner",
     }
+
+
+class FakeRequest:
+    """A request of the fake Calendar API, executed synchronously."""
+
+    def __init__(self, response):
+        self.response = response
+        self.headers = {}
+
+    def execute(self):
+        return self.response
+
+
+class FakeCollection:
+    """A paginated collection of the fake Calendar API that records every list call."""
+
+    def __init__(self):
+        self.items = []
+        self.list_calls = []
+
+    def list(self, maxResults=250, pageToken=None, **params):
+        self.list_calls.append(dict(params, maxResults=maxResults, pageToken=pageToken))
+        return FakeRequest(self._page(self.items, maxResults, pageToken))
+
+    @staticmethod
+    def _page(items, page_size, page_token):
+        start = int(page_token or 0)
+        end = start + page_size
+        response = {"items": items[start:end]}
+        if end < len(items):
+            response["nextPageToken"] = str(end)
+        return response
+
+
+class FakeEventCollection(FakeCollection):
+    """Events of the fake Calendar API, with incremental sync support."""
+
+    def __init__(self):
+        super().__init__()
+        self.changes = []
+        self.expired_sync_tokens = set()
+        self.watches = []
+
+    def upsert(self, event):
+        self.items = [item for item in self.items if item["id"] != event["id"]] + [event]
+        self.changes.append(event)
+
+    def cancel(self, event_id):
+        self.items = [item for item in self.items if item["id"] != event_id]
+        self.changes.append({"id": event_id, "status": "cancelled"})
+
+    def list(self, maxResults=250, pageToken=None, syncToken=None, **params):
+        self.list_calls.append(
+            dict(params, maxResults=maxResults, pageToken=pageToken, syncToken=syncToken)
+        )
+        if syncToken in self.expired_sync_tokens:
+            raise HttpError(resp=MagicMock(status=410), content=b'{"error": "Gone"}')
+        items = self.changes[int(syncToken) :] if syncToken else self.items  # noqa: E203
+        response = self._page(items, maxResults, pageToken)
+        if "nextPageToken" not in response:
+            response["nextSyncToken"] = str(len(self.changes))
+        return FakeRequest(response)
+
+    def insert(self, calendarId, body):
+        event = dict(body, id=f"created{len(self.changes)}")
+        self.upsert(event)
+        return FakeRequest(event)
+
+    def patch(self, calendarId, eventId, body):
+        event = next(item for item in self.items if item["id"] == eventId)
+        self.upsert({**event, **body})
+        return FakeRequest({**event, **body})
+
+    def delete(self, calendarId, eventId):
+        self.cancel(eventId)
+        return FakeRequest("")
+
+    def watch(self, calendarId, body):
+        self.watches.append(dict(body, calendarId=calendarId))
+        expiration = datetime.datetime(2025, 1, 8, tzinfo=datetime.timezone.utc).timestamp()
+        return FakeRequest(
+            {
+                "id": body["id"],
+                "resourceId": f"resource-{calendarId}",
+                "expiration": str(int(expiration * 1000)),
+            }
+        )
+
+
+class FakeChannelCollection:
+    """Channels of the fake Calendar API, recording which were stopped."""
+
+    def __init__(self):
+        self.stopped = []
+
+    def stop(self, body):
+        self.stopped.append(body)
+        return FakeRequest(None)
+
+
+class FakeCalendarService:
+    """In-memory stand-in for the Google Calendar API service."""
+
+    def __init__(self):
+        self.event_collection = FakeEventCollection()
+        self.calendar_collection = FakeCollection()
+        self.channel_collection = FakeChannelCollection()
+
+    def events(self):
+        return self.event_collection
+
+    def calendarList(self):
+        return self.calendar_collection
+
+    def channels(self):
+        return self.channel_collection
+
+
+@pytest.fixture
+def fake_service():
+    """Create a fake Google Calendar service."""
+    return FakeCalendarService()
+
+
+@pytest.fixture
+def fake_cal_tool(fake_service):
+    """Create a GoogleCalendarTool backed by the fake service, with small pages."""
+    tool = GoogleCalendarTool(
+        credentials_path="mock_credentials.json", token_path="mock_token.json", page_size=3
+    )
+    tool.service = fake_service
+    return tool
+
+
+def make_events(count):
+    """Return `count` events, one per hour from 2025-01-01."""
+    start = datetime.datetime(2025, 1, 1)
+    return [
+        {
+            "id": f"event{i}",
+            "summary": f"Event {i}",
+            "start": {"dateTime": (start + datetime.timedelta(hours=i)).isoformat() + "Z"},
+            "end": {"dateTime": (start + datetime.timedelta(hours=i + 1)).isoformat() + "Z"},
+        }
+        for i in range(count)
+    ]
+
+
+class FakeBatchHttp:
+    """
+    HTTP transport answering Calendar API batch requests with scripted (status, body) responses,
+    one per request in the batch. Each batch's Content-IDs are recorded in `batches`.
+    """
+
+    boundary = "batch_boundary"
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.batches = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        content_ids = re.findall(r"Content-ID: <(.+?)>", body)
+        self.batches.append(content_ids)
+        parts = []
+        for content_id in content_ids:
+            status, content = self.responses.pop(0)
+            parts.append(
+                f"--{self.boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} Status\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(content)}\r\n"
+            )
+        parts.append(f"--{self.boundary}--")
+        headers = {"status": "200", "content-type": f"multipart/mixed; boundary={self.boundary}"}
+        return httplib2.Response(headers), "".join(parts).encode()
+
+
+@pytest.fixture
+def batch_http():
+    """Create a batch transport; tests append their scripted responses."""
+    return FakeBatchHttp([])
+
+
+@pytest.fixture
+def batch_cal_tool(batch_http):
+    """Create a GoogleCalendarTool with a real Calendar service on a fake batch transport."""
+    tool = GoogleCalendarTool(
+        credentials_path="mock_credentials.json", token_path="mock_token.json"
+    )
+    tool.service = build("calendar", "v3", http=batch_http, static_discovery=True)
+    return tool
@@ -0,0 +1,243 @@
+"""
+Tests for the asynchronous Google Calendar Tool, served by an httpx mock transport.
+"""
+
+import asyncio
+import datetime
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from naomi_core.tools.calendar.async_g_cal_tool import (  # noqa: E402
+    CALENDAR_API_URL,
+    AsyncGoogleCalendarTool,
+)
+from naomi_core.tools.calendar.g_cal_tool import EventModifiedError  # noqa: E402
+from naomi_core.tools.calendar.retry import RetryPolicy, TokenBucket  # noqa: E402
+from tests.tools.calendar.conftest import make_events  # noqa: E402
+
+
+class FakeCalendarApi:
+    """Answers Calendar API requests from canned responses, recording every request."""
+
+    def __init__(self):
+        self.requests = []
+        self.events = make_events(5)
+        self.responses = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.responses:
+            return self.responses.pop(0)
+        if request.url.path.endswith("/events") and request.method == "GET":
+            page_size = int(request.url.params["maxResults"])
+            start = int(request.url.params.get("pageToken", 0))
+            body = {"items": self.events[start : start + page_size]}  # noqa: E203
+            if start + page_size < len(self.events):
+                body["nextPageToken"] = str(start + page_size)
+            return httpx.Response(200, json=body)
+        if request.method == "DELETE":
+            return httpx.Response(204)
+        if request.method == "GET":
+            return httpx.Response(200, json={"id": "event1", "summary": "Original"})
+        return httpx.Response(200, json={"id": "event1", **json.loads(request.content)})
+
+
+@pytest.fixture
+def api():
+    return FakeCalendarApi()
+
+
+@pytest.fixture
+def credentials():
+    with patch("naomi_core.tools.calendar.async_g_cal_tool.service_factory") as factory:
+        factory.credentials.return_value = MagicMock(token="access_token")
+        factory.expires_soon.return_value = False
+        yield factory
+
+
+@pytest.fixture
+def async_cal_tool(api, credentials):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(api), base_url=CALENDAR_API_URL)
+    return AsyncGoogleCalendarTool(
+        "credentials.json",
+        "token.json",
+        page_size=2,
+        retry_policy=RetryPolicy(base_delay=0.001),
+        rate_limiter=TokenBucket(rate=1e9, capacity=1e9),
+        client=client,
+    )
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_get_upcoming_events_follows_pages(async_cal_tool, api, credentials):
+    """Test that events are read across pages, authenticated once with a bearer token."""
+    events = run(async_cal_tool.get_upcoming_events(max_results=3, calendar_id="me@example.com"))
+
+    assert [event["id"] for event in events] == ["event0", "event1", "event2"]
+    assert len(api.requests) == 2
+    request = api.requests[0]
+    assert request.url.raw_path.startswith(b"/calendar/v3/calendars/me%40example.com/events?")
+    assert request.url.params["singleEvents"] == "true"
+    assert request.url.params["orderBy"] == "startTime"
+    assert request.headers["Authorization"] == "Bearer access_token"
+    credentials.credentials.assert_called_once()
+
+
+def test_get_events_by_date_range(async_cal_tool, api):
+    """Test fetching a date range without a limit reads every page."""
+    start = datetime.datetime(2025, 1, 1)
+    end = datetime.datetime(2025, 1, 2)
+
+    events = run(async_cal_tool.get_events_by_date_range(start, end, max_results=None))
+
+    assert len(events) == 5
+    assert api.requests[0].url.params["timeMin"] == "2025-01-01T00:00:00Z"
+    assert api.requests[0].url.params["timeMax"] == "2025-01-02T00:00:00Z"
+
+
+def test_get_calendar_list(async_cal_tool, api):
+    """Test listing calendars."""
+    api.responses = [httpx.Response(200, json={"items": [{"id": "primary"}, {"id": "work"}]})]
+
+    calendars = run(async_cal_tool.get_calendar_list())
+
+    assert [calendar["id"] for calendar in calendars] == ["primary", "work"]
+    assert api.requests[0].url.path == "/calendar/v3/users/me/calendarList"
+
+
+def test_create_and_delete_event(async_cal_tool, api):
+    """Test creating an event posts its body, and deleting it sends a DELETE."""
+    start = datetime.datetime(2025, 1, 1, 10)
+
+    event = run(async_cal_tool.create_event("Meeting", start, start + datetime.timedelta(hours=1)))
+    assert event["summary"] == "Meeting"
+    assert event["start"] == {"dateTime": "2025-01-01T10:00:00", "timeZone": "UTC"}
+    assert api.requests[0].method == "POST"
+
+    assert run(async_cal_tool.delete_event("event1")) is True
+    assert api.requests[1].method == "DELETE"
+    assert api.requests[1].url.path == "/calendar/v3/calendars/primary/events/event1"
+
+
+def test_update_event_patches_changes(async_cal_tool, api):
+    """Test that updates send only the changed fields, with the ETag as If-Match."""
+    event = run(async_cal_tool.update_event("event1", summary="Renamed", etag='"1"'))
+
+    request = api.requests[0]
+    assert request.method == "PATCH"
+    assert json.loads(request.content) == {"summary": "Renamed"}
+    assert request.headers["If-Match"] == '"1"'
+    assert event["summary"] == "Renamed"
+
+
+def test_update_event_full_replace(async_cal_tool, api):
+    """Test that a full replace fetches the event and sends it back whole."""
+    event = run(async_cal_tool.update_event("event1", location="Office", full_replace=True))
+
+    assert [request.method for request in api.requests] == ["GET", "PUT"]
+    assert event == {"id": "event1", "summary": "Original", "location": "Office"}
+
+
+def test_update_event_etag_mismatch(async_cal_tool, api):
+    """Test that a failed precondition raises EventModifiedError."""
+    api.responses = [httpx.Response(412, json={"error": {"message": "Precondition Failed"}})]
+
+    with pytest.raises(EventModifiedError):
+        run(async_cal_tool.update_event("event1", summary="Renamed", etag='"1"'))
+
+
+def test_get_event_details_error(async_cal_tool, api):
+    """Test that error responses are wrapped like those of the blocking tool."""
+    api.responses = [httpx.Response(404, json={"error": {"message": "Not Found"}})]
+
+    with pytest.raises(Exception) as exc_info:
+        run(async_cal_tool.get_event_details("missing"))
+
+    assert "An error occurred while fetching event details" in str(exc_info.value)
+
+
+def test_retries_transient_errors(async_cal_tool, api):
+    """Test that rate limited and failed requests are retried."""
+    api.responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"id": "event1"}),
+    ]
+
+    assert run(async_cal_tool.get_event_details("event1")) == {"id": "event1"}
+    assert len(api.requests) == 3
+
+
+def test_refreshes_rejected_credentials_once(async_cal_tool, api, credentials):
+    """Test that a 401 refreshes the credentials and resends the request, only once."""
+    refreshed = MagicMock(token="refreshed_token")
+    credentials.credentials.side_effect = [MagicMock(token="access_token"), refreshed]
+    api.responses = [httpx.Response(401), httpx.Response(200, json={"id": "event1"})]
+
+    assert run(async_cal_tool.get_event_details("event1")) == {"id": "event1"}
+    assert api.requests[1].headers["Authorization"] == "Bearer refreshed_token"
+    assert credentials.credentials.call_args.args[-1] == "access_token"
+
+    api.responses = [httpx.Response(401), httpx.Response(401)]
+    credentials.credentials.side_effect = None
+    credentials.credentials.return_value = refreshed
+    with pytest.raises(Exception, match="An error occurred while fetching event details"):
+        run(async_cal_tool.get_event_details("event1"))
+    assert len(api.requests) == 4
+
+
+def test_writes_update_the_event_cache(async_cal_tool, api):
+    """Test that created, updated and deleted events are applied to the event cache."""
+    async_cal_tool.event_cache = MagicMock()
+    start = datetime.datetime(2025, 1, 1, 10)
+
+    created = run(
+        async_cal_tool.create_event("Meeting", start, start + datetime.timedelta(hours=1))
+    )
+    updated = run(async_cal_tool.update_event("event1", summary="Renamed"))
+    run(async_cal_tool.delete_event("event1", calendar_id="work"))
+
+    assert [call.args for call in async_cal_tool.event_cache.apply_events.call_args_list] == [
+        ("primary", [created]),
+        ("primary", [updated]),
+        ("work", [{"id": "event1", "status": "cancelled"}]),
+    ]
+
+
+def test_concurrent_calls_share_the_client(async_cal_tool, api, credentials):
+    """Test that concurrent calls overlap on one event loop and client, loading credentials once."""
+    in_flight = []
+    overlap = 0
+
+    async def handle(request):
+        nonlocal overlap
+        in_flight.append(request)
+        overlap = max(overlap, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request)
+        return api(request)
+
+    async_cal_tool._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handle), base_url=CALENDAR_API_URL
+    )
+    credentials.credentials.side_effect = lambda *args: time.sleep(0.05) or MagicMock(token="t")
+
+    async def fetch_all():
+        async with async_cal_tool:
+            return await asyncio.gather(
+                *(async_cal_tool.get_event_details(f"event{index}") for index in range(10))
+            )
+
+    assert len(run(fetch_all())) == 10
+    assert len(api.requests) == 10
+    assert overlap > 1
+    credentials.credentials.assert_called_once()
+    assert async_cal_tool._client is None
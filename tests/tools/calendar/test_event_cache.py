@@ -0,0 +1,146 @@
+"""
+Tests for the local calendar event cache.
+"""
+
+import datetime
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from naomi_core.db.calendar import CalendarEventModel, CalendarSyncStateModel
+from naomi_core.tools.calendar.event_cache import CalendarEventCache
+from tests.tools.calendar.conftest import make_events
+
+JAN_1 = datetime.datetime(2025, 1, 1)
+
+
+def test_full_then_incremental_sync(db_session, fake_cal_tool, fake_service):
+    """Test that only changes are fetched after the first sync."""
+    events = fake_service.event_collection
+    events.items = make_events(5)
+    cache = CalendarEventCache(fake_cal_tool)
+
+    assert cache.sync() == 5
+    assert db_session.query(CalendarEventModel).count() == 5
+    assert db_session.get(CalendarSyncStateModel, "primary").sync_token == "0"
+
+    events.upsert(dict(make_events(5)[1], summary="Moved"))
+    events.cancel("event2")
+    assert cache.sync() == 2
+
+    assert events.list_calls[-1]["syncToken"] == "0"
+    cached = cache.events_between("primary", JAN_1, None)
+    assert [event["id"] for event in cached] == ["event0", "event1", "event3", "event4"]
+    assert cached[1]["summary"] == "Moved"
+
+
+def test_expired_sync_token_triggers_full_sync(db_session, fake_cal_tool, fake_service):
+    """Test that a 410 response falls back to a full sync."""
+    events = fake_service.event_collection
+    events.items = make_events(3)
+    cache = CalendarEventCache(fake_cal_tool)
+    cache.sync()
+
+    events.items = make_events(2)
+    events.expired_sync_tokens.add("0")
+    assert cache.sync() == 2
+
+    assert db_session.query(CalendarEventModel).count() == 2
+    assert events.list_calls[-1]["syncToken"] is None
+
+
+def test_events_between_respects_max_age(db_session, fake_cal_tool, fake_service):
+    """Test that queries are served locally until the cache is older than max_age."""
+    events = fake_service.event_collection
+    events.items = make_events(6)
+    cache = CalendarEventCache(fake_cal_tool, max_age=datetime.timedelta(minutes=5))
+
+    window = cache.events_between("primary", JAN_1.replace(hour=2), JAN_1.replace(hour=4))
+    assert [event["id"] for event in window] == ["event2", "event3"]
+    calls = len(events.list_calls)
+
+    assert len(cache.events_between("primary", JAN_1, None, limit=4)) == 4
+    assert len(events.list_calls) == calls
+
+    state = db_session.get(CalendarSyncStateModel, "primary")
+    state.synced_at = datetime.datetime.utcnow() - datetime.timedelta(minutes=10)
+    db_session.commit()
+    cache.events_between("primary", JAN_1, None)
+    assert len(events.list_calls) == calls + 1
+
+
+def test_tool_reads_and_writes_through_cache(db_session, fake_service):
+    """Test that a tool with a cache answers range queries locally and applies its own writes."""
+    from naomi_core.tools.calendar.g_cal_tool import GoogleCalendarTool
+
+    events = fake_service.event_collection
+    events.items = make_events(3)
+    tool = GoogleCalendarTool("credentials.json", "token.json", cache_max_age=datetime.timedelta(1))
+    tool.service = fake_service
+    day = (JAN_1, JAN_1 + datetime.timedelta(days=1))
+    assert len(tool.get_events_by_date_range(*day)) == 3
+    list_calls = len(events.list_calls)
+
+    created = tool.create_event("Lunch", JAN_1.replace(hour=12), JAN_1.replace(hour=13))
+    tool.update_event("event1", summary="Renamed")
+    tool.delete_event("event0")
+
+    cached = tool.get_events_by_date_range(*day)
+    assert [event["id"] for event in cached] == ["event1", "event2", created["id"]]
+    assert cached[0]["summary"] == "Renamed"
+    assert len(events.list_calls) == list_calls, "served from the cache, not the API"
+
+
+def test_interval_index_tracks_changes(db_session, fake_cal_tool, fake_service):
+    """Test that the interval index is reused until the cached events change."""
+    fake_service.event_collection.items = make_events(5)
+    cache = CalendarEventCache(fake_cal_tool)
+
+    index = cache.interval_index()
+    assert index.size == 5
+    assert [event["id"] for event in index.overlapping(JAN_1, JAN_1.replace(hour=2))] == [
+        "event0",
+        "event1",
+    ]
+    assert cache.interval_index() is index
+
+    cache.apply_events("primary", [{"id": "event0", "status": "cancelled"}])
+    assert cache.interval_index().size == 4
+
+
+def test_sync_holds_no_transaction_across_api_calls(db_session, fake_cal_tool, fake_service):
+    """Test that pages are fetched outside any session, and queries read on the primary."""
+    from naomi_core.db import core
+
+    events = fake_service.event_collection
+    events.items = make_events(5)
+    fake_cal_tool.page_size = 2
+    session_scope = core.session_scope
+    open_scopes = []
+    scope_kwargs = []
+
+    @contextmanager
+    def tracking_scope(**kwargs):
+        scope_kwargs.append(kwargs)
+        with session_scope(**kwargs) as session:
+            open_scopes.append(session)
+            try:
+                yield session
+            finally:
+                open_scopes.pop()
+
+    list_events = events.list
+
+    def list_outside_transactions(**params):
+        assert open_scopes == [], "no session is open while the API is called"
+        return list_events(**params)
+
+    cache = CalendarEventCache(fake_cal_tool)
+    with patch.object(core, "session_scope", tracking_scope), patch.object(
+        events, "list", side_effect=list_outside_transactions
+    ):
+        assert cache.sync() == 5
+        cache.events_between("primary", JAN_1, None)
+        cache.interval_index()
+
+    assert len(events.list_calls) == 3
+    assert all(not kwargs.get("readonly") for kwargs in scope_kwargs)
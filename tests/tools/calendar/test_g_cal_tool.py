@@ -6,12 +6,22 @@ without making actual API calls.
 """
 
 import datetime
+import threading
+import time
 import pytest
 from unittest.mock import MagicMock, patch
 
 from googleapiclient.errors import HttpError  # type: ignore[import]
 
-from naomi_core.tools.calendar.g_cal_tool import GoogleCalendarTool
+from naomi_core.tools.calendar.g_cal_tool import (
+    MAX_BATCH_SIZE,
+    CalendarConflictError,
+    EventModifiedError,
+    FreeBusyUnavailableError,
+    GoogleCalendarTool,
+)
+from naomi_core.tools.calendar.retry import RetryPolicy
+from tests.tools.calendar.conftest import make_events
 
 
 def test_get_upcoming_events(mock_cal_tool, mock_service, mock_events):
@@ -242,8 +252,52 @@ def test_create_event_error(mock_cal_tool, mock_service, sample_datetime):
     assert "400" in str(exc_info.value) or "Invalid event data" in str(exc_info.value)
 
 
-def test_update_event(mock_cal_tool, mock_service, mock_original_event, mock_updated_event):
-    """Test updating an event."""
+def test_update_event(mock_cal_tool, mock_service, mock_updated_event):
+    """Test that updating an event patches only the changed fields."""
+    mock_service.events.return_value.patch.return_value.execute.return_value = mock_updated_event
+
+    result = mock_cal_tool.update_event(
+        event_id="event_id",
+        summary="Updated Event",
+        description="Updated Description",
+        calendar_id="primary",
+    )
+
+    assert mock_updated_event == result
+
+    mock_service.events.return_value.get.assert_not_called()
+    mock_service.events.return_value.update.assert_not_called()
+    mock_service.events.return_value.patch.assert_called_once_with(
+        calendarId="primary",
+        eventId="event_id",
+        body={"summary": "Updated Event", "description": "Updated Description"},
+    )
+
+
+def test_update_event_with_etag(mock_cal_tool, mock_service, mock_updated_event):
+    """Test that an ETag is sent as If-Match."""
+    request = mock_service.events.return_value.patch.return_value
+    request.headers = {}
+    request.execute.return_value = mock_updated_event
+
+    mock_cal_tool.update_event(event_id="event_id", summary="Updated Event", etag='"123"')
+
+    assert request.headers == {"If-Match": '"123"'}
+
+
+def test_update_event_etag_mismatch(mock_cal_tool, mock_service):
+    """Test that a failed If-Match precondition raises EventModifiedError."""
+    http_error = HttpError(resp=MagicMock(status=412), content=b'{"error": "Precondition Failed"}')
+    mock_service.events.return_value.patch.return_value.execute.side_effect = http_error
+
+    with pytest.raises(EventModifiedError):
+        mock_cal_tool.update_event(event_id="event_id", summary="Updated Event", etag='"123"')
+
+
+def test_update_event_full_replace(
+    mock_cal_tool, mock_service, mock_original_event, mock_updated_event
+):
+    """Test replacing a whole event."""
     mock_service.events.return_value.get.return_value.execute.return_value = mock_original_event
     mock_service.events.return_value.update.return_value.execute.return_value = mock_updated_event
 
@@ -252,6 +306,7 @@ def test_update_event(mock_cal_tool, mock_service, mock_original_event, mock_upd
         summary="Updated Event",
         description="Updated Description",
         calendar_id="primary",
+        full_replace=True,
     )
 
     assert mock_updated_event == result
@@ -271,12 +326,9 @@ def test_update_event(mock_cal_tool, mock_service, mock_original_event, mock_upd
     assert body["location"] == "Original Location"  # Unchanged
 
 
-def test_update_event_with_times(
-    mock_cal_tool, mock_service, mock_original_event, mock_updated_event, sample_datetime
-):
+def test_update_event_with_times(mock_cal_tool, mock_service, mock_updated_event, sample_datetime):
     """Test updating an event's times."""
-    mock_service.events.return_value.get.return_value.execute.return_value = mock_original_event
-    mock_service.events.return_value.update.return_value.execute.return_value = mock_updated_event
+    mock_service.events.return_value.patch.return_value.execute.return_value = mock_updated_event
 
     start_time = sample_datetime
     end_time = datetime.datetime(2025, 1, 1, 12, 0, 0)  # Changed to noon
@@ -291,8 +343,8 @@ def test_update_event_with_times(
 
     assert mock_updated_event == result
 
-    mock_service.events.return_value.update.assert_called_once()
-    call_kwargs = mock_service.events.return_value.update.call_args[1]
+    mock_service.events.return_value.patch.assert_called_once()
+    call_kwargs = mock_service.events.return_value.patch.call_args[1]
     body = call_kwargs["body"]
 
     # Check the updated times
@@ -302,12 +354,9 @@ def test_update_event_with_times(
     assert body["end"]["timeZone"] == "America/New_York"
 
 
-def test_update_event_with_attendees(
-    mock_cal_tool, mock_service, mock_original_event, mock_updated_event
-):
+def test_update_event_with_attendees(mock_cal_tool, mock_service, mock_updated_event):
     """Test updating event attendees."""
-    mock_service.events.return_value.get.return_value.execute.return_value = mock_original_event
-    mock_service.events.return_value.update.return_value.execute.return_value = mock_updated_event
+    mock_service.events.return_value.patch.return_value.execute.return_value = mock_updated_event
 
     new_attendees = [
         {"email": "user1@example.com"},
@@ -320,8 +369,8 @@ def test_update_event_with_attendees(
         calendar_id="primary",
     )
 
-    mock_service.events.return_value.update.assert_called_once()
-    call_kwargs = mock_service.events.return_value.update.call_args[1]
+    mock_service.events.return_value.patch.assert_called_once()
+    call_kwargs = mock_service.events.return_value.patch.call_args[1]
     body = call_kwargs["body"]
 
     # Check the updated attendees
@@ -330,9 +379,9 @@ def test_update_event_with_attendees(
 
 def test_update_event_error(mock_cal_tool, mock_service):
     """Test error handling when updating an event."""
-    # Mock the HttpError exception during retrieval
+    # Mock the HttpError exception
     http_error = HttpError(resp=MagicMock(status=404), content=b'{"error": "Event not found"}')
-    mock_service.events.return_value.get.return_value.execute.side_effect = http_error
+    mock_service.events.return_value.patch.return_value.execute.side_effect = http_error
 
     # Test that the error is properly propagated
     with pytest.raises(Exception) as exc_info:
@@ -371,8 +420,52 @@ def test_delete_event_error(mock_cal_tool, mock_service):
     assert "404" in str(exc_info.value) or "Event not found" in str(exc_info.value)
 
 
-@patch("naomi_core.tools.calendar.g_cal_tool.authenticate_google_api")
-def test_authenticate(mock_authenticate_google_api, tmp_path):
+@patch("naomi_core.tools.calendar.g_cal_tool.service_factory")
+def test_refreshes_rejected_credentials_once(mock_service_factory, mock_service):
+    """Test that a 401 refreshes the credentials through the factory and resends, only once."""
+    mock_service_factory.service.return_value = mock_service
+    mock_service_factory.credentials.return_value = MagicMock(token="old_token")
+    unauthorized = HttpError(resp=MagicMock(status=401), content=b'{"error": "Unauthorized"}')
+    execute = mock_service.events.return_value.get.return_value.execute
+    execute.side_effect = [unauthorized, {"id": "event1"}]
+    tool = GoogleCalendarTool("credentials.json", "token.json")
+    tool.authenticate()
+
+    assert tool.get_event_details("event1") == {"id": "event1"}
+    mock_service_factory.credentials.assert_called_with(
+        "credentials.json", "token.json", ["https://www.googleapis.com/auth/calendar"], "old_token"
+    )
+
+    execute.side_effect = [unauthorized, unauthorized, {"id": "event1"}]
+    with pytest.raises(Exception, match="An error occurred while fetching event details"):
+        tool.get_event_details("event1")
+    assert execute.call_count == 4
+
+
+@patch("naomi_core.tools.calendar.g_cal_tool.service_factory")
+def test_batch_refreshes_rejected_credentials_through_factory(
+    mock_service_factory, batch_cal_tool, batch_http
+):
+    """Test that 401 items of a batch refresh the credentials through the factory."""
+    mock_service_factory.service.return_value = batch_cal_tool.service
+    mock_service_factory.credentials.return_value = MagicMock(token="old_token")
+    batch_cal_tool.service = None
+    batch_cal_tool.authenticate()
+    batch_http.responses = [
+        (200, {"id": "event1"}),
+        (401, {"error": {"code": 401, "message": "Unauthorized"}}),
+        (200, {"id": "event2"}),
+    ]
+
+    results = batch_cal_tool.get_events_details(["event1", "event2"])
+
+    assert [result.response for result in results] == [{"id": "event1"}, {"id": "event2"}]
+    assert [len(batch) for batch in batch_http.batches] == [2, 1]
+    assert mock_service_factory.credentials.call_args.args[-1] == "old_token"
+
+
+@patch("naomi_core.tools.calendar.g_cal_tool.service_factory")
+def test_authenticate(mock_service_factory, tmp_path):
     """Test authenticate method using the google_auth module."""
     # Setup
     credentials_path = str(tmp_path / "credentials.json")
@@ -385,7 +478,7 @@ def test_authenticate(mock_authenticate_google_api, tmp_path):
         f.write("{}")
 
     # Setup mock
-    mock_authenticate_google_api.return_value = "mock_service"
+    mock_service_factory.service.return_value = "mock_service"
 
     # Create instance with real file paths
     tool = GoogleCalendarTool(credentials_path, token_path)
@@ -393,7 +486,336 @@ def test_authenticate(mock_authenticate_google_api, tmp_path):
     tool.authenticate()
 
     # Assertions
-    mock_authenticate_google_api.assert_called_once_with(
-        credentials_path, token_path, "calendar", "v3", ["https://www.googleapis.com/auth/calendar"]
+    mock_service_factory.service.assert_called_once_with(
+        credentials_path,
+        token_path,
+        "calendar",
+        "v3",
+        ["https://www.googleapis.com/auth/calendar"],
+        timeout=None,
     )
     assert tool.service == "mock_service"
+    assert mock_service_factory.service.call_count == 2, "fetched again on use"
+
+
+@patch("naomi_core.tools.calendar.g_cal_tool.service_factory")
+def test_authenticate_per_thread(mock_service_factory):
+    """Test that each thread authenticates for, and uses, its own service."""
+    thread_services: dict = {}
+    mock_service_factory.service.side_effect = lambda *args, **kwargs: thread_services.setdefault(
+        threading.get_ident(), object()
+    )
+    tool = GoogleCalendarTool("credentials.json", "token.json")
+    tool.authenticate()
+
+    services = []
+    thread = threading.Thread(target=lambda: (tool.authenticate(), services.append(tool.service)))
+    thread.start()
+    thread.join()
+
+    assert services[0] is not None
+    assert services[0] is not tool.service
+    assert len(thread_services) == 2
+
+
+def test_iter_events_follows_page_tokens(fake_cal_tool, fake_service):
+    """Test that iter_events lazily fetches every page."""
+    fake_service.event_collection.items = make_events(8)
+
+    events = fake_cal_tool.iter_events(time_min=datetime.datetime(2025, 1, 1))
+    assert next(events)["id"] == "event0"
+    assert len(fake_service.event_collection.list_calls) == 1
+
+    assert [event["id"] for event in events] == [f"event{i}" for i in range(1, 8)]
+    calls = fake_service.event_collection.list_calls
+    assert [call["pageToken"] for call in calls] == [None, "3", "6"]
+    assert all(call["maxResults"] == 3 for call in calls)
+    assert calls[0]["timeMin"] == "2025-01-01T00:00:00Z"
+
+
+def test_get_events_by_date_range_spans_pages(fake_cal_tool, fake_service):
+    """Test that date range results are no longer truncated to the first page."""
+    fake_service.event_collection.items = make_events(10)
+    start_date = datetime.datetime(2025, 1, 1)
+    end_date = datetime.datetime(2025, 1, 2)
+
+    assert len(fake_cal_tool.get_events_by_date_range(start_date, end_date, max_results=7)) == 7
+    assert len(fake_cal_tool.get_events_by_date_range(start_date, end_date, max_results=None)) == 10
+
+
+def test_get_upcoming_events_spans_pages(fake_cal_tool, fake_service):
+    """Test that upcoming events are collected across pages up to max_results."""
+    fake_service.event_collection.items = make_events(10)
+
+    assert len(fake_cal_tool.get_upcoming_events(max_results=5)) == 5
+    assert len(fake_service.event_collection.list_calls) == 2
+
+
+def test_iter_calendars(fake_cal_tool, fake_service):
+    """Test that iter_calendars follows page tokens."""
+    fake_service.calendar_collection.items = [{"id": f"calendar{i}"} for i in range(4)]
+
+    assert len(fake_cal_tool.get_calendar_list()) == 4
+    assert len(fake_service.calendar_collection.list_calls) == 2
+
+
+def test_get_events_details_batch(batch_cal_tool, batch_http):
+    """Test fetching several events in one batch with per-item errors."""
+    batch_http.responses = [
+        (200, {"id": "event1"}),
+        (404, {"error": {"code": 404, "message": "Not Found"}}),
+        (200, {"id": "event3"}),
+    ]
+
+    results = batch_cal_tool.get_events_details(["event1", "missing", "event3"])
+
+    assert len(batch_http.batches) == 1
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[0].response == {"id": "event1"}
+    assert results[1].error.resp.status == 404
+    assert results[2].response == {"id": "event3"}
+
+
+def test_batch_retries_rate_limited_items(batch_cal_tool, batch_http):
+    """Test that rate limited items of a batch are sent again, and other failures are not."""
+    sleeps = []
+    batch_cal_tool.retry_policy = RetryPolicy(max_attempts=3, sleep=sleeps.append)
+    rate_limited = (429, {"error": {"code": 429, "message": "Rate Limit Exceeded"}})
+    batch_http.responses = [
+        (200, {"id": "event1"}),
+        rate_limited,
+        (404, {"error": {"code": 404, "message": "Not Found"}}),
+        rate_limited,
+        (200, {"id": "event2"}),
+        rate_limited,
+        rate_limited,
+    ]
+
+    results = batch_cal_tool.get_events_details(["event1", "event2", "missing", "event4"])
+
+    assert [len(batch) for batch in batch_http.batches] == [4, 2, 1]
+    assert len(sleeps) == 2
+    assert results[1].response == {"id": "event2"}
+    assert results[2].error.resp.status == 404
+    assert results[3].error.resp.status == 429, "given up after max_attempts"
+
+
+def test_create_events_splits_batches(batch_cal_tool, batch_http):
+    """Test that more than MAX_BATCH_SIZE requests are split across batches."""
+    count = MAX_BATCH_SIZE + 5
+    batch_http.responses = [(200, {"id": f"event{i}"}) for i in range(count)]
+    start = datetime.datetime(2025, 1, 1, 10)
+    events = [
+        {
+            "summary": f"Event {i}",
+            "start_time": start + datetime.timedelta(days=i),
+            "end_time": start + datetime.timedelta(days=i, hours=1),
+        }
+        for i in range(count)
+    ]
+
+    results = batch_cal_tool.create_events(events)
+
+    assert [len(batch) for batch in batch_http.batches] == [MAX_BATCH_SIZE, 5]
+    assert [result.response["id"] for result in results] == [f"event{i}" for i in range(count)]
+
+
+def test_delete_events_batch(batch_cal_tool, batch_http):
+    """Test deleting several events in one batch."""
+    batch_http.responses = [(204, ""), (410, {"error": {"code": 410, "message": "Deleted"}})]
+
+    results = batch_cal_tool.delete_events(["event1", "event2"])
+
+    assert [result.ok for result in results] == [True, False]
+
+
+def test_query_calendars(fake_cal_tool, fake_service):
+    """Test querying several calendars concurrently, with per-calendar errors and timeouts."""
+    fake_service.event_collection.items = make_events(4)
+    list_events = fake_service.event_collection.list
+    release_slow = threading.Event()
+
+    def list_by_calendar(calendarId, **params):
+        if calendarId == "broken":
+            raise HttpError(resp=MagicMock(status=404), content=b'{"error": "Not Found"}')
+        if calendarId == "slow":
+            release_slow.wait()
+        return list_events(calendarId=calendarId, **params)
+
+    fake_service.event_collection.list = list_by_calendar
+    start_date = datetime.datetime(2025, 1, 1)
+    end_date = datetime.datetime(2025, 1, 2)
+
+    try:
+        results = fake_cal_tool.query_calendars(
+            ["primary", "work", "broken", "slow"], start_date, end_date, timeout=0.2
+        )
+    finally:
+        release_slow.set()
+
+    assert list(results) == ["primary", "work", "broken", "slow"]
+    assert len(results["primary"].events) == 4
+    assert results["work"].ok
+    assert "An error occurred while fetching events" in str(results["broken"].error)
+    assert isinstance(results["slow"].error, TimeoutError)
+    called = {call["calendarId"] for call in fake_service.event_collection.list_calls}
+    assert {"primary", "work"} <= called
+
+
+def test_query_calendars_times_each_calendar_from_its_start(fake_cal_tool, fake_service):
+    """Test that calendars queued behind others get their whole timeout."""
+    fake_service.event_collection.items = make_events(1)
+    list_events = fake_service.event_collection.list
+
+    def list_slowly(**params):
+        threading.Event().wait(0.2)
+        return list_events(**params)
+
+    fake_service.event_collection.list = list_slowly
+    day = datetime.datetime(2025, 1, 1)
+
+    with patch("naomi_core.tools.calendar.g_cal_tool.QUERY_WORKERS", 1):
+        results = fake_cal_tool.query_calendars(
+            ["first", "second"], day, day + datetime.timedelta(days=1), timeout=0.35
+        )
+
+    assert results["first"].ok
+    assert results["second"].ok
+
+
+def test_query_calendars_stops_retrying_at_the_deadline(fake_cal_tool, fake_service):
+    """Test that a calendar's retries stop once its timeout has passed."""
+
+    def list_unavailable(**params):
+        raise HttpError(resp=MagicMock(status=503), content=b'{"error": "Unavailable"}')
+
+    fake_service.event_collection.list = list_unavailable
+    fake_cal_tool.retry_policy = RetryPolicy(max_attempts=100, base_delay=0.05, max_delay=0.05)
+    day = datetime.datetime(2025, 1, 1)
+
+    started = time.monotonic()
+    results = fake_cal_tool.query_calendars(["down"], day, day, timeout=0.2)
+
+    assert not results["down"].ok
+    assert time.monotonic() - started < 1.0
+
+
+def test_find_free_slots(mock_cal_tool, mock_service):
+    """Test merging free/busy periods of several calendars into free slots."""
+    mock_service.freebusy.return_value.query.return_value.execute.return_value = {
+        "calendars": {
+            "primary": {"busy": [{"start": "2025-01-01T09:00:00Z", "end": "2025-01-01T10:00:00Z"}]},
+            "work": {
+                "busy": [
+                    {"start": "2025-01-01T09:30:00Z", "end": "2025-01-01T11:00:00Z"},
+                    {"start": "2025-01-01T13:00:00Z", "end": "2025-01-01T14:00:00Z"},
+                ]
+            },
+        }
+    }
+    day = datetime.datetime(2025, 1, 1)
+
+    slots = mock_cal_tool.find_free_slots(
+        day.replace(hour=9),
+        day.replace(hour=17),
+        datetime.timedelta(hours=1),
+        calendar_ids=["primary", "work"],
+    )
+
+    assert slots == [
+        (day.replace(hour=11), day.replace(hour=13)),
+        (day.replace(hour=14), day.replace(hour=17)),
+    ]
+    body = mock_service.freebusy.return_value.query.call_args[1]["body"]
+    assert body["timeMin"] == "2025-01-01T09:00:00Z"
+    assert body["items"] == [{"id": "primary"}, {"id": "work"}]
+
+
+def test_find_free_slots_unavailable_calendar(mock_cal_tool, mock_service):
+    """Test that a calendar whose free/busy times failed is not taken to be free."""
+    mock_service.freebusy.return_value.query.return_value.execute.return_value = {
+        "calendars": {
+            "primary": {"busy": []},
+            "missing": {"errors": [{"domain": "global", "reason": "notFound"}], "busy": []},
+        }
+    }
+    day = datetime.datetime(2025, 1, 1)
+
+    with pytest.raises(FreeBusyUnavailableError) as exc_info:
+        mock_cal_tool.find_free_slots(
+            day, day.replace(hour=17), datetime.timedelta(hours=1), ["primary", "missing"]
+        )
+
+    assert list(exc_info.value.errors) == ["missing"]
+
+
+def test_check_conflicts(fake_cal_tool, fake_service):
+    """Test that overlapping events are reported, ignoring ones marked as free."""
+    events = make_events(3)
+    events[1]["transparency"] = "transparent"
+    fake_service.event_collection.items = events
+
+    conflicts = fake_cal_tool.check_conflicts(
+        datetime.datetime(2025, 1, 1, 0, 30), datetime.datetime(2025, 1, 1, 2, 30)
+    )
+
+    assert [event["id"] for event in conflicts] == ["event0", "event2"]
+    call = fake_service.event_collection.list_calls[-1]
+    assert (call["timeMin"], call["timeMax"]) == ("2025-01-01T00:30:00Z", "2025-01-01T02:30:00Z")
+
+
+def test_create_event_reject_on_conflict(mock_cal_tool, mock_service, mock_events):
+    """Test that a conflicting event is not created when reject_on_conflict is set."""
+    mock_service.events.return_value.list.return_value.execute.return_value = {
+        "items": mock_events[:1]
+    }
+
+    with pytest.raises(CalendarConflictError) as exc_info:
+        mock_cal_tool.create_event(
+            summary="Clash",
+            start_time=datetime.datetime(2025, 1, 1, 5, 30),
+            end_time=datetime.datetime(2025, 1, 1, 6, 30),
+            timezone="America/New_York",
+            reject_on_conflict=True,
+        )
+
+    assert exc_info.value.conflicts == mock_events[:1]
+    assert "Test Event 1" in str(exc_info.value)
+    call_kwargs = mock_service.events.return_value.list.call_args[1]
+    assert call_kwargs["timeMin"] == "2025-01-01T10:30:00Z"
+    mock_service.events.return_value.insert.assert_not_called()
+
+
+def test_create_event_with_cache_checks_interval_index(db_session, fake_service):
+    """Test conflict checks against the cached interval index."""
+    fake_service.event_collection.items = make_events(2)
+    tool = GoogleCalendarTool("credentials.json", "token.json", cache_max_age=datetime.timedelta(1))
+    tool.service = fake_service
+
+    assert (
+        tool.check_conflicts(datetime.datetime(2025, 1, 1, 2), datetime.datetime(2025, 1, 1, 3))
+        == []
+    )
+    with pytest.raises(CalendarConflictError):
+        tool.create_event(
+            "Clash",
+            datetime.datetime(2025, 1, 1, 1, 30),
+            datetime.datetime(2025, 1, 1, 2, 30),
+            reject_on_conflict=True,
+        )
+
+
+def test_requests_retry_transient_errors(mock_cal_tool, mock_service, mock_event_details):
+    """Test that tool calls retry server errors and are rate limited."""
+    sleeps = []
+    mock_cal_tool.retry_policy = RetryPolicy(sleep=sleeps.append)
+    mock_cal_tool.rate_limiter = MagicMock()
+    http_error = HttpError(resp=MagicMock(status=503), content=b'{"error": "Unavailable"}')
+    mock_service.events.return_value.get.return_value.execute.side_effect = [
+        http_error,
+        mock_event_details,
+    ]
+
+    assert mock_cal_tool.get_event_details(event_id="test_event_id") == mock_event_details
+    assert len(sleeps) == 1
+    assert mock_cal_tool.rate_limiter.acquire.call_count == 2
@@ -1,10 +1,17 @@
+import datetime
 import json
 import os
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
+from google.oauth2.credentials import Credentials
 
-from naomi_core.tools.calendar.google_auth import authenticate_google_api, DEFAULT_CALENDAR_SCOPES
+from naomi_core.tools.calendar.google_auth import (
+    DEFAULT_CALENDAR_SCOPES,
+    GoogleServiceFactory,
+    authenticate_google_api,
+)
 
 
 @pytest.fixture
@@ -187,3 +194,137 @@ def test_missing_credentials_file(tmp_path):
 
 def test_unsupported_api_no_scopes():
     pass
+
+
+@patch("naomi_core.tools.calendar.google_auth.load_credentials")
+def test_service_factory_caches_credentials(mock_load, credentials_file, token_file):
+    """Test that the factory reads the token file once and builds one service per thread."""
+    mock_load.side_effect = lambda *args: Credentials.from_authorized_user_file(token_file)
+    factory = GoogleServiceFactory()
+
+    service = factory.service(
+        credentials_file, token_file, "calendar", "v3", DEFAULT_CALENDAR_SCOPES
+    )
+    again = factory.service(credentials_file, token_file, "calendar", "v3", DEFAULT_CALENDAR_SCOPES)
+    other_thread = []
+    thread = threading.Thread(
+        target=lambda: other_thread.append(
+            factory.service(credentials_file, token_file, "calendar", "v3", DEFAULT_CALENDAR_SCOPES)
+        )
+    )
+    thread.start()
+    thread.join()
+
+    mock_load.assert_called_once_with(credentials_file, token_file, DEFAULT_CALENDAR_SCOPES)
+    assert again is service
+    assert other_thread[0] is not service
+    assert other_thread[0]._http is not service._http
+    assert other_thread[0]._http.credentials is service._http.credentials
+
+
+@patch("naomi_core.tools.calendar.google_auth.Request")
+@patch("naomi_core.tools.calendar.google_auth.load_credentials")
+def test_service_factory_refreshes_before_expiry(
+    mock_load, mock_request, credentials_file, tmp_path
+):
+    """Test that cached credentials are refreshed once they come within the refresh margin."""
+    token_path = str(tmp_path / "token.json")
+    mock_creds = MagicMock()
+    mock_creds.to_json.return_value = '{"token": "refreshed_token"}'
+    mock_creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    mock_load.return_value = mock_creds
+    factory = GoogleServiceFactory(refresh_margin=datetime.timedelta(minutes=5))
+
+    factory.credentials(credentials_file, token_path, DEFAULT_CALENDAR_SCOPES)
+    factory.credentials(credentials_file, token_path, DEFAULT_CALENDAR_SCOPES)
+    mock_creds.refresh.assert_not_called()
+
+    mock_creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(minutes=1)
+    assert factory.credentials(credentials_file, token_path, DEFAULT_CALENDAR_SCOPES) is mock_creds
+    mock_creds.refresh.assert_called_once_with(mock_request())
+    with open(token_path) as f:
+        assert f.read() == '{"token": "refreshed_token"}'
+
+
+@patch("naomi_core.tools.calendar.google_auth.Request")
+@patch("naomi_core.tools.calendar.google_auth.load_credentials")
+def test_service_factory_refreshes_rejected_token(
+    mock_load, mock_request, credentials_file, tmp_path
+):
+    """Test that credentials are refreshed when their token was rejected, unless already done."""
+    token_path = str(tmp_path / "token.json")
+    mock_creds = MagicMock(token="rejected", valid=True)
+    mock_creds.to_json.return_value = "{}"
+    mock_creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    mock_creds.refresh.side_effect = lambda request: setattr(mock_creds, "token", "fresh")
+    mock_load.return_value = mock_creds
+    factory = GoogleServiceFactory()
+    factory.credentials(credentials_file, token_path, DEFAULT_CALENDAR_SCOPES)
+
+    for _ in range(2):
+        factory.credentials(credentials_file, token_path, DEFAULT_CALENDAR_SCOPES, "rejected")
+
+    mock_creds.refresh.assert_called_once()
+    assert mock_creds.token == "fresh"
+
+
+@patch("naomi_core.tools.calendar.google_auth.Request")
+@patch("naomi_core.tools.calendar.google_auth.load_credentials")
+def test_service_factory_refreshes_per_token_file(
+    mock_load, mock_request, credentials_file, tmp_path
+):
+    """Test that refreshing one token file's credentials does not hold up another's."""
+    refreshing, release = threading.Event(), threading.Event()
+    slow, fast = MagicMock(), MagicMock()
+    slow.to_json.return_value = fast.to_json.return_value = "{}"
+    slow.valid = fast.valid = True
+    slow.expiry = fast.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    slow.refresh.side_effect = lambda request: (refreshing.set(), release.wait(5))
+    mock_load.side_effect = lambda _, token_path, __: slow if "slow" in token_path else fast
+    factory = GoogleServiceFactory()
+    slow_path, fast_path = str(tmp_path / "slow.json"), str(tmp_path / "fast.json")
+    factory.credentials(credentials_file, slow_path, DEFAULT_CALENDAR_SCOPES)
+    slow.valid = False
+
+    thread = threading.Thread(
+        target=factory.credentials, args=(credentials_file, slow_path, DEFAULT_CALENDAR_SCOPES)
+    )
+    thread.start()
+    found = []
+    other = threading.Thread(
+        target=lambda: found.append(
+            factory.credentials(credentials_file, fast_path, DEFAULT_CALENDAR_SCOPES)
+        )
+    )
+    try:
+        assert refreshing.wait(5)
+        other.start()
+        other.join(1)
+        assert found == [fast]
+    finally:
+        release.set()
+        thread.join()
+        other.join()
+    slow.refresh.assert_called_once()
+
+
+@patch("naomi_core.tools.calendar.google_auth.load_credentials")
+def test_service_factory_checks_expiry_on_every_use(
+    mock_load, credentials_file, token_file, tmp_path
+):
+    """Test that a cached service gets refreshed credentials, and a bounded socket timeout."""
+    mock_load.side_effect = lambda *args: Credentials.from_authorized_user_file(token_file)
+    factory = GoogleServiceFactory(timeout=60)
+    args = (credentials_file, token_file, "calendar", "v3", DEFAULT_CALENDAR_SCOPES)
+    service = factory.service(*args)
+
+    with patch.object(factory, "credentials", return_value=mock_load(*args)) as credentials:
+        refreshed = factory.service(*args)
+        credentials.assert_called_once()
+    worker = factory.service(*args, timeout=5)
+
+    assert refreshed is not service
+    assert refreshed._http.credentials is credentials.return_value
+    assert service._http.http.timeout == 60
+    assert worker._http.http.timeout == 5
+    assert not service._http._refresh_status_codes
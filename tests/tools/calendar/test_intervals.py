@@ -0,0 +1,87 @@
+"""
+Tests for the calendar interval helpers.
+"""
+
+import datetime
+import random
+
+from naomi_core.tools.calendar.intervals import (
+    IntervalIndex,
+    free_slots,
+    merge_intervals,
+    parse_event_time,
+    parse_rfc3339,
+    to_utc,
+)
+
+JAN_1 = datetime.datetime(2025, 1, 1)
+
+
+def at(hour, minute=0):
+    return JAN_1.replace(hour=hour, minute=minute)
+
+
+def test_parse_times():
+    """Test normalizing API times to naive UTC."""
+    assert parse_rfc3339("2025-01-01T10:00:00Z") == at(10)
+    assert parse_rfc3339("2025-01-01T10:00:00-02:00") == at(12)
+    assert parse_event_time({"dateTime": "2025-01-01T10:00:00Z"}) == at(10)
+    assert parse_event_time({"date": "2025-01-01"}) == JAN_1
+
+
+def test_merge_intervals():
+    """Test merging overlapping, touching and nested intervals."""
+    intervals = [(at(13), at(14)), (at(9), at(10)), (at(9, 30), at(11)), (at(11), at(12))]
+    intervals.append((at(13, 15), at(13, 45)))
+
+    assert merge_intervals(intervals) == [(at(9), at(12)), (at(13), at(14))]
+    assert merge_intervals([]) == []
+
+
+def test_free_slots():
+    """Test finding gaps long enough between busy intervals."""
+    busy = [(at(8), at(9, 30)), (at(10), at(11)), (at(10, 30), at(12)), (at(16), at(20))]
+
+    slots = free_slots(busy, at(9), at(17), datetime.timedelta(hours=1))
+
+    assert slots == [(at(12), at(16))]
+    assert free_slots(busy, at(9), at(17), datetime.timedelta(minutes=30)) == [
+        (at(9, 30), at(10)),
+        (at(12), at(16)),
+    ]
+    assert free_slots([], at(9), at(10), datetime.timedelta(hours=1)) == [(at(9), at(10))]
+    assert free_slots([(at(9), at(10))], at(9), at(10), datetime.timedelta(minutes=1)) == []
+
+
+def test_interval_index_matches_brute_force():
+    """Test overlap queries against a linear scan on random intervals."""
+    rng = random.Random(42)
+    items = []
+    for i in range(500):
+        start = JAN_1 + datetime.timedelta(minutes=rng.randrange(0, 10_000))
+        items.append((start, start + datetime.timedelta(minutes=rng.randrange(0, 300)), i))
+    index = IntervalIndex(items)
+
+    for _ in range(200):
+        start = JAN_1 + datetime.timedelta(minutes=rng.randrange(-100, 10_100))
+        end = start + datetime.timedelta(minutes=rng.randrange(0, 600))
+        expected = {i for item_start, item_end, i in items if item_start < end and item_end > start}
+        expected -= {i for item_start, item_end, i in items if item_start == item_end}
+        assert set(index.overlapping(start, end)) == expected
+
+
+def test_interval_index_is_half_open():
+    """Test that back-to-back events do not overlap."""
+    index = IntervalIndex([(at(9), at(10), "a"), (at(10), at(11), "b"), (at(9), at(12), "c")])
+
+    assert index.overlapping(at(10), at(11)) == ["c", "b"]
+    assert index.overlapping(at(11), at(12)) == ["c"]
+    assert index.overlapping(at(12), at(13)) == []
+    assert IntervalIndex([]).overlapping(at(9), at(10)) == []
+
+
+def test_to_utc():
+    """Test converting naive local and aware times to naive UTC."""
+    assert to_utc(at(10)) == at(10)
+    assert to_utc(at(10), "America/New_York") == at(15)
+    assert to_utc(at(10).replace(tzinfo=datetime.timezone.utc), "Asia/Tokyo") == at(10)
@@ -0,0 +1,201 @@
+"""
+Tests for retries and rate limiting of Google API calls.
+"""
+
+import datetime
+import email.utils
+import ssl
+from unittest.mock import MagicMock
+
+import httplib2  # type: ignore[import]
+import pytest
+from googleapiclient.errors import HttpError  # type: ignore[import]
+
+from naomi_core.tools.calendar.retry import RetryPolicy, TokenBucket, parse_retry_after
+
+
+def http_error(status, content=b'{"error": "Failed"}', **headers):
+    return HttpError(resp=httplib2.Response({"status": status, **headers}), content=content)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def policy(sleeps):
+    return RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=8.0, sleep=sleeps.append)
+
+
+def test_retries_transient_errors_with_backoff(policy, sleeps):
+    """Test that server errors are retried with growing, jittered delays until success."""
+    func = MagicMock(side_effect=[http_error(503), http_error(500), ConnectionError(), "ok"])
+
+    assert policy.call(func, "calendar.events.list") == "ok"
+    assert func.call_count == 4
+    assert len(sleeps) == 3
+    for retry, delay in enumerate(sleeps, 1):
+        assert 0 <= delay <= 2 ** (retry - 1)
+
+
+def test_gives_up_after_max_attempts(policy, sleeps):
+    """Test that the last error is raised once the attempts run out, per method if configured."""
+    func = MagicMock(side_effect=http_error(503))
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.list")
+    assert func.call_count == 4
+
+    policy.method_max_attempts["calendar.events.get"] = 2
+    func.reset_mock()
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.get")
+    assert func.call_count == 2
+
+
+def test_gives_up_at_deadline():
+    """Test that no retry is made that would start after the deadline."""
+    clock = FakeClock()
+    policy = RetryPolicy(sleep=clock.sleep, clock=clock)
+    func = MagicMock(side_effect=http_error(503, **{"retry-after": "1"}))
+
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.list", deadline=1.5)
+    assert func.call_count == 2
+    assert clock.sleeps == [1.0]
+
+
+def test_does_not_retry_client_errors(policy, sleeps):
+    """Test that errors that would fail again are raised immediately."""
+    func = MagicMock(side_effect=http_error(404))
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.get")
+    assert func.call_count == 1
+    assert sleeps == []
+
+
+def test_retries_rate_limit_forbidden(policy):
+    """Test that a 403 is retried only when it reports a rate limit."""
+    rate_limited = http_error(403, b'{"error": {"message": "Rate Limit Exceeded"}}')
+    func = MagicMock(side_effect=[rate_limited, "ok"])
+    assert policy.call(func) == "ok"
+
+    func = MagicMock(side_effect=http_error(403, b'{"error": {"message": "Forbidden"}}'))
+    with pytest.raises(HttpError):
+        policy.call(func)
+    assert func.call_count == 1
+
+
+def test_non_idempotent_methods_retry_only_rate_limits(policy):
+    """Test that inserts are not repeated after a server error, which may have created the event."""
+    func = MagicMock(side_effect=http_error(500))
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.insert")
+    assert func.call_count == 1
+
+    func = MagicMock(side_effect=[http_error(429), "created"])
+    assert policy.call(func, "calendar.events.insert") == "created"
+
+
+def test_conditional_updates_retry_only_rate_limits(policy):
+    """Test that updates sent with If-Match are not repeated after a server error."""
+    func = MagicMock(side_effect=[http_error(503), "updated"])
+    assert policy.call(func, "calendar.events.patch") == "updated"
+
+    func = MagicMock(side_effect=[http_error(503), "updated"])
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.patch", conditional=True)
+    assert func.call_count == 1
+
+    func = MagicMock(side_effect=[http_error(429), "updated"])
+    assert policy.call(func, "calendar.events.update", conditional=True) == "updated"
+
+
+def test_retried_delete_of_gone_resource_succeeds(policy):
+    """Test that a retried delete finding the event gone succeeds, unless nothing was applied."""
+    func = MagicMock(side_effect=[http_error(503), http_error(410)])
+    assert policy.call(func, "calendar.events.delete") is None
+    assert func.call_count == 2
+
+    func = MagicMock(side_effect=[http_error(429), http_error(404)])
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.delete")
+
+    func = MagicMock(side_effect=http_error(404))
+    with pytest.raises(HttpError):
+        policy.call(func, "calendar.events.delete")
+
+
+def test_retries_transport_errors(policy):
+    """Test that httplib2 and SSL errors are retried, and unresolved hosts even for inserts."""
+    func = MagicMock(side_effect=[httplib2.HttpLib2Error(), ssl.SSLError(), TimeoutError(), "ok"])
+    assert policy.call(func, "calendar.events.list") == "ok"
+
+    func = MagicMock(side_effect=[httplib2.ServerNotFoundError(), "created"])
+    assert policy.call(func, "calendar.events.insert") == "created"
+
+    func = MagicMock(side_effect=ssl.SSLError())
+    with pytest.raises(ssl.SSLError):
+        policy.call(func, "calendar.events.insert")
+    assert func.call_count == 1
+
+
+def test_honours_retry_after(policy, sleeps):
+    """Test that Retry-After replaces the backoff delay, and a too long one is not waited for."""
+    func = MagicMock(side_effect=[http_error(429, **{"retry-after": "3"}), "ok"])
+    assert policy.call(func) == "ok"
+    assert sleeps == [3.0]
+
+    func = MagicMock(side_effect=http_error(429, **{"retry-after": "60"}))
+    with pytest.raises(HttpError):
+        policy.call(func)
+    assert func.call_count == 1
+
+
+def test_parse_retry_after():
+    """Test parsing Retry-After given in seconds or as an HTTP date."""
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=30)
+    delay = parse_retry_after(email.utils.format_datetime(later, usegmt=True))
+    assert delay is not None and 25 <= delay <= 30
+
+
+def test_token_bucket_allows_bursts_then_paces():
+    """Test that the bucket lets a burst through, then spaces calls out at the configured rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3.0, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+
+    clock.now += 10
+    assert bucket.acquire(3) == 0.0
+    # Costs above the capacity would never be satisfied, so they take a full bucket
+    assert bucket.acquire(100) == pytest.approx(1.5)
+
+
+def test_policy_takes_tokens_per_attempt(policy):
+    """Test that every attempt, including retries, is rate limited."""
+    limiter = MagicMock()
+    func = MagicMock(side_effect=[http_error(503), "ok"])
+
+    policy.call(func, limiter=limiter, cost=5)
+
+    assert limiter.acquire.call_count == 2
+    limiter.acquire.assert_called_with(5)
@@ -0,0 +1,225 @@
+"""
+Tests for calendar push notifications through watch channels.
+"""
+
+import datetime
+import logging
+from unittest.mock import patch
+
+from naomi_core.db import codec
+from naomi_core.db.calendar import CalendarEventModel, CalendarWatchChannelModel
+from naomi_core.db.webhook import WebhookEvent
+from naomi_core.tools.calendar.event_cache import CalendarEventCache
+from naomi_core.tools.calendar.watch import (
+    CALENDAR_EVENT_TYPE,
+    CALENDAR_NOTIFICATION_MAX_ATTEMPTS,
+    CalendarWatcher,
+    process_notifications,
+    record_notification,
+)
+from tests.tools.calendar.conftest import make_events
+
+ADDRESS = "https://naomi.example.com/calendar/notifications"
+
+
+def notification_headers(channel, state="exists", message_number="2"):
+    return {
+        "X-Goog-Channel-ID": channel.id,
+        "X-Goog-Channel-Token": channel.token,
+        "X-Goog-Resource-ID": channel.resource_id,
+        "X-Goog-Resource-State": state,
+        "X-Goog-Message-Number": message_number,
+    }
+
+
+def test_watch_opens_and_stores_channel(db_session, fake_cal_tool, fake_service):
+    """Test that watching opens a web hook channel and remembers its resource and expiration."""
+    watcher = CalendarWatcher(fake_cal_tool, ADDRESS, ttl=datetime.timedelta(days=2))
+
+    channel = watcher.watch("work")
+
+    watch = fake_service.event_collection.watches[0]
+    assert watch["calendarId"] == "work"
+    assert watch["type"] == "web_hook"
+    assert watch["address"] == ADDRESS
+    assert watch["token"] == channel.token
+    assert watch["params"] == {"ttl": str(2 * 24 * 3600)}
+    stored = db_session.get(CalendarWatchChannelModel, channel.id)
+    assert stored.resource_id == "resource-work"
+    assert stored.expiration == datetime.datetime(2025, 1, 8)
+
+
+def test_renew_expiring_replaces_channels(db_session, fake_cal_tool, fake_service):
+    """Test that channels close to expiring are replaced, and the old ones stopped."""
+    watcher = CalendarWatcher(fake_cal_tool, ADDRESS, renew_before=datetime.timedelta(hours=1))
+    old = watcher.watch("primary")
+
+    with patch("naomi_core.tools.calendar.watch._utcnow") as utcnow:
+        utcnow.return_value = datetime.datetime(2025, 1, 6)
+        assert watcher.renew_expiring() == []
+        utcnow.return_value = datetime.datetime(2025, 1, 7, 23, 30)
+        renewed = watcher.renew_expiring()
+
+    assert [channel.calendar_id for channel in renewed] == ["primary"]
+    assert fake_service.channel_collection.stopped == [
+        {"id": old.id, "resourceId": "resource-primary"}
+    ]
+    channel_ids = {channel.id for channel in db_session.query(CalendarWatchChannelModel)}
+    assert channel_ids == {renewed[0].id}
+
+
+def test_record_notification(db_session, fake_cal_tool):
+    """Test that change notifications are recorded as calendar webhook events."""
+    channel = CalendarWatcher(fake_cal_tool, ADDRESS).watch("work")
+
+    event_id = record_notification(notification_headers(channel))
+
+    event = db_session.get(WebhookEvent, event_id)
+    assert event.event_type == CALENDAR_EVENT_TYPE
+    assert event.status == "NEW"
+    payload = codec.loads(event.payload)
+    assert payload["calendar_id"] == "work"
+    assert payload["resource_state"] == "exists"
+
+
+def test_record_notification_ignores_sync_and_forgeries(db_session, fake_cal_tool):
+    """Test that the initial sync message and notifications with a wrong token are not recorded."""
+    channel = CalendarWatcher(fake_cal_tool, ADDRESS).watch("work")
+    forged = dict(notification_headers(channel), **{"X-Goog-Channel-Token": "guess"})
+    unknown = dict(notification_headers(channel), **{"X-Goog-Channel-ID": "unknown"})
+
+    assert record_notification(notification_headers(channel, state="sync")) is None
+    assert record_notification(forged) is None
+    assert record_notification(unknown) is None
+    assert db_session.query(WebhookEvent).count() == 0
+
+
+def test_process_notifications_syncs_affected_calendars(db_session, fake_cal_tool, fake_service):
+    """Test that notifications sync only their calendar, once however many arrived."""
+    fake_service.event_collection.items = make_events(3)
+    watcher = CalendarWatcher(fake_cal_tool, ADDRESS)
+    channel = watcher.watch("work")
+    for message_number in ("2", "3", "4"):
+        record_notification(notification_headers(channel, message_number=message_number))
+    db_session.add(WebhookEvent(event_type="other", payload="{}"))
+    db_session.commit()
+    cache = CalendarEventCache(fake_cal_tool)
+
+    with patch.object(cache, "sync", wraps=cache.sync) as sync:
+        assert process_notifications(cache) == 1
+        sync.assert_called_once_with("work")
+
+    assert db_session.query(CalendarEventModel).filter_by(calendar_id="work").count() == 3
+    statuses = {event.event_type: event.status for event in db_session.query(WebhookEvent)}
+    assert statuses == {CALENDAR_EVENT_TYPE: "PROCESSED", "other": "NEW"}
+    assert process_notifications(cache) == 0
+
+
+def test_process_notifications_retries_failures(db_session, fake_cal_tool):
+    """Test that notifications whose sync failed are retried, then marked failed."""
+    channel = CalendarWatcher(fake_cal_tool, ADDRESS).watch("work")
+    record_notification(notification_headers(channel))
+    cache = CalendarEventCache(fake_cal_tool)
+
+    with patch.object(cache, "sync", side_effect=Exception("API unavailable")):
+        assert process_notifications(cache) == 1
+        event = db_session.query(WebhookEvent).one()
+        assert (event.status, event.attempts) == ("NEW", 1)
+        for _ in range(CALENDAR_NOTIFICATION_MAX_ATTEMPTS - 1):
+            db_session.expire_all()
+            assert process_notifications(cache) == 1
+
+    db_session.expire_all()
+    event = db_session.query(WebhookEvent).one()
+    assert (event.status, event.attempts) == ("FAILED", CALENDAR_NOTIFICATION_MAX_ATTEMPTS)
+    assert process_notifications(cache) == 0
+
+
+def test_process_notifications_skips_claimed(db_session, fake_cal_tool):
+    """Test that notifications another processor claimed are not synced again."""
+    channel = CalendarWatcher(fake_cal_tool, ADDRESS).watch("work")
+    claimed = record_notification(notification_headers(channel, message_number="2"))
+    record_notification(notification_headers(channel, message_number="3"))
+    event = db_session.get(WebhookEvent, claimed)
+    event.status, event.claimed_at = "CLAIMED", datetime.datetime.utcnow()
+    db_session.commit()
+    cache = CalendarEventCache(fake_cal_tool)
+
+    with patch.object(cache, "sync") as sync:
+        assert process_notifications(cache) == 1
+        assert process_notifications(cache) == 0
+    sync.assert_called_once_with("work")
+    db_session.expire_all()
+    assert db_session.get(WebhookEvent, claimed).status == "CLAIMED"
+
+
+def test_process_notifications_reclaims_lapsed_claims(db_session, fake_cal_tool):
+    """Test that notifications claimed by a processor that died are synced once the lease lapses."""
+    channel = CalendarWatcher(fake_cal_tool, ADDRESS).watch("work")
+    claimed = record_notification(notification_headers(channel, message_number="2"))
+    event = db_session.get(WebhookEvent, claimed)
+    event.status, event.claimed_at = "CLAIMED", datetime.datetime(2025, 1, 7, 12, 0)
+    db_session.commit()
+    cache = CalendarEventCache(fake_cal_tool)
+
+    with patch.object(cache, "sync") as sync:
+        with patch("naomi_core.tools.calendar.watch._utcnow") as utcnow:
+            utcnow.return_value = datetime.datetime(2025, 1, 7, 12, 5)
+            assert process_notifications(cache) == 0
+            utcnow.return_value = datetime.datetime(2025, 1, 7, 12, 30)
+            assert process_notifications(cache) == 1
+    sync.assert_called_once_with("work")
+    db_session.expire_all()
+    assert db_session.get(WebhookEvent, claimed).status == "PROCESSED"
+
+
+def test_process_notifications_keeps_claims_taken_over(db_session, fake_cal_tool):
+    """Test that a processor whose lease lapsed mid-sync leaves the new claim alone."""
+    channel = CalendarWatcher(fake_cal_tool, ADDRESS).watch("work")
+    claimed = record_notification(notification_headers(channel, message_number="2"))
+    cache = CalendarEventCache(fake_cal_tool)
+    taken_over_at = datetime.datetime(2025, 1, 7, 12, 30)
+
+    def take_over(calendar_id):
+        db_session.get(WebhookEvent, claimed).claimed_at = taken_over_at
+        db_session.commit()
+
+    with patch.object(cache, "sync", side_effect=take_over):
+        assert process_notifications(cache) == 1
+    db_session.expire_all()
+    event = db_session.get(WebhookEvent, claimed)
+    assert (event.status, event.claimed_at) == ("CLAIMED", taken_over_at)
+
+
+def test_renew_expiring_continues_past_failures(db_session, fake_cal_tool, fake_service):
+    """Test that a channel that cannot be renewed is kept, and the others are still renewed."""
+    watcher = CalendarWatcher(fake_cal_tool, ADDRESS)
+    failing, renewing = watcher.watch("failing"), watcher.watch("work")
+    watch_events = fake_cal_tool.watch_events
+
+    def watch_or_fail(calendar_id, *args):
+        if calendar_id == "failing":
+            raise Exception("API unavailable")
+        return watch_events(calendar_id, *args)
+
+    with patch.object(fake_cal_tool, "watch_events", side_effect=watch_or_fail):
+        with patch("naomi_core.tools.calendar.watch._utcnow") as utcnow:
+            utcnow.return_value = datetime.datetime(2025, 1, 7, 23, 30)
+            renewed = watcher.renew_expiring()
+
+    assert [channel.calendar_id for channel in renewed] == ["work"]
+    channel_ids = {channel.id for channel in db_session.query(CalendarWatchChannelModel)}
+    assert channel_ids == {failing.id, renewed[0].id}
+    assert renewing.id not in channel_ids
+
+
+def test_record_notification_does_not_log_tokens(db_session, fake_cal_tool, caplog):
+    """Test that ignored notifications are logged without their channel token."""
+    channel = CalendarWatcher(fake_cal_tool, ADDRESS).watch("work")
+    forged = dict(notification_headers(channel), **{"X-Goog-Channel-Token": "secret-guess"})
+
+    with caplog.at_level(logging.WARNING):
+        assert record_notification(forged) is None
+
+    assert channel.id in caplog.text
+    assert "secret-guess" not in caplog.text